@@ -15,7 +15,8 @@ from __future__ import annotations
 
 import os
 import sys
-import random
+import json
+import threading
 import traceback
 from datetime import date
 
@@ -26,7 +27,7 @@ _THIS_DIR = os.path.dirname(os.path.abspath(__file__))
 if _THIS_DIR not in sys.path:
     sys.path.insert(0, _THIS_DIR)
 
-from flask import Flask, render_template_string, request, jsonify
+from flask import Flask, Response, render_template_string, request, jsonify
 
 # --- Project modules ---
 from data_models import (
@@ -38,12 +39,18 @@ from engagement_engine import (
     GuestProfile, build_trigger_plan, SEGMENT_INTENSITY, SEGMENT_BASE_REBOOK,
 )
 import guest_journey_simulation as sim
+from result_cache import ResultCache, scenario_key
+from simulation_jobs import JobManager
 
 # ---------------------------------------------------------------------------
 # Flask application
 # ---------------------------------------------------------------------------
 app = Flask(__name__)
 
+# Deterministic simulation results, keyed by scenario fingerprint.  Set
+# NOVASTAR_SIM_CACHE to a file path to persist them across restarts.
+SIM_CACHE = ResultCache(maxsize=256, path=os.environ.get("NOVASTAR_SIM_CACHE"))
+
 # ===================================================================
 # SHARED CSS & LAYOUT
 # ===================================================================
@@ -394,6 +401,21 @@ tr:hover td { background: #f8fafc; }
 /* Loading state */
 .loading { opacity: 0.6; pointer-events: none; }
 
+/* Background job progress */
+.progress {
+    height: 10px;
+    background: var(--bg);
+    border-radius: 5px;
+    overflow: hidden;
+    margin: 12px 0 8px;
+}
+.progress-bar {
+    height: 100%;
+    width: 0;
+    background: var(--accent);
+    transition: width 0.3s;
+}
+
 /* Footer */
 .footer {
     text-align: center;
@@ -581,6 +603,80 @@ SIMULATION_BODY = """
     </form>
 </div>
 
+<div class="card">
+    <div class="card-header">Large Background Run</div>
+    <p style="font-size:0.9rem; color:var(--text-light); margin-bottom:12px;">
+        Runs of 100,000+ guests execute in a background worker; progress streams in below.
+    </p>
+    <form id="job-form">
+        <div class="form-row">
+            <div class="form-group">
+                <label for="job_guests">Number of Guests</label>
+                <input type="number" id="job_guests" name="num_guests" value="100000" min="500" max="{{ max_job_guests }}" step="500">
+            </div>
+            <div class="form-group">
+                <label for="job_seed">Random Seed</label>
+                <input type="number" id="job_seed" name="seed" value="{{ seed }}" min="1" max="99999">
+            </div>
+        </div>
+        <button type="submit" class="btn btn-primary">Start Background Run</button>
+    </form>
+    <div id="job-status" style="display:none;">
+        <div class="progress"><div class="progress-bar" id="job-bar"></div></div>
+        <div id="job-text" style="font-size:0.9rem; color:var(--text-light);"></div>
+        <table id="job-table" style="margin-top:12px;"></table>
+    </div>
+</div>
+
+<script>
+(function () {
+    var rows = [
+        ["Guests reachable (email/app)", "guests_with_email"],
+        ["Emails sent", "total_emails_sent"],
+        ["Emails opened", "total_emails_opened"],
+        ["Emails clicked", "total_emails_clicked"],
+        ["Push notifications sent", "total_push_sent"],
+        ["Push opened", "total_push_opened"],
+        ["App sessions (organic)", "total_app_sessions"],
+        ["REBOOKED (total)", "total_rebooked"]
+    ];
+    function fmt(n) { return n === undefined || n === null ? "&ndash;" : n.toLocaleString(); }
+    function render(job) {
+        var pct = Math.round(job.progress * 100);
+        document.getElementById("job-bar").style.width = pct + "%";
+        var text = job.status === "done"
+            ? "Done: " + job.num_guests.toLocaleString() + " guests in " + job.elapsed + "s"
+            : job.status === "failed" ? "Failed: " + job.error
+            : "Job " + job.job_id + " " + job.status + (job.stage ? " (" + job.stage + ")" : "")
+              + ": " + job.guests_processed.toLocaleString() + " / " + job.total_guests.toLocaleString() + " guests (" + pct + "%)";
+        document.getElementById("job-text").textContent = text;
+        var before = job.before || job.partial.BEFORE || {};
+        var after = job.after || job.partial.AFTER || {};
+        var html = "<tr><th>Metric</th><th style='text-align:right;'>BEFORE</th><th style='text-align:right;'>AFTER</th></tr>";
+        rows.forEach(function (r) {
+            html += "<tr><td><strong>" + r[0] + "</strong></td><td style='text-align:right;'>" + fmt(before[r[1]])
+                 + "</td><td style='text-align:right;'>" + fmt(after[r[1]]) + "</td></tr>";
+        });
+        document.getElementById("job-table").innerHTML = html;
+    }
+    document.getElementById("job-form").addEventListener("submit", function (ev) {
+        ev.preventDefault();
+        fetch("/simulation/jobs", { method: "POST", body: new FormData(ev.target) })
+            .then(function (r) { return r.json(); })
+            .then(function (job) {
+                document.getElementById("job-status").style.display = "block";
+                if (job.error) { document.getElementById("job-text").textContent = job.error; return; }
+                var source = new EventSource(job.events_url);
+                source.onmessage = function (e) {
+                    var state = JSON.parse(e.data);
+                    render(state);
+                    if (state.status === "done" || state.status === "failed") { source.close(); }
+                };
+            });
+    });
+})();
+</script>
+
 {% if results %}
 <div class="card">
     <div class="card-header">BEFORE vs AFTER Comparison &mdash; {{ results.num_guests }} guests, seed={{ results.seed }}</div>
@@ -654,39 +750,14 @@ def _pct(n, d):
 
 def _run_simulation(num_guests, seed):
     """Run BEFORE and AFTER simulations and return structured results."""
-    # Temporarily override the module-level constant
-    original_num = sim.NUM_GUESTS
-    original_seed = sim.SEED
-    sim.NUM_GUESTS = num_guests
-    sim.SEED = seed
-
-    try:
-        rng_before = random.Random(seed)
-        before = sim.simulate(
-            label="BEFORE",
-            rng=rng_before,
-            email_open_rate=sim.BEFORE_EMAIL_OPEN,
-            email_click_rate=sim.BEFORE_EMAIL_CLICK,
-            rebook_rates=sim.BEFORE_REBOOK,
-            emails_per_stage=sim.BEFORE_EMAILS_PER_STAGE,
-            use_push=False,
-            use_app=False,
-        )
-
-        rng_after = random.Random(seed)
-        after = sim.simulate(
-            label="AFTER",
-            rng=rng_after,
-            email_open_rate=sim.AFTER_EMAIL_OPEN,
-            email_click_rate=sim.AFTER_EMAIL_CLICK,
-            rebook_rates=sim.AFTER_REBOOK,
-            emails_per_stage=sim.AFTER_EMAILS_PER_STAGE,
-            use_push=True,
-            use_app=True,
-        )
-    finally:
-        sim.NUM_GUESTS = original_num
-        sim.SEED = original_seed
+    # Each run gets its own immutable config and RNG, so concurrent requests
+    # under a threaded server never share mutable state.
+    before_cfg = sim.ScenarioConfig.before(num_guests=num_guests, seed=seed)
+    after_cfg = sim.ScenarioConfig.after(num_guests=num_guests, seed=seed)
+    before, after = SIM_CACHE.get_or_compute(
+        scenario_key(before_cfg, after_cfg),
+        lambda: (sim.simulate(before_cfg), sim.simulate(after_cfg)),
+    )
 
     # Build comparison rows
     comparison = []
@@ -774,12 +845,91 @@ def simulation():
             return _page("Simulation", "simulation", render_template_string(
                 SIMULATION_BODY + error_html,
                 num_guests=num_guests, seed=seed, results=None,
+                max_job_guests=MAX_JOB_GUESTS,
             ))
 
     return render_template_string(
         LAYOUT_TOP + SIMULATION_BODY + LAYOUT_BOTTOM,
         title="Simulation", active="simulation",
         num_guests=num_guests, seed=seed, results=results,
+        max_job_guests=MAX_JOB_GUESTS,
+    )
+
+
+# -------------------------------------------------------------------
+# Background jobs for large runs
+# -------------------------------------------------------------------
+MAX_JOB_GUESTS = 5_000_000
+_job_manager: JobManager | None = None
+_job_manager_lock = threading.Lock()
+
+
+def _jobs() -> JobManager:
+    """Start the worker pool on first use (not at import / reloader time)."""
+    global _job_manager
+    with _job_manager_lock:
+        if _job_manager is None:
+            _job_manager = JobManager(cache=SIM_CACHE)
+        return _job_manager
+
+
+@app.route("/simulation/jobs", methods=["POST"])
+def submit_simulation_job():
+    data = request.get_json(silent=True) or request.form
+    try:
+        num_guests = int(data.get("num_guests", 100_000))
+        seed = int(data.get("seed", 42))
+    except (TypeError, ValueError):
+        return jsonify(error="num_guests and seed must be integers"), 400
+    num_guests = max(500, min(MAX_JOB_GUESTS, num_guests))
+    job_id = _jobs().submit(num_guests, seed)
+    return jsonify(
+        job_id=job_id,
+        status_url=f"/simulation/jobs/{job_id}",
+        events_url=f"/simulation/jobs/{job_id}/events",
+    ), 202
+
+
+@app.route("/simulation/jobs/<job_id>")
+def simulation_job_status(job_id):
+    state = _jobs().snapshot(job_id)
+    if state is None:
+        return jsonify(error=f"unknown job {job_id}"), 404
+    return jsonify(state)
+
+
+@app.route("/simulation/jobs/<job_id>/events")
+def simulation_job_events(job_id):
+    manager = _jobs()
+    if manager.get(job_id) is None:
+        return jsonify(error=f"unknown job {job_id}"), 404
+
+    def stream():
+        seen = -1
+        while True:
+            state = manager.wait(job_id, timeout=15.0, since=seen)
+            if state is None:
+                return
+            seen = state["guests_processed"]
+            yield f"data: {json.dumps(state)}\n\n"
+            if state["status"] in ("done", "failed"):
+                return
+
+    return Response(stream(), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@app.route("/simulation/cache")
+def simulation_cache():
+    stats = SIM_CACHE.stats()
+    return jsonify(
+        hits=stats.hits,
+        disk_hits=stats.disk_hits,
+        misses=stats.misses,
+        evictions=stats.evictions,
+        size=stats.size,
+        maxsize=stats.maxsize,
+        hit_rate=round(stats.hit_rate, 4),
     )
 
 
@@ -0,0 +1,933 @@
+"""
+NovaStar Hotels -- Throughput Benchmarks
+=========================================
+Micro- and throughput benchmarks for the engine's batch paths.
+Each benchmark prints a small table and checks that the fast path
+produces the same output as the row-at-a-time path it replaces.
+
+Usage (from the 03_technical_build directory):
+    python benchmarks.py cohort [--guests 20000] [--workers 4]
+    python benchmarks.py offers [--offers 200000]
+    python benchmarks.py churn [--guests 1000000]        (needs NumPy)
+    python benchmarks.py segments [--rows 1000000]       (needs NumPy)
+    python benchmarks.py scheduler [--guests 90000]
+    python benchmarks.py dispatcher [--triggers 1000000]
+    python benchmarks.py outbox [--triggers 200000]
+    python benchmarks.py memory [--objects 50000]
+    python benchmarks.py ids [--ids 1000000] [--workers 4]
+    python benchmarks.py interactions [--events 1000000]  (scan needs NumPy)
+    python benchmarks.py storage [--stays 1000000]
+    python benchmarks.py export [--events 1000000]       (needs NumPy + pyarrow)
+    python benchmarks.py identity [--people 80000]
+    python benchmarks.py metrics [--events 1000000]
+
+Standard-library only unless a benchmark says otherwise.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+from collections.abc import Callable
+
+from data_models import (
+    GuestPreferences,
+    GuestSegment,
+    make_sample_guest,
+    make_sample_loyalty,
+    make_sample_stay,
+)
+from engagement_engine import (
+    GuestProfile,
+    JourneyStage,
+    _build_offer_template,
+    _generate_offer,
+    _issue_offer,
+    _offer_template,
+    build_trigger_plan,
+    build_trigger_plans,
+)
+
+_CITIES = ["Austin", "Orlando", "Chicago", "Denver", "Barcelona", "Lisbon",
+           "London", "Amsterdam", "Osaka", "Singapore", "Miami"]
+
+
+def _timed(fn: Callable[[], object]) -> tuple[float, object]:
+    t0 = time.perf_counter()
+    out = fn()
+    return time.perf_counter() - t0, out
+
+
+def _sample_profiles(n: int, seed: int = 42) -> list[GuestProfile]:
+    """A mixed cohort across all segments, cities and loyalty states."""
+    rng = random.Random(seed)
+    segments = list(GuestSegment)
+    profiles = []
+    for _ in range(n):
+        guest = make_sample_guest(rng.choice(segments))
+        stay = make_sample_stay(guest, property_city=rng.choice(_CITIES))
+        loyalty = make_sample_loyalty(guest) if rng.random() < 0.6 else None
+        profiles.append(GuestProfile(
+            guest=guest,
+            stay=stay,
+            preferences=GuestPreferences(guest_id=guest.guest_id),
+            loyalty=loyalty,
+            engagement_score=rng.choice((0.0, 0.3, 0.7)),
+        ))
+    return profiles
+
+
+def _plan_signature(plan) -> list[tuple]:
+    return [(t.guest_id, t.journey_stage, t.channel, t.day_offset,
+             t.message.subject_line, t.message.body,
+             t.message.offer.headline if t.message.offer else None)
+            for t in plan]
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_cohort(guests: int, workers: int) -> None:
+    """build_trigger_plan per profile vs build_trigger_plans for a cohort."""
+    profiles = _sample_profiles(guests)
+
+    t_loop, loop_plans = _timed(lambda: [build_trigger_plan(p) for p in profiles])
+    t_batch, batch_plans = _timed(lambda: build_trigger_plans(profiles, workers=1))
+    t_par, par_plans = _timed(lambda: build_trigger_plans(profiles, workers=workers))
+
+    same = all(_plan_signature(a) == _plan_signature(b) == _plan_signature(c)
+               for a, b, c in zip(loop_plans, batch_plans, par_plans))
+
+    print(f"Trigger plans for a {guests:,}-guest checkout cohort")
+    print(f"{'Path':<40} {'Seconds':>9} {'Guests/sec':>12}")
+    print("-" * 63)
+    for label, t in (("build_trigger_plan (per profile)", t_loop),
+                     ("build_trigger_plans (1 process)", t_batch),
+                     (f"build_trigger_plans ({workers} processes)", t_par)):
+        print(f"{label:<40} {t:>9.3f} {guests / t:>12,.0f}")
+    print(f"\nPlans identical across paths: {same}")
+
+
+def bench_offers(offers: int) -> None:
+    """Per-offer cost of rebuilding the offer vs the memoized template."""
+    rng = random.Random(7)
+    profiles = _sample_profiles(min(offers, 5_000))
+    stages = [JourneyStage.CONVERSION_PUSH, JourneyStage.CONTEXTUAL_REENGAGEMENT,
+              JourneyStage.VALUE_REINFORCEMENT]
+    work = [(profiles[i % len(profiles)], rng.choice(stages), rng.random())
+            for i in range(offers)]
+
+    def rebuild() -> list:
+        return [_issue_offer(_build_offer_template(p.guest.segment, r > 0.6, r > 0.7,
+                                                   s, p.stay.property_city),
+                             p.guest.guest_id)
+                for p, s, r in work]
+
+    _offer_template.cache_clear()
+    t_old, old = _timed(rebuild)
+    t_new, new = _timed(lambda: [_generate_offer(p, s, r) for p, s, r in work])
+    info = _offer_template.cache_info()
+
+    def fields(o):
+        return (o.guest_id, o.headline, o.body, o.discount_pct, o.points_bonus,
+                o.perks, o.valid_from, o.valid_until, o.target_property)
+
+    same = all(fields(a) == fields(b) for a, b in zip(old, new))
+
+    print(f"Offer generation, {offers:,} offers")
+    print(f"{'Path':<40} {'Seconds':>9} {'us/offer':>10}")
+    print("-" * 61)
+    for label, t in (("rebuild per offer", t_old), ("memoized template + stamp", t_new)):
+        print(f"{label:<40} {t:>9.3f} {t / offers * 1e6:>10.2f}")
+    print(f"\nTemplate cache: {info.currsize} keys, {info.hits:,} hits, {info.misses:,} misses")
+    print(f"Offers identical across paths: {same}")
+
+
+def bench_churn(guests: int) -> None:
+    """calculate_churn_risk per profile vs score_churn_batch over columns."""
+    import numpy as np
+
+    from engagement_engine import calculate_churn_risk
+    from vectorized_scoring import profiles_from_columns, random_churn_columns, score_churn_batch
+
+    columns = random_churn_columns(guests)
+    profiles = profiles_from_columns(*columns)
+
+    t_loop, scalar = _timed(lambda: [calculate_churn_risk(p) for p in profiles])
+    t_vec, batch = _timed(lambda: score_churn_batch(*columns))
+    same = bool((np.asarray(scalar) == batch).all())
+
+    print(f"Churn risk for {guests:,} guests")
+    print(f"{'Path':<40} {'Seconds':>9} {'Guests/sec':>14}")
+    print("-" * 65)
+    for label, t in (("calculate_churn_risk (per profile)", t_loop),
+                     ("score_churn_batch (columnar)", t_vec)):
+        print(f"{label:<40} {t:>9.3f} {guests / t:>14,.0f}")
+    print(f"\nSpeed-up: {t_loop / t_vec:.1f}x   Values identical: {same}")
+
+
+def bench_segments(rows: int, chunk_size: int) -> None:
+    """
+    classify_segment per stay vs the batch classifier, over a streamed
+    extract.  Rows are generated lazily a chunk at a time; both paths are
+    timed on the same chunk, so row generation is excluded from the rates.
+    """
+    import itertools
+
+    import numpy as np
+
+    from engagement_engine import classify_segment
+    from vectorized_scoring import (
+        SEGMENT_CODES,
+        classify_segments_batch,
+        random_stays,
+        stay_features,
+    )
+
+    index = {seg: i for i, seg in enumerate(SEGMENT_CODES)}
+    loop_counts = np.zeros(len(SEGMENT_CODES), dtype=np.int64)
+    batch_counts = np.zeros(len(SEGMENT_CODES), dtype=np.int64)
+    t_loop = t_batch = 0.0
+
+    stream = random_stays(rows)
+    t0 = time.perf_counter()
+    while chunk := list(itertools.islice(stream, chunk_size)):
+        t, codes = _timed(lambda: [index[classify_segment(s)] for s in chunk])
+        t_loop += t
+        loop_counts += np.bincount(codes, minlength=len(SEGMENT_CODES))
+        t, codes = _timed(lambda: classify_segments_batch(stay_features(chunk)))
+        t_batch += t
+        batch_counts += np.bincount(codes, minlength=len(SEGMENT_CODES))
+    t_total = time.perf_counter() - t0
+
+    print(f"Segment classification, {rows:,} streamed stays (chunks of {chunk_size:,})")
+    print(f"{'Path':<40} {'Seconds':>9} {'Rows/sec':>12}")
+    print("-" * 63)
+    for label, t in (("classify_segment (per stay)", t_loop),
+                     ("stay_features + classify_segments_batch", t_batch)):
+        print(f"{label:<40} {t:>9.3f} {rows / t:>12,.0f}")
+    print(f"\nWall time incl. row generation: {t_total:.2f}s")
+    print("Segment counts:")
+    for seg, n in zip(SEGMENT_CODES, batch_counts):
+        print(f"  {seg.value:<28} {n:>10,}")
+    print(f"Counts identical across paths: {bool((loop_counts == batch_counts).all())}")
+
+
+def bench_scheduler(guests: int) -> None:
+    """
+    Daily tick cost vs replanning the active base, and a full-journey check
+    that ticking day by day produces the same triggers as up-front plans.
+    """
+    from datetime import date, timedelta
+
+    from journey_scheduler import JourneyScheduler
+
+    start = date(2026, 1, 1)
+    window = 90                                   # checkouts spread over 90 days
+    profiles = _sample_profiles(guests)
+    plans = build_trigger_plans(profiles)
+
+    scheduler = JourneyScheduler()
+    for i, p in enumerate(profiles):
+        scheduler.enroll(p, start + timedelta(days=i % window))
+
+    emitted: dict[str, list] = {}
+    tick_times: list[tuple[float, int, int]] = []   # (seconds, triggers, active)
+    day = start
+    while len(scheduler):
+        active = len(scheduler)
+        t, due = _timed(lambda: scheduler.tick(day))
+        tick_times.append((t, len(due), active))
+        for trigger in due:
+            emitted.setdefault(trigger.guest_id, []).append(trigger)
+        day += timedelta(days=1)
+
+    peak = max(tick_times, key=lambda x: x[2])      # largest active population
+    busiest = max(tick_times, key=lambda x: x[1])   # most triggers due
+    quiet = [x for x in tick_times if x[1] == 0 and x[2]]
+    total_triggers = sum(x[1] for x in tick_times)
+    total_time = sum(x[0] for x in tick_times)
+    t_replan, replans = _timed(lambda: build_trigger_plans(profiles[:peak[2]]))
+
+    print(f"Daily scheduler, {guests:,} guests checking out over {window} days")
+    print(f"{'':<44} {'Seconds':>9} {'Triggers':>10} {'Active':>9}")
+    print("-" * 75)
+    print(f"{'tick, most triggers due':<44} {busiest[0]:>9.4f} {busiest[1]:>10,} {busiest[2]:>9,}")
+    print(f"{'tick, largest active population':<44} {peak[0]:>9.4f} {peak[1]:>10,} {peak[2]:>9,}")
+    if quiet:
+        print(f"{'tick, nothing due (slowest)':<44} {max(q[0] for q in quiet):>9.4f} {0:>10} "
+              f"{max(q[2] for q in quiet):>9,}")
+    print(f"{'replan every active guest (one day)':<44} {t_replan:>9.4f} "
+          f"{sum(map(len, replans)):>10,} {peak[2]:>9,}")
+    print(f"\n{len(tick_times)} ticks, {total_triggers:,} triggers, "
+          f"{total_triggers / total_time:,.0f} triggers/sec while ticking")
+    same = all(_plan_signature(plan) == _plan_signature(emitted.get(p.guest.guest_id, []))
+               for p, plan in zip(profiles, plans))
+    print(f"Triggers identical to build_trigger_plans: {same}")
+
+
+def bench_dispatcher(triggers: int) -> None:
+    """Schedule, cancel and release throughput of the trigger heap."""
+    from datetime import datetime, timedelta
+
+    from engagement_engine import ChannelType, JourneyStage, Trigger
+    from trigger_dispatcher import TriggerDispatcher
+
+    rng = random.Random(11)
+    start = datetime(2026, 1, 1)
+    stages = list(JourneyStage)
+    items = [Trigger(guest_id=f"G{i:08d}", action="send_email", journey_stage=rng.choice(stages),
+                     channel=ChannelType.EMAIL, day_offset=0)
+             for i in range(triggers)]
+    # Send times spread over 90 days at minute resolution, many collisions
+    times = [start + timedelta(minutes=rng.randrange(90 * 24 * 60)) for _ in range(triggers)]
+
+    single = TriggerDispatcher()
+    t_single, handles = _timed(lambda: [single.schedule(t, w) for t, w in zip(items, times)])
+    batch = TriggerDispatcher()
+    t_batch, _ = _timed(lambda: batch.schedule_many(items, times))
+
+    cancel = rng.sample(handles, triggers // 10)
+    t_cancel, _ = _timed(lambda: [single.cancel(h) for h in cancel])
+
+    def release() -> int:
+        released, day = 0, start
+        while single:
+            day += timedelta(days=1)
+            released += len(single.pop_due(day))
+        return released
+
+    t_pop, released = _timed(release)
+
+    print(f"Trigger dispatcher, {triggers:,} triggers over 90 days")
+    print(f"{'Operation':<40} {'Seconds':>9} {'Ops/sec':>12}")
+    print("-" * 63)
+    for label, t, n in (("schedule (one at a time)", t_single, triggers),
+                        ("schedule_many (heapify)", t_batch, triggers),
+                        ("cancel (10%)", t_cancel, len(cancel)),
+                        ("pop_due, daily windows", t_pop, released)):
+        print(f"{label:<40} {t:>9.3f} {n / t:>12,.0f}")
+    print(f"\nReleased {released:,} = scheduled - cancelled: {released == triggers - len(cancel)}")
+
+
+def _outbox_worker(path: str, log_path: str, batch: int) -> None:
+    """Drain the outbox, appending each 'sent' id to a log before marking it."""
+    from trigger_outbox import TriggerOutbox
+
+    outbox = TriggerOutbox(path, lease_seconds=0.5)
+    fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND)
+    while items := outbox.claim("crash-test", limit=batch):
+        os.write(fd, b"".join(b"%d\n" % item.id for item in items))
+        outbox.mark_sent("crash-test", [item.id for item in items])
+    os.close(fd)
+
+
+def bench_outbox(triggers: int, batch: int) -> None:
+    """Enqueue / claim throughput, idempotent re-enqueue and a kill -9 recovery run."""
+    import multiprocessing
+    import signal
+    import tempfile
+    from datetime import datetime, timedelta
+
+    from engagement_engine import ChannelType, JourneyStage, PersonalisedMessage, Trigger
+    from trigger_outbox import TriggerOutbox, remove_database
+
+    rng = random.Random(5)
+    start = datetime(2026, 1, 1, 9)
+    msg = PersonalisedMessage(subject_line="We miss you already", body="Hi there,\n" * 20)
+    stages = list(JourneyStage)
+    entries = [(Trigger(guest_id=f"G{i // 6:08d}", action="send_email", journey_stage=stages[i % 6],
+                        channel=ChannelType.EMAIL, day_offset=0, message=msg),
+                f"S{i // 6:08d}", start + timedelta(minutes=rng.randrange(60 * 24)))
+               for i in range(triggers)]
+
+    tmp = tempfile.mkdtemp(prefix="novastar-outbox-")
+    path = os.path.join(tmp, "outbox.db")
+    outbox = TriggerOutbox(path)
+
+    def enqueue_all() -> int:
+        return sum(outbox.enqueue(entries[i:i + 5_000]) for i in range(0, triggers, 5_000))
+
+    t_enq, inserted = _timed(enqueue_all)
+    t_dup, dup = _timed(enqueue_all)
+
+    def drain() -> int:
+        done = 0
+        while items := outbox.claim("bench", limit=batch, now=start + timedelta(days=1)):
+            outbox.mark_sent("bench", [item.id for item in items])
+            done += len(items)
+        return done
+
+    t_claim, drained = _timed(drain)
+    outbox.close()
+
+    print(f"Trigger outbox (SQLite WAL), {triggers:,} triggers, claim batches of {batch}")
+    print(f"{'Operation':<40} {'Seconds':>9} {'Rows/sec':>12}")
+    print("-" * 63)
+    for label, t, n in (("enqueue (5,000 per transaction)", t_enq, triggers),
+                        ("re-enqueue same plans (all ignored)", t_dup, triggers),
+                        ("claim + mark_sent", t_claim, drained)):
+        print(f"{label:<40} {t:>9.3f} {n / t:>12,.0f}")
+    print(f"\nInserted {inserted:,}, duplicates inserted {dup}, drained {drained:,}")
+
+    # Crash recovery: kill -9 a worker mid-drain, then let a fresh one resume
+    remove_database(path)
+    outbox = TriggerOutbox(path)
+    outbox.enqueue((t, stay, start) for t, stay, _ in entries)
+    outbox.close()
+    log_path = os.path.join(tmp, "sent.log")
+    worker = multiprocessing.Process(target=_outbox_worker, args=(path, log_path, batch))
+    worker.start()
+    time.sleep(1.0)
+    os.kill(worker.pid, signal.SIGKILL)
+    worker.join()
+    with open(log_path) as fh:
+        before_kill = sum(1 for _ in fh)
+    time.sleep(0.6)                      # let the dead worker's lease expire
+    _outbox_worker(path, log_path, batch)
+
+    with open(log_path) as fh:
+        ids = [int(line) for line in fh]
+    outbox = TriggerOutbox(path)
+    counts = outbox.counts()
+    outbox.close()
+    remove_database(path)
+    duplicates = len(ids) - len(set(ids))
+    print(f"\nkill -9 after {before_kill:,} sends; resumed and drained")
+    print(f"  every trigger sent: {len(set(ids)) == triggers}   "
+          f"re-sent after crash: {duplicates} (at most one claim batch)   states: {counts}")
+
+
+def _unslotted(cls: type) -> type:
+    """A __dict__-backed clone of a data_models dataclass with the original defaults."""
+    import dataclasses
+
+    from datetime import date
+
+    from data_models import _today
+
+    specs = []
+    for f in dataclasses.fields(cls):
+        if f.default_factory is not dataclasses.MISSING:
+            # Original defaults: a fresh date object per field, not the shared one
+            factory = date.today if f.default_factory is _today else f.default_factory
+            specs.append((f.name, f.type, dataclasses.field(default_factory=factory)))
+        else:
+            specs.append((f.name, f.type, dataclasses.field(default=f.default)))
+    return dataclasses.make_dataclass(cls.__name__, specs)
+
+
+def bench_memory(objects: int) -> None:
+    """tracemalloc bytes per instance, original vs slotted data_models classes."""
+    import tracemalloc
+
+    from data_models import Guest, GuestPreferences, Interaction, LoyaltyAccount, Offer, Stay
+
+    def per_object(cls: type) -> float:
+        tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0]
+        items = [cls() for _ in range(objects)]
+        used = tracemalloc.get_traced_memory()[0] - base
+        tracemalloc.stop()
+        del items
+        return used / objects
+
+    print(f"Bytes per instance (tracemalloc, {objects:,} default-constructed objects each)")
+    print(f"{'Class':<18} {'Before':>10} {'After':>10} {'Saved':>8}")
+    print("-" * 49)
+    total_old = total_new = 0.0
+    for cls in (Guest, Stay, GuestPreferences, Interaction, Offer, LoyaltyAccount):
+        old, new = per_object(_unslotted(cls)), per_object(cls)
+        total_old, total_new = total_old + old, total_new + new
+        print(f"{cls.__name__:<18} {old:>10,.0f} {new:>10,.0f} {1 - new / old:>8.0%}")
+    print("-" * 49)
+    print(f"{'All six':<18} {total_old:>10,.0f} {total_new:>10,.0f} {1 - total_new / total_old:>8.0%}")
+
+    guest = Guest(first_name="Ana", last_name="Silva")
+    print(f"\nGuest(...).full_name -> {guest.full_name!r}; has __dict__: {hasattr(guest, '__dict__')}")
+
+
+def _id_batch(n: int) -> list[str]:
+    """n IDs from the default factory inherited across fork."""
+    from ids import new_id
+
+    return [new_id() for _ in range(n)]
+
+
+def bench_ids(ids: int, workers: int) -> None:
+    """ID generation cost, old vs new, and uniqueness/order across forked workers."""
+    import multiprocessing
+
+    from ids import ID_LENGTH, MonotonicIds, new_id, uuid4_id
+
+    monotonic = MonotonicIds()
+    rows = []
+    for label, factory in (("uuid4().hex[:12] (original)", uuid4_id),
+                           ("MonotonicIds()", monotonic),
+                           ("new_id() (default factory)", new_id)):
+        t, _ = _timed(lambda: [factory() for _ in range(ids)])
+        rows.append((label, t))
+
+    print(f"ID generation, {ids:,} IDs")
+    print(f"{'Factory':<40} {'Seconds':>9} {'ns/ID':>9} {'IDs/sec':>12}")
+    print("-" * 72)
+    for label, t in rows:
+        print(f"{label:<40} {t:>9.3f} {t / ids * 1e9:>9.0f} {ids / t:>12,.0f}")
+
+    # Collisions: every worker is forked after the parent has used new_id(),
+    # so they would share a stream if the fork hook did not reseed them.
+    new_id()
+    per_worker = ids // workers
+    with multiprocessing.get_context("fork").Pool(workers) as pool:
+        batches = pool.map(_id_batch, [per_worker] * workers)
+    generated = [i for batch in batches for i in batch]
+    distinct = len(set(generated))
+    ordered = all(batch == sorted(batch) for batch in batches)
+    print(f"\n{workers} forked workers x {per_worker:,} IDs: {distinct:,} distinct of "
+          f"{len(generated):,}   each worker's IDs in creation order: {ordered}   "
+          f"length {ID_LENGTH}: {all(len(i) == ID_LENGTH for i in generated)}")
+
+    print("\nExpected collisions with 48 random bits (birthday bound n^2 / 2^49):")
+    for n in (10**6, 10**7, 10**8, 10**9):
+        print(f"  {n:>13,} IDs -> {n * (n - 1) / 2**49:>12,.3f}")
+
+
+def bench_interactions(events: int) -> None:
+    """Interaction log ingest rate and one day's dashboard counts, mmap scan vs objects."""
+    import shutil
+    import tempfile
+    from collections import Counter
+    from datetime import date, datetime, timedelta
+
+    from data_models import ChannelType, Interaction, InteractionType, JourneyStage
+    from interaction_log import InteractionLog, day_window
+
+    rng = random.Random(9)
+    types, channels, stages = list(InteractionType), list(ChannelType), list(JourneyStage)
+    start, days = datetime(2026, 3, 1), 7
+    log_events = [
+        Interaction(guest_id=f"G{rng.randrange(events // 10 + 1):08d}",
+                    timestamp=start + timedelta(microseconds=rng.randrange(days * 86_400 * 10**6)),
+                    interaction_type=rng.choice(types), channel=rng.choice(channels),
+                    journey_stage=rng.choice(stages),
+                    campaign_id=rng.choice((None, "CAMP-Q1-NOSTALGIA", "CAMP-Q1-WINBACK")))
+        for _ in range(events)
+    ]
+    tmp = tempfile.mkdtemp(prefix="novastar-interactions-")
+    try:
+        log = InteractionLog(tmp, segment_bytes=16 << 20)
+
+        def ingest() -> None:
+            log.append_many(log_events)
+            log.flush()
+
+        t_ingest, _ = _timed(ingest)
+        lo, hi = day_window(date(2026, 3, 4))
+        log.counts("type", lo, hi)                     # warm the page cache and NumPy import
+        t_scan, by_type = _timed(lambda: log.counts("type", lo, hi))
+        t_objects, objects = _timed(lambda: Counter(i.interaction_type for i in log.interactions(lo, hi)))
+        segments = len(log.segments())
+        log.close()
+    finally:
+        shutil.rmtree(tmp)
+
+    day = sum(by_type.values())
+    print(f"Interaction log, {events:,} events over {days} days, {segments} segment files")
+    print(f"{'Operation':<44} {'Seconds':>9} {'Events/sec':>12}")
+    print("-" * 67)
+    print(f"{'append_many + flush':<44} {t_ingest:>9.3f} {events / t_ingest:>12,.0f}")
+    print(f"{'one day by type: rebuild Interaction objects':<44} {t_objects:>9.3f} {day / t_objects:>12,.0f}")
+    print(f"{'one day by type: mmap columns + bincount':<44} {t_scan:>9.3f} {day / t_scan:>12,.0f}")
+    print(f"\n{day:,} events that day; counts identical: {by_type == {t: objects[t] for t in types}}")
+
+
+def bench_storage(stays: int) -> None:
+    """SQLite bulk upsert, re-upsert and streaming load of `stays` Stay rows."""
+    import tempfile
+    from datetime import date, timedelta
+
+    from data_models import BookingChannel, Stay
+    from storage import _MAPS, Storage
+    from trigger_outbox import remove_database
+
+    rng = random.Random(21)
+    channels = list(BookingChannel)
+    first = date(2025, 1, 1)
+    records = []
+    for i in range(stays):
+        nights = rng.randint(1, 14)
+        check_in = first + timedelta(days=rng.randrange(365))
+        rate = round(rng.uniform(89, 420), 2)
+        records.append(Stay(
+            stay_id=f"S{i:09d}", guest_id=f"G{rng.randrange(stays // 3 + 1):09d}",
+            property_name="NovaStar " + (city := rng.choice(_CITIES)), property_city=city,
+            check_in=check_in, check_out=check_in + timedelta(days=nights), nights=nights,
+            rate_per_night=rate, total_spend=round(rate * nights, 2),
+            booking_channel=rng.choice(channels), trip_purpose=rng.choice(("", "leisure", "conference")),
+            nps_score=rng.choice((None, 7, 9, 10)), amenities_used=rng.sample(["spa", "pool", "gym"], 2),
+        ))
+
+    path = os.path.join(tempfile.mkdtemp(prefix="novastar-storage-"), "novastar.db")
+    db = Storage(path)
+    t_insert, _ = _timed(lambda: db.upsert(records))
+    for r in records[::10]:
+        r.nps_score = 10
+    t_update, _ = _timed(lambda: db.upsert(records))
+    t_stream, loaded = _timed(lambda: sum(1 for _ in db.stream(Stay)))
+    lo, hi = date(2025, 6, 1), date(2025, 6, 8)
+    t_window, window = _timed(lambda: list(db.stays_checked_out(lo, hi)))
+    expected = sorted((r for r in records if lo <= r.check_out < hi), key=lambda r: r.stay_id)
+    window_ok = sorted(window, key=lambda r: r.stay_id) == expected
+    gets = rng.sample(records, min(1_000, stays))
+    sample_ok = all(db.get(Stay, r.stay_id) == r for r in gets)
+    db.close()
+
+    # Naive baseline on a slice: one autocommitted INSERT per row
+    remove_database(path)
+    sample = records[: min(stays, 20_000)]
+    db = Storage(path)
+    table = _MAPS[Stay]
+
+    def one_by_one() -> None:
+        with db._lock:
+            for r in sample:
+                db._db.execute(table.upsert_sql, table.encode(r))
+
+    t_rows, _ = _timed(one_by_one)
+    db.close()
+    remove_database(path)
+
+    print(f"SQLite storage, {stays:,} stays")
+    print(f"{'Operation':<44} {'Seconds':>9} {'Rows/sec':>12}")
+    print("-" * 67)
+    for label, t, n in ((f"autocommit per row ({len(sample):,}-row slice)", t_rows, len(sample)),
+                        ("upsert (executemany, new rows)", t_insert, stays),
+                        ("upsert again (10% changed, all conflict)", t_update, stays),
+                        ("stream back as Stay objects", t_stream, loaded),
+                        ("one week of check-outs (indexed)", t_window, len(window))):
+        print(f"{label:<44} {t:>9.3f} {n / t:>12,.0f}")
+    print(f"\nLoaded {loaded:,} rows; window query matches scan: {window_ok}; "
+          f"{len(gets):,} random gets round-trip: {sample_ok}")
+
+
+def bench_export(events: int) -> None:
+    """One day of the interaction log to the warehouse: repr lines vs Arrow / Parquet."""
+    import shutil
+    import tempfile
+    from datetime import date, datetime, timedelta
+
+    from columnar_export import interaction_log_table, read_table, write_table
+    from data_models import ChannelType, Interaction, InteractionType, JourneyStage
+    from interaction_log import InteractionLog, day_window
+
+    rng = random.Random(22)
+    types, channels, stages = list(InteractionType), list(ChannelType), list(JourneyStage)
+    start = datetime(2026, 3, 1)
+    tmp = tempfile.mkdtemp(prefix="novastar-export-")
+    try:
+        log = InteractionLog(os.path.join(tmp, "log"))
+        log.append_many(
+            Interaction(guest_id=f"G{rng.randrange(events // 10 + 1):08d}",
+                        timestamp=start + timedelta(microseconds=rng.randrange(86_400 * 10**6)),
+                        interaction_type=rng.choice(types), channel=rng.choice(channels),
+                        journey_stage=rng.choice(stages), campaign_id=rng.choice((None, "CAMP-Q1")))
+            for _ in range(events)
+        )
+        log.flush()
+        lo, hi = day_window(date(2026, 3, 1))
+
+        def as_repr() -> int:
+            path = os.path.join(tmp, "day.txt")
+            with open(path, "w") as fh:
+                for interaction in log.interactions(lo, hi):
+                    fh.write(repr(interaction) + "\n")
+            return os.path.getsize(path)
+
+        def as_file(name: str) -> int:
+            path = os.path.join(tmp, name)
+            write_table(interaction_log_table(log, lo, hi), path)
+            return os.path.getsize(path)
+
+        rows = []
+        for label, fn in (("repr() per Interaction", as_repr),
+                          ("Arrow IPC (interaction_log_table)", lambda: as_file("day.arrow")),
+                          ("Parquet zstd (interaction_log_table)", lambda: as_file("day.parquet"))):
+            t, size = _timed(fn)
+            rows.append((label, t, size))
+        t_read, table = _timed(lambda: read_table(os.path.join(tmp, "day.arrow")))
+        by_type = table.column("interaction_type").value_counts().to_pylist()
+        counts_ok = ({d["values"]: d["counts"] for d in by_type}
+                     == {t.value: n for t, n in log.counts("type", lo, hi).items() if n})
+        log.close()
+    finally:
+        shutil.rmtree(tmp)
+
+    print(f"One day of the interaction log, {events:,} events")
+    print(f"{'Export':<40} {'Seconds':>9} {'Events/sec':>12} {'MB':>8}")
+    print("-" * 72)
+    for label, t, size in rows:
+        print(f"{label:<40} {t:>9.3f} {events / t:>12,.0f} {size / 1e6:>8.1f}")
+    print(f"\nArrow file memory-mapped back in {t_read * 1e3:.1f} ms; "
+          f"{table.num_rows:,} rows, per-type counts match the log: {counts_ok}")
+
+
+def bench_identity(people: int) -> None:
+    """Nightly identity resolution over `people` persons with OTA-masked duplicate records."""
+    from datetime import date, timedelta
+
+    from data_models import Guest, Stay
+    from identity_resolution import build_records, resolve, score_pair
+
+    rng = random.Random(24)
+    syllables = ["an", "ber", "cal", "dor", "el", "fin", "gar", "hol", "is", "jen",
+                 "kov", "lan", "mor", "nes", "ol", "per", "quin", "ros", "son", "tan"]
+    last_names = ["Smith", "Garcia", "Chen", "Johnson"] + [
+        (a + b + c).capitalize() for a in syllables for b in syllables for c in syllables[:12]]
+    first_names = ["James", "Maria", "Wei", "Aisha", "Lukas", "Sofia", "Kenji", "Olivia", "Mateo",
+                   "Priya", "Noah", "Emma", "Omar", "Chloe", "Ivan", "Yuki", "Lena", "Diego"]
+    first = date(2025, 1, 1)
+    guests: list[Guest] = []
+    stays: list[Stay] = []
+    tokens: dict[str, str] = {}
+    person_of: dict[str, int] = {}
+
+    def add_stay(guest_id: str, city: str, check_in: date, card: str | None) -> None:
+        stay = Stay(stay_id=f"S{len(stays):09d}", guest_id=guest_id, property_city=city,
+                    check_in=check_in, check_out=check_in + timedelta(days=2))
+        stays.append(stay)
+        if card:
+            tokens[stay.stay_id] = card
+
+    for p in range(people):
+        fn = rng.choice(first_names)
+        ln = rng.choice(last_names) if rng.random() > 0.05 else rng.choice(last_names[:4])
+        phone = f"{rng.randrange(200, 999)}{rng.randrange(10**7):07d}"
+        card = f"tok_{p:08d}_{rng.randrange(10**6)}"
+        gid = f"G{len(guests):09d}"
+        guests.append(Guest(guest_id=gid, first_name=fn, last_name=ln,
+                            email=f"{fn}.{ln}{p}@example.com".lower(), phone=f"+1 {phone}"))
+        person_of[gid] = p
+        home_stays = []
+        for _ in range(rng.randint(1, 4)):
+            city, day = rng.choice(_CITIES), first + timedelta(days=rng.randrange(365))
+            add_stay(gid, city, day, card if rng.random() < 0.8 else None)
+            home_stays.append((city, day))
+        if rng.random() < 0.45:                         # later OTA bookings, email masked
+            for _ in range(rng.randint(1, 3)):
+                gid = f"G{len(guests):09d}"
+                variant = ln.upper() if rng.random() < 0.3 else ln
+                if rng.random() < 0.1:
+                    variant = variant[:-1]              # typo: truncated surname
+                guests.append(Guest(
+                    guest_id=gid, first_name=fn if rng.random() < 0.8 else fn[0], last_name=variant,
+                    email=None if rng.random() < 0.7 else f"x{rng.randrange(10**9)}@guest.booking.com",
+                    phone=rng.choice((f"({phone[:3]}) {phone[3:6]}-{phone[6:]}", None, phone)),
+                ))
+                person_of[gid] = p
+                if rng.random() < 0.3:                  # extension / second room next to a direct stay
+                    city, day = rng.choice(home_stays)
+                    day += timedelta(days=rng.choice((-1, 0, 1)))
+                else:
+                    city, day = rng.choice(_CITIES), first + timedelta(days=rng.randrange(365))
+                add_stay(gid, city, day, card if rng.random() < 0.5 else None)
+
+    t_resolve, result = _timed(lambda: resolve(guests, stays, tokens))
+
+    # Pairwise precision / recall against the generating person
+    def pairs(n: int) -> int:
+        return n * (n - 1) // 2
+
+    true_sizes: dict[int, int] = {}
+    for p in person_of.values():
+        true_sizes[p] = true_sizes.get(p, 0) + 1
+    tp = predicted = 0
+    for ids in result.clusters:
+        predicted += pairs(len(ids))
+        overlap: dict[int, int] = {}
+        for gid in ids:
+            overlap[person_of[gid]] = overlap.get(person_of[gid], 0) + 1
+        tp += sum(pairs(k) for k in overlap.values())
+    actual = sum(pairs(k) for k in true_sizes.values())
+    masked = sum(1 for g in guests if g.email is None or "guest.booking" in g.email)
+    linked = sum(1 for g in guests if (g.email is None or "guest.booking" in g.email)
+                 and any(person_of[o] == person_of[g.guest_id] and o != g.guest_id
+                         for o in result.cluster_of[g.guest_id]))
+
+    # Naive baseline: score every pair of a slice, extrapolated to the full set
+    sample = build_records(guests[:3_000], stays, tokens)
+    t_slice, _ = _timed(lambda: [score_pair(a, b) for i, a in enumerate(sample) for b in sample[i + 1:]])
+    t_naive = t_slice * pairs(len(guests)) / pairs(len(sample))
+
+    print(f"Identity resolution, {people:,} people -> {len(guests):,} guest records, {len(stays):,} stays")
+    print(f"{'Method':<44} {'Seconds':>10} {'Pairs scored':>16}")
+    print("-" * 72)
+    print(f"{'all pairs (extrapolated from 3,000 records)':<44} {t_naive:>10,.0f} {pairs(len(guests)):>16,}")
+    print(f"{'blocking + union-find (resolve)':<44} {t_resolve:>10.2f} {result.candidate_pairs:>16,}")
+    print(f"\n{len(result.clusters):,} clusters for {people:,} people; "
+          f"precision {tp / max(predicted, 1):.3f}, recall {tp / max(actual, 1):.3f}; "
+          f"{linked:,} of {masked:,} masked records linked to their profile; "
+          f"{result.skipped_blocks:,} oversized blocks skipped")
+
+
+def bench_metrics(events: int) -> None:
+    """Dashboard panel reads: incremental window counters vs rescanning the history."""
+    from datetime import datetime, timedelta
+
+    from data_models import ChannelType, Interaction, InteractionType, JourneyStage
+    from metrics_aggregator import MetricsAggregator
+
+    rng = random.Random(25)
+    types, channels, stages = list(InteractionType), list(ChannelType), list(JourneyStage)
+    segments = list(GuestSegment)
+    guests = [f"G{i:07d}" for i in range(max(events // 20, 1))]
+    segment_of = {g: rng.choice(segments) for g in guests}
+    campaigns = [None] + [f"CAMP-{i:02d}" for i in range(12)]
+    start = datetime(2026, 3, 1)
+    span_us = 36 * 3600 * 10**6                 # a day and a half, so windows roll over
+    history = [
+        Interaction(guest_id=rng.choice(guests), campaign_id=rng.choice(campaigns),
+                    timestamp=start + timedelta(microseconds=u), interaction_type=rng.choice(types),
+                    channel=rng.choice(channels), journey_stage=rng.choice(stages))
+        for u in sorted(rng.randrange(span_us) for _ in range(events))
+    ]
+    now = history[-1].timestamp
+
+    agg = MetricsAggregator(segment_of)
+    t_ingest, _ = _timed(lambda: agg.add_many(history))
+
+    # The panel queries a refresh issues: per-campaign open rate over the
+    # last hour, channel mix this hour, per-segment sends over 24 hours
+    window_start = now.replace(minute=0, second=0, microsecond=0) - timedelta(hours=23)
+    hour_start = now.replace(minute=0, second=0, microsecond=0)
+    minute_start = now.replace(second=0, microsecond=0) - timedelta(minutes=59)
+
+    def rescan() -> list:
+        out = []
+        for c in campaigns:
+            opened = sent = 0
+            for i in history:
+                if i.timestamp >= minute_start and i.campaign_id == c:
+                    opened += i.interaction_type is InteractionType.EMAIL_OPENED
+                    sent += i.interaction_type is InteractionType.EMAIL_SENT
+            out.append(opened / sent if sent else 0.0)
+        for ch in channels:
+            out.append(sum(1 for i in history if i.timestamp >= hour_start and i.channel is ch))
+        for seg in segments:
+            out.append(sum(1 for i in history if i.timestamp >= window_start
+                           and i.interaction_type is InteractionType.EMAIL_SENT
+                           and segment_of[i.guest_id] is seg))
+        return out
+
+    def lookup() -> list:
+        realtime, hour, day = agg.realtime.total(), agg.hourly.bucket(), agg.hourly.total()
+        out = [realtime.rate(InteractionType.EMAIL_OPENED, InteractionType.EMAIL_SENT, campaign=c)
+               for c in campaigns]
+        out += [sum(hour.by_type(channel=ch).values()) for ch in channels]
+        out += [day.count(InteractionType.EMAIL_SENT, segment=seg) for seg in segments]
+        return out
+
+    t_rescan, expected = _timed(rescan)
+    reads = 10_000
+    t_lookup, got = _timed(lambda: [lookup() for _ in range(reads)][-1])
+    panel_queries = len(campaigns) + len(channels) + len(segments)
+
+    print(f"Dashboard metrics, {events:,} interactions over 36 hours")
+    print(f"{'Operation':<44} {'Seconds':>10} {'Per second':>14}")
+    print("-" * 70)
+    print(f"{'ingest (MetricsAggregator.add)':<44} {t_ingest:>10.3f} {events / t_ingest:>14,.0f}")
+    print(f"{'panel refresh, rescan history':<44} {t_rescan:>10.3f} {1 / t_rescan:>14,.1f}")
+    print(f"{'panel refresh, window lookups':<44} {t_lookup / reads:>10.6f} {reads / t_lookup:>14,.0f}")
+    print(f"\n{panel_queries} panel queries per refresh; lookups match the rescan: {got == expected}; "
+          f"{sum(agg.pipeline().values()):,} guests in the stage pipeline")
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="NovaStar engine benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("cohort", help="cohort trigger-plan throughput")
+    p.add_argument("--guests", type=int, default=20_000)
+    p.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+
+    p = sub.add_parser("offers", help="per-offer cost with and without the template cache")
+    p.add_argument("--offers", type=int, default=200_000)
+
+    p = sub.add_parser("churn", help="batch churn scoring vs per-profile (needs NumPy)")
+    p.add_argument("--guests", type=int, default=1_000_000)
+
+    p = sub.add_parser("segments", help="streamed batch segment classification (needs NumPy)")
+    p.add_argument("--rows", type=int, default=1_000_000)
+    p.add_argument("--chunk-size", type=int, default=100_000)
+
+    p = sub.add_parser("scheduler", help="daily tick cost vs replanning the active base")
+    p.add_argument("--guests", type=int, default=90_000)
+
+    p = sub.add_parser("dispatcher", help="trigger heap schedule/cancel/release throughput")
+    p.add_argument("--triggers", type=int, default=1_000_000)
+
+    p = sub.add_parser("outbox", help="SQLite outbox throughput and kill -9 recovery")
+    p.add_argument("--triggers", type=int, default=200_000)
+    p.add_argument("--batch", type=int, default=500)
+
+    p = sub.add_parser("memory", help="bytes per data_models instance, dict vs slots")
+    p.add_argument("--objects", type=int, default=50_000)
+
+    p = sub.add_parser("ids", help="ID generator cost and cross-process uniqueness")
+    p.add_argument("--ids", type=int, default=1_000_000)
+    p.add_argument("--workers", type=int, default=4)
+
+    p = sub.add_parser("interactions", help="interaction log ingest and day-scan rates")
+    p.add_argument("--events", type=int, default=1_000_000)
+
+    p = sub.add_parser("storage", help="SQLite bulk upsert and streaming load")
+    p.add_argument("--stays", type=int, default=1_000_000)
+
+    p = sub.add_parser("export", help="interaction-log day export, repr vs Arrow/Parquet")
+    p.add_argument("--events", type=int, default=1_000_000)
+
+    p = sub.add_parser("identity", help="blocked identity resolution vs all-pairs matching")
+    p.add_argument("--people", type=int, default=80_000)
+
+    p = sub.add_parser("metrics", help="dashboard panel reads, window counters vs rescans")
+    p.add_argument("--events", type=int, default=1_000_000)
+
+    args = parser.parse_args()
+    if args.bench == "cohort":
+        bench_cohort(args.guests, args.workers)
+    elif args.bench == "offers":
+        bench_offers(args.offers)
+    elif args.bench == "churn":
+        bench_churn(args.guests)
+    elif args.bench == "segments":
+        bench_segments(args.rows, args.chunk_size)
+    elif args.bench == "scheduler":
+        bench_scheduler(args.guests)
+    elif args.bench == "dispatcher":
+        bench_dispatcher(args.triggers)
+    elif args.bench == "outbox":
+        bench_outbox(args.triggers, args.batch)
+    elif args.bench == "memory":
+        bench_memory(args.objects)
+    elif args.bench == "ids":
+        bench_ids(args.ids, args.workers)
+    elif args.bench == "interactions":
+        bench_interactions(args.events)
+    elif args.bench == "storage":
+        bench_storage(args.stays)
+    elif args.bench == "export":
+        bench_export(args.events)
+    elif args.bench == "identity":
+        bench_identity(args.people)
+    elif args.bench == "metrics":
+        bench_metrics(args.events)
+
+
+if __name__ == "__main__":
+    main()
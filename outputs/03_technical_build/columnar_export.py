@@ -0,0 +1,428 @@
+"""
+NovaStar Hotels -- Columnar Export (Arrow / Parquet)
+=====================================================
+Bulk hand-off of guests, stays and interactions to the analytics
+warehouse as Apache Arrow tables, written as Arrow IPC (`.arrow`) or
+Parquet (`.parquet`).
+
+  - enums (segment, booking channel, tier, journey stage, interaction
+    type, channel) -> dictionary<int8, string> columns whose indices are
+    the repo's enum codes (definition order, as in `vectorized_scoring`
+    and `interaction_log`) and whose dictionary holds the enum values
+  - repeated strings (ids, cities, room types) -> dictionary columns
+  - dates -> date32, timestamps -> timestamp[us]
+
+Three sources are supported:
+
+    guests_table(guests) / stays_table(stays) / interactions_table(...)
+        dataclass collections, one pass per column
+    guest_store_table(store)
+        a `GuestStore`, converted column by column
+    interaction_log_table(log, start, end)
+        a window of `InteractionLog`; e.g. one day of events as one table,
+        one bulk write
+
+and the import side feeds the engine's batch APIs without per-row work:
+`read_table()` memory-maps IPC files, and `churn_columns_from_table()` /
+`stay_features_from_table()` hand back NumPy views of the Arrow buffers
+(zero-copy when the table has one chunk, no nulls and the repo's
+dictionary order -- otherwise one vectorized copy or code remap).
+
+    write_table(guest_store_table(store), "guests.parquet")
+    table = read_table("guests.arrow")
+    risk = score_churn_batch(*churn_columns_from_table(table, today))
+
+Requires NumPy and pyarrow.  Python 3.10+.
+"""
+
+from __future__ import annotations
+
+import argparse
+from collections.abc import Iterable, Sequence
+from datetime import date, datetime
+from enum import Enum
+
+import numpy as np
+
+from data_models import BookingChannel, Guest, Interaction, LoyaltyTier, Stay
+from engagement_engine import _is_group_purpose, _uses_family_amenity
+from guest_store import GuestStore
+from interaction_log import _DTYPE_FIELDS as _EVENT_FIELDS
+from interaction_log import (
+    CHANNEL_CODES as INTERACTION_CHANNEL_CODES,
+    INTERACTION_TYPE_CODES,
+    STAGE_CODES,
+    InteractionLog,
+)
+from vectorized_scoring import CHANNEL_CODES, SEGMENT_CODES, TIER_CODES, StayFeatures
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+def _pyarrow():
+    try:
+        import pyarrow as pa
+        import pyarrow.ipc as ipc
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise RuntimeError("columnar export requires pyarrow (pip install pyarrow)") from exc
+    return pa, ipc, pq
+
+
+# ---------------------------------------------------------------------------
+# Column builders
+# ---------------------------------------------------------------------------
+
+def _enum_column(codes: np.ndarray, members: Sequence[Enum]):
+    """Dictionary column over all members, indices = repo codes (-1 -> null)."""
+    pa, _, _ = _pyarrow()
+    codes = np.asarray(codes, dtype=np.int8)
+    indices = pa.array(codes, mask=codes < 0) if (codes < 0).any() else pa.array(codes)
+    return pa.DictionaryArray.from_arrays(indices, pa.array([m.value for m in members]))
+
+
+def _interned_column(codes: np.ndarray, values: Sequence[str]):
+    """
+    Dictionary column from interned-string codes (-1 -> null), with the
+    dictionary cut down to the strings this column actually uses.
+    """
+    pa, _, _ = _pyarrow()
+    codes = np.asarray(codes, dtype=np.int32)
+    used, indices = np.unique(codes, return_inverse=True)
+    indices = indices.astype(np.int32)
+    if len(used) and used[0] < 0:            # null sorts first; shift it out
+        indices -= 1
+        used = used[1:]
+    dictionary = pa.array([values[c] for c in used], pa.string())
+    mask = indices < 0
+    return pa.DictionaryArray.from_arrays(pa.array(indices, mask=mask) if mask.any() else pa.array(indices),
+                                          dictionary)
+
+
+def _string_column(values: list[str | None]):
+    """Dictionary-encode a Python string column (ids repeat across rows)."""
+    pa, _, _ = _pyarrow()
+    return pa.array(values, pa.string()).dictionary_encode()
+
+
+def _date_column(days: np.ndarray):
+    pa, _, _ = _pyarrow()
+    return pa.array(np.asarray(days, dtype=np.int32)).view(pa.date32())
+
+
+def _enum_codes(values: Iterable[Enum], members: Sequence[Enum]) -> np.ndarray:
+    index = {m: i for i, m in enumerate(members)}
+    return np.fromiter((index[v] if v is not None else -1 for v in values), np.int8)
+
+
+def _days(values: Iterable[date]) -> np.ndarray:
+    return np.fromiter((d.toordinal() - _EPOCH_ORDINAL for d in values), np.int32)
+
+
+# ---------------------------------------------------------------------------
+# Export: dataclasses
+# ---------------------------------------------------------------------------
+
+def guests_table(guests: Iterable[Guest]):
+    pa, _, _ = _pyarrow()
+    guests = guests if isinstance(guests, list) else list(guests)
+    return pa.table({
+        "guest_id": pa.array([g.guest_id for g in guests], pa.string()),
+        "first_name": pa.array([g.first_name for g in guests], pa.string()),
+        "last_name": pa.array([g.last_name for g in guests], pa.string()),
+        "email": pa.array([g.email for g in guests], pa.string()),
+        "phone": pa.array([g.phone for g in guests], pa.string()),
+        "segment": _enum_column(_enum_codes((g.segment for g in guests), SEGMENT_CODES), SEGMENT_CODES),
+        "has_app": pa.array([g.has_app for g in guests], pa.bool_()),
+        "data_capture_complete": pa.array([g.data_capture_complete for g in guests], pa.bool_()),
+        "created_at": pa.array([g.created_at for g in guests], pa.timestamp("us")),
+    })
+
+
+def stays_table(stays: Iterable[Stay]):
+    pa, _, _ = _pyarrow()
+    stays = stays if isinstance(stays, list) else list(stays)
+    return pa.table({
+        "stay_id": pa.array([s.stay_id for s in stays], pa.string()),
+        "guest_id": pa.array([s.guest_id for s in stays], pa.string()),
+        "property_name": _string_column([s.property_name for s in stays]),
+        "property_city": _string_column([s.property_city for s in stays]),
+        "check_in": _date_column(_days(s.check_in for s in stays)),
+        "check_out": _date_column(_days(s.check_out for s in stays)),
+        "nights": pa.array([s.nights for s in stays], pa.int16()),
+        "room_type": _string_column([s.room_type for s in stays]),
+        "rate_per_night": pa.array([s.rate_per_night for s in stays], pa.float64()),
+        "total_spend": pa.array([s.total_spend for s in stays], pa.float64()),
+        "booking_channel": _enum_column(_enum_codes((s.booking_channel for s in stays), CHANNEL_CODES),
+                                        CHANNEL_CODES),
+        "trip_purpose": _string_column([s.trip_purpose for s in stays]),
+        "nps_score": pa.array([s.nps_score for s in stays], pa.int8()),
+        "amenities_used": pa.array([s.amenities_used for s in stays], pa.list_(pa.string())),
+    })
+
+
+def interactions_table(interactions: Iterable[Interaction]):
+    """Interactions, without the free-form `metadata` dict."""
+    pa, _, _ = _pyarrow()
+    rows = interactions if isinstance(interactions, list) else list(interactions)
+    return pa.table({
+        "interaction_id": pa.array([i.interaction_id for i in rows], pa.string()),
+        "guest_id": _string_column([i.guest_id for i in rows]),
+        "timestamp": pa.array([i.timestamp for i in rows], pa.timestamp("us")),
+        "interaction_type": _enum_column(_enum_codes((i.interaction_type for i in rows),
+                                                     INTERACTION_TYPE_CODES), INTERACTION_TYPE_CODES),
+        "channel": _enum_column(_enum_codes((i.channel for i in rows), INTERACTION_CHANNEL_CODES),
+                                INTERACTION_CHANNEL_CODES),
+        "journey_stage": _enum_column(_enum_codes((i.journey_stage for i in rows), STAGE_CODES),
+                                      STAGE_CODES),
+        "campaign_id": _string_column([i.campaign_id for i in rows]),
+        "offer_id": _string_column([i.offer_id for i in rows]),
+    })
+
+
+# ---------------------------------------------------------------------------
+# Export: columnar sources
+# ---------------------------------------------------------------------------
+
+def guest_store_table(store: GuestStore):
+    """
+    One row per guest: guest, latest stay and loyalty columns.  Interned
+    strings become dictionary columns over the store's string table;
+    guests without a stay / account get nulls in those columns.
+    """
+    pa, _, _ = _pyarrow()
+    col, values = store.column, store.strings.values
+    has_stay, has_loyalty = col("has_stay"), col("has_loyalty")
+
+    def interned(name: str, present: np.ndarray | None = None):
+        codes = col(name)
+        return _interned_column(codes if present is None else np.where(present, codes, -1), values)
+
+    def masked(name: str, present: np.ndarray):
+        return pa.array(col(name), mask=~present)
+
+    def dates(name: str, present: np.ndarray):
+        return pa.array(col(name), mask=~present).view(pa.date32())
+
+    tier = np.where(has_loyalty, col("tier"), TIER_CODES.index(LoyaltyTier.NONE))
+    nps = col("nps_score")
+    return pa.table({
+        "guest_id": interned("guest_id"),
+        "first_name": interned("first_name"),
+        "last_name": interned("last_name"),
+        "email": interned("email"),
+        "phone": interned("phone"),
+        "segment": _enum_column(col("segment"), SEGMENT_CODES),
+        "has_app": pa.array(col("has_app")),
+        "data_capture_complete": pa.array(col("data_capture_complete")),
+        "created_at": pa.array(col("created_at")),
+        "engagement_score": pa.array(col("engagement_score")),
+        "stay_id": interned("stay_id", has_stay),
+        "property_name": interned("property_name", has_stay),
+        "property_city": interned("property_city", has_stay),
+        "check_in": dates("check_in", has_stay),
+        "check_out": dates("check_out", has_stay),
+        "nights": masked("nights", has_stay),
+        "room_type": interned("room_type", has_stay),
+        "rate_per_night": masked("rate_per_night", has_stay),
+        "total_spend": masked("total_spend", has_stay),
+        "booking_channel": _enum_column(np.where(has_stay, col("booking_channel"), -1), CHANNEL_CODES),
+        "trip_purpose": interned("trip_purpose", has_stay),
+        "nps_score": pa.array(nps, mask=~has_stay | (nps < 0)),
+        "account_id": interned("account_id", has_loyalty),
+        "tier": _enum_column(tier, TIER_CODES),
+        "points_balance": masked("points_balance", has_loyalty),
+        "points_lifetime": masked("points_lifetime", has_loyalty),
+        "enrolled_date": dates("enrolled_date", has_loyalty),
+        "last_activity": dates("last_activity", has_loyalty),
+        "is_active": masked("is_active", has_loyalty),
+        # Amenity lists are kept as the store's joined strings plus the
+        # family-amenity flag the segment classifier needs
+        "family_amenity": pa.array(store.stay_features().family_amenity),
+    })
+
+
+def interaction_log_table(log: InteractionLog, start: datetime | None = None, end: datetime | None = None):
+    """Events of `log` in [start, end) as one table, straight from the mapped segments."""
+    pa, _, _ = _pyarrow()
+    parts = list(log.columns(start, end))
+    log.strings.refresh()
+    values = log.strings.values
+    rows = np.concatenate(parts) if parts else np.zeros(0, dtype=np.dtype(_EVENT_FIELDS))
+    return pa.table({
+        "timestamp": pa.array(np.ascontiguousarray(rows["timestamp"])).view(pa.timestamp("us")),
+        "guest_id": _interned_column(rows["guest"], values),
+        "interaction_type": _enum_column(rows["type"], INTERACTION_TYPE_CODES),
+        "channel": _enum_column(rows["channel"], INTERACTION_CHANNEL_CODES),
+        "journey_stage": _enum_column(rows["stage"], STAGE_CODES),
+        "campaign_id": _interned_column(rows["campaign"], values),
+        "offer_id": _interned_column(rows["offer"], values),
+    })
+
+
+# ---------------------------------------------------------------------------
+# Files
+# ---------------------------------------------------------------------------
+
+def write_table(table, path: str, compression: str = "zstd") -> None:
+    """Write `table` as Parquet (`.parquet`) or Arrow IPC (any other suffix)."""
+    pa, ipc, pq = _pyarrow()
+    if path.endswith(".parquet"):
+        pq.write_table(table, path, compression=compression)
+        return
+    with pa.OSFile(path, "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+
+def read_table(path: str):
+    """Read a table; Arrow IPC files are memory-mapped rather than copied."""
+    pa, ipc, pq = _pyarrow()
+    if path.endswith(".parquet"):
+        return pq.read_table(path)
+    with pa.memory_map(path, "r") as source:
+        return ipc.open_file(source).read_all()
+
+
+# ---------------------------------------------------------------------------
+# Import: batch API inputs
+# ---------------------------------------------------------------------------
+
+def _column(table, name: str):
+    column = table.column(name)
+    return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+
+def _numpy(table, name: str) -> np.ndarray:
+    """
+    A column as NumPy -- a view of the Arrow buffer for numeric columns
+    without nulls (Arrow packs booleans as bits, so those are unpacked).
+    """
+    pa, _, _ = _pyarrow()
+    array = _column(table, name)
+    return array.to_numpy(zero_copy_only=array.null_count == 0 and not pa.types.is_boolean(array.type))
+
+
+def _ints(array) -> np.ndarray:
+    """Integer array as NumPy with nulls as -1 (a view when there are none)."""
+    if array.null_count:
+        array = array.fill_null(-1)
+    return array.to_numpy(zero_copy_only=False)
+
+
+def enum_codes(table, name: str, members: Sequence[Enum]) -> np.ndarray:
+    """
+    Repo codes of a dictionary-encoded enum column.  Columns written by this
+    module come back as a view of the index buffer; a dictionary in another
+    order (e.g. re-encoded by another tool) is remapped in one gather.
+    """
+    array = _column(table, name)
+    dictionary = array.dictionary.to_pylist()
+    indices = _ints(array.indices)
+    expected = [m.value for m in members]
+    if dictionary == expected[: len(dictionary)]:
+        return indices.astype(np.int8, copy=False)
+    position = {value: i for i, value in enumerate(expected)}
+    remap = np.array([position[v] for v in dictionary] + [-1], dtype=np.int8)
+    return remap[indices]                    # null (-1) picks the trailing -1
+
+
+def churn_columns_from_table(table, today: date) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """`score_churn_batch` arguments from a `guest_store_table` export."""
+    pa, _, _ = _pyarrow()
+    check_out = _ints(_column(table, "check_out").view(pa.int32()))
+    days = (today.toordinal() - _EPOCH_ORDINAL) - check_out.astype(np.int64)
+    return (
+        days,
+        _numpy(table, "engagement_score"),
+        enum_codes(table, "booking_channel", CHANNEL_CODES),
+        enum_codes(table, "tier", TIER_CODES),
+    )
+
+
+def stay_features_from_table(table) -> StayFeatures:
+    """
+    `classify_segments_batch` input from a `stays_table` or
+    `guest_store_table` export.  Keyword and amenity tests run once per
+    distinct dictionary value.
+    """
+    purpose = _column(table, "trip_purpose")
+    group = np.array([_is_group_purpose(p or "") for p in purpose.dictionary.to_pylist()], dtype=bool)
+    if "family_amenity" in table.column_names:
+        family = _numpy(table, "family_amenity")
+    else:
+        amenities = _column(table, "amenities_used")
+        family = np.fromiter((_uses_family_amenity(a or []) for a in amenities.to_pylist()),
+                             bool, len(amenities))
+    return StayFeatures(
+        corporate=enum_codes(table, "booking_channel", CHANNEL_CODES)
+        == CHANNEL_CODES.index(BookingChannel.CORPORATE),
+        nights=_numpy(table, "nights").astype(np.int32),
+        rate_per_night=_numpy(table, "rate_per_night"),
+        group_purpose=group[_ints(purpose.indices)],
+        family_amenity=family,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Check
+# ---------------------------------------------------------------------------
+
+def check_export(guests: int = 20_000, seed: int = 42) -> bool:
+    """Round-trip a GuestStore through IPC and Parquet and compare batch scores."""
+    import os
+    import random
+    import tempfile
+
+    from data_models import (
+        GuestPreferences,
+        GuestSegment,
+        make_sample_guest,
+        make_sample_loyalty,
+        make_sample_stay,
+    )
+    from engagement_engine import GuestProfile
+    from vectorized_scoring import classify_segments_batch, score_churn_batch
+
+    rng = random.Random(seed)
+    profiles = []
+    for _ in range(guests):
+        guest = make_sample_guest(rng.choice(list(GuestSegment)))
+        stay = make_sample_stay(guest, property_city=rng.choice(["Austin", "Lisbon", "Osaka"]))
+        stay.trip_purpose = rng.choice(["", "Wedding", "conference event", "leisure"])
+        profiles.append(GuestProfile(
+            guest=guest, stay=stay, preferences=GuestPreferences(guest_id=guest.guest_id),
+            loyalty=make_sample_loyalty(guest) if rng.random() < 0.6 else None,
+            engagement_score=rng.random(),
+        ))
+    store = GuestStore.from_profiles(profiles)
+    today = date(2026, 3, 1)
+    expected_risk = score_churn_batch(*store.churn_columns(today))
+    expected_seg = classify_segments_batch(store.stay_features())
+
+    ok = True
+    tmp = tempfile.mkdtemp(prefix="novastar-export-")
+    for name in ("guests.arrow", "guests.parquet"):
+        path = os.path.join(tmp, name)
+        write_table(guest_store_table(store), path)
+        table = read_table(path)
+        risk_ok = bool((score_churn_batch(*churn_columns_from_table(table, today)) == expected_risk).all())
+        seg_ok = bool((classify_segments_batch(stay_features_from_table(table)) == expected_seg).all())
+        print(f"{name:<16} {os.path.getsize(path):>12,} bytes   churn identical: {risk_ok}   "
+              f"segments identical: {seg_ok}")
+        ok &= risk_ok and seg_ok
+        os.remove(path)
+
+    stays = [p.stay for p in profiles]
+    table = stays_table(stays)
+    seg_ok = bool((classify_segments_batch(stay_features_from_table(table)) == expected_seg).all())
+    print(f"{'stays_table':<16} {table.num_rows:>12,} rows    segments identical: {seg_ok}")
+    os.rmdir(tmp)
+    return ok and seg_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar export round-trip check")
+    parser.add_argument("--guests", type=int, default=20_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    raise SystemExit(0 if check_export(args.guests, args.seed) else 1)
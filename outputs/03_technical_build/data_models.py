@@ -1,7 +1,8 @@
 """
 NovaStar Hotels -- Data Models
 ==============================
-Database schema expressed as Python dataclasses.
+Database schema expressed as Python dataclasses (slotted: no per-instance
+__dict__, so large in-memory guest bases and interaction histories stay small).
 No ORM required; standard-library only.
 
 Prepared by: Max the Maker (Agent 03, Team AWESOME)
@@ -9,12 +10,28 @@ Prepared by: Max the Maker (Agent 03, Team AWESOME)
 
 from __future__ import annotations
 
-import uuid
 from dataclasses import dataclass, field
 from datetime import date, datetime
 from enum import Enum
 from typing import Optional
 
+from ids import new_id
+
+
+# ---------------------------------------------------------------------------
+# Field defaults
+# ---------------------------------------------------------------------------
+
+_TODAY: list[date] = [date.min]
+
+
+def _today() -> date:
+    """`date.today()`, returning one shared (immutable) instance per day."""
+    today = date.today()
+    if today != _TODAY[0]:
+        _TODAY[0] = today
+    return _TODAY[0]
+
 
 # ---------------------------------------------------------------------------
 # Enumerations
@@ -93,7 +110,7 @@ class CampaignStatus(Enum):
 # Core Data Models
 # ---------------------------------------------------------------------------
 
-@dataclass
+@dataclass(slots=True)
 class Guest:
     """
     Unified guest profile -- the 'Golden Record' from the Guest Data Platform.
@@ -104,7 +121,7 @@ class Guest:
         - has many Interaction records
         - has zero or one LoyaltyAccount
     """
-    guest_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    guest_id: str = field(default_factory=new_id)
     first_name: str = ""
     last_name: str = ""
     email: Optional[str] = None          # None when OTA-masked
@@ -119,7 +136,7 @@ class Guest:
         return f"{self.first_name} {self.last_name}".strip()
 
 
-@dataclass
+@dataclass(slots=True)
 class Stay:
     """
     A single hotel stay.
@@ -128,12 +145,12 @@ class Stay:
         - belongs to one Guest (via guest_id)
         - belongs to one property
     """
-    stay_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    stay_id: str = field(default_factory=new_id)
     guest_id: str = ""
     property_name: str = ""               # e.g. "NovaStar Austin"
     property_city: str = ""
-    check_in: date = field(default_factory=date.today)
-    check_out: date = field(default_factory=date.today)
+    check_in: date = field(default_factory=_today)
+    check_out: date = field(default_factory=_today)
     nights: int = 1
     room_type: str = "Standard"
     rate_per_night: float = 159.70        # ADR from Riley's data
@@ -144,7 +161,7 @@ class Stay:
     amenities_used: list[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class GuestPreferences:
     """
     Progressive profile built across stays.
@@ -165,7 +182,7 @@ class GuestPreferences:
     notes: str = ""                       # free-text staff notes
 
 
-@dataclass
+@dataclass(slots=True)
 class Interaction:
     """
     Every touchpoint between NovaStar and a guest.
@@ -175,7 +192,7 @@ class Interaction:
         - optionally linked to a Campaign (via campaign_id)
         - optionally linked to an Offer (via offer_id)
     """
-    interaction_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    interaction_id: str = field(default_factory=new_id)
     guest_id: str = ""
     timestamp: datetime = field(default_factory=datetime.now)
     interaction_type: InteractionType = InteractionType.EMAIL_SENT
@@ -186,7 +203,7 @@ class Interaction:
     metadata: dict = field(default_factory=dict)  # e.g. {"subject_line": "..."}
 
 
-@dataclass
+@dataclass(slots=True)
 class Offer:
     """
     A personalised offer generated by the AI Personalisation Engine.
@@ -195,7 +212,7 @@ class Offer:
         - targeted at one Guest (via guest_id)
         - belongs to one Campaign (via campaign_id)
     """
-    offer_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    offer_id: str = field(default_factory=new_id)
     guest_id: str = ""
     campaign_id: Optional[str] = None
     headline: str = ""
@@ -203,13 +220,13 @@ class Offer:
     discount_pct: float = 0.0             # 0.0 - 1.0
     points_bonus: int = 0
     perks: list[str] = field(default_factory=list)  # ["late checkout", "breakfast"]
-    valid_from: date = field(default_factory=date.today)
-    valid_until: date = field(default_factory=date.today)
+    valid_from: date = field(default_factory=_today)
+    valid_until: date = field(default_factory=_today)
     redeemed: bool = False
     target_property: Optional[str] = None  # specific property or None for any
 
 
-@dataclass
+@dataclass(slots=True)
 class LoyaltyAccount:
     """
     NovaStar Rewards account -- Dana's redesigned tier structure.
@@ -218,19 +235,19 @@ class LoyaltyAccount:
         - belongs to one Guest (via guest_id)
         - has many Reward records
     """
-    account_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    account_id: str = field(default_factory=new_id)
     guest_id: str = ""
     tier: LoyaltyTier = LoyaltyTier.EXPLORER
     points_balance: int = 0
     points_lifetime: int = 0
     nights_qualifying: int = 0            # in current qualification window
     stays_qualifying: int = 0
-    enrolled_date: date = field(default_factory=date.today)
-    last_activity: date = field(default_factory=date.today)
+    enrolled_date: date = field(default_factory=_today)
+    last_activity: date = field(default_factory=_today)
     is_active: bool = True                # active = earned/redeemed in 12 mo
 
 
-@dataclass
+@dataclass(slots=True)
 class Reward:
     """
     A reward redeemed from the loyalty catalogue.
@@ -238,15 +255,15 @@ class Reward:
     Relationships:
         - belongs to one LoyaltyAccount (via account_id)
     """
-    reward_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    reward_id: str = field(default_factory=new_id)
     account_id: str = ""
     reward_type: str = ""                 # "room_upgrade", "free_night", etc.
     points_cost: int = 0
-    redeemed_date: date = field(default_factory=date.today)
+    redeemed_date: date = field(default_factory=_today)
     description: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class Campaign:
     """
     A marketing campaign targeting one or more segments.
@@ -255,13 +272,13 @@ class Campaign:
         - produces many Offer records
         - produces many Interaction records
     """
-    campaign_id: str = field(default_factory=lambda: uuid.uuid4().hex[:12])
+    campaign_id: str = field(default_factory=new_id)
     name: str = ""
     journey_stage: JourneyStage = JourneyStage.NOSTALGIA_TRIGGER
     target_segments: list[GuestSegment] = field(default_factory=list)
     channel: ChannelType = ChannelType.EMAIL
     status: CampaignStatus = CampaignStatus.DRAFT
-    start_date: date = field(default_factory=date.today)
+    start_date: date = field(default_factory=_today)
     end_date: Optional[date] = None
     created_by: str = "AI Personalisation Engine"
 
@@ -270,20 +287,44 @@ class Campaign:
 # Sample Data Factory Functions
 # ---------------------------------------------------------------------------
 
+# Per-segment persona, stay length, ADR and loyalty tier of the sample
+# records (also the centres of population_generator's distributions)
+_SAMPLE_NAMES: dict[GuestSegment, tuple[str, str]] = {
+    GuestSegment.BUSINESS_REGULAR: ("James", "Chen"),
+    GuestSegment.WEEKEND_LEISURE_COUPLE: ("Sofia", "Martinez"),
+    GuestSegment.FAMILY_VACATIONER: ("David", "Thompson"),
+    GuestSegment.BUDGET_SOLO: ("Alex", "Nowak"),
+    GuestSegment.GROUP_EVENT: ("Priya", "Sharma"),
+    GuestSegment.EXTENDED_STAY: ("Michael", "Okafor"),
+}
+_SAMPLE_NIGHTS: dict[GuestSegment, int] = {
+    GuestSegment.BUSINESS_REGULAR: 2,
+    GuestSegment.WEEKEND_LEISURE_COUPLE: 2,
+    GuestSegment.FAMILY_VACATIONER: 4,
+    GuestSegment.BUDGET_SOLO: 2,
+    GuestSegment.GROUP_EVENT: 3,
+    GuestSegment.EXTENDED_STAY: 12,
+}
+_SAMPLE_ADR: dict[GuestSegment, float] = {
+    GuestSegment.BUSINESS_REGULAR: 189.0,
+    GuestSegment.WEEKEND_LEISURE_COUPLE: 152.0,
+    GuestSegment.FAMILY_VACATIONER: 174.0,
+    GuestSegment.BUDGET_SOLO: 109.0,
+    GuestSegment.GROUP_EVENT: 141.0,
+    GuestSegment.EXTENDED_STAY: 98.0,
+}
+_SAMPLE_TIER: dict[GuestSegment, LoyaltyTier] = {
+    GuestSegment.BUSINESS_REGULAR: LoyaltyTier.ADVENTURER,
+    GuestSegment.EXTENDED_STAY: LoyaltyTier.VOYAGER,
+}
+
+
 def make_sample_guest(segment: GuestSegment | None = None) -> Guest:
     """Return a realistic sample Guest for the given segment."""
     import random
     seg = segment or random.choice(list(GuestSegment))
 
-    name_map: dict[GuestSegment, tuple[str, str]] = {
-        GuestSegment.BUSINESS_REGULAR: ("James", "Chen"),
-        GuestSegment.WEEKEND_LEISURE_COUPLE: ("Sofia", "Martinez"),
-        GuestSegment.FAMILY_VACATIONER: ("David", "Thompson"),
-        GuestSegment.BUDGET_SOLO: ("Alex", "Nowak"),
-        GuestSegment.GROUP_EVENT: ("Priya", "Sharma"),
-        GuestSegment.EXTENDED_STAY: ("Michael", "Okafor"),
-    }
-    first, last = name_map[seg]
+    first, last = _SAMPLE_NAMES[seg]
     return Guest(
         first_name=first,
         last_name=last,
@@ -297,23 +338,8 @@ def make_sample_guest(segment: GuestSegment | None = None) -> Guest:
 
 def make_sample_stay(guest: Guest, property_city: str = "Austin") -> Stay:
     """Return a sample Stay linked to the provided guest."""
-    nights_map = {
-        GuestSegment.BUSINESS_REGULAR: 2,
-        GuestSegment.WEEKEND_LEISURE_COUPLE: 2,
-        GuestSegment.FAMILY_VACATIONER: 4,
-        GuestSegment.BUDGET_SOLO: 2,
-        GuestSegment.GROUP_EVENT: 3,
-        GuestSegment.EXTENDED_STAY: 12,
-    }
-    nights = nights_map.get(guest.segment, 2)
-    rate = {
-        GuestSegment.BUSINESS_REGULAR: 189.0,
-        GuestSegment.WEEKEND_LEISURE_COUPLE: 152.0,
-        GuestSegment.FAMILY_VACATIONER: 174.0,
-        GuestSegment.BUDGET_SOLO: 109.0,
-        GuestSegment.GROUP_EVENT: 141.0,
-        GuestSegment.EXTENDED_STAY: 98.0,
-    }.get(guest.segment, 159.70)
+    nights = _SAMPLE_NIGHTS.get(guest.segment, 2)
+    rate = _SAMPLE_ADR.get(guest.segment, 159.70)
     return Stay(
         guest_id=guest.guest_id,
         property_name=f"NovaStar {property_city}",
@@ -335,10 +361,7 @@ def make_sample_stay(guest: Guest, property_city: str = "Austin") -> Stay:
 
 def make_sample_loyalty(guest: Guest) -> LoyaltyAccount:
     """Return a sample LoyaltyAccount for the guest."""
-    tier = {
-        GuestSegment.BUSINESS_REGULAR: LoyaltyTier.ADVENTURER,
-        GuestSegment.EXTENDED_STAY: LoyaltyTier.VOYAGER,
-    }.get(guest.segment, LoyaltyTier.EXPLORER)
+    tier = _SAMPLE_TIER.get(guest.segment, LoyaltyTier.EXPLORER)
     return LoyaltyAccount(
         guest_id=guest.guest_id,
         tier=tier,
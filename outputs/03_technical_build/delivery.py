@@ -0,0 +1,644 @@
+"""
+NovaStar Hotels -- Message Delivery Pipeline
+=============================================
+Sending stage of the Communication Orchestrator: consumes due `Trigger`s
+(from `trigger_dispatcher` or a plan) and fans them out to one backend per
+channel -- email, SMS, push, WhatsApp and in-app.
+
+Each channel runs its own pool of asyncio workers, so per channel there is
+
+  - a concurrency limit     (number of workers = in-flight sends)
+  - a token-bucket rate     (sends/sec with a burst allowance)
+  - retry with backoff      (exponential, full jitter, capped attempts)
+
+and a slow or failing provider on one channel never holds up the others.
+Backends are pluggable: anything with `async send(trigger)` will do.
+Blocking client libraries (smtplib, http.client) run in a thread pool
+owned by the backend, sized to the channel's concurrency, over pooled
+keep-alive connections.
+
+Local stand-ins for testing and benchmarks:
+  - `FakeHTTPEndpoint`  -- stdlib HTTP server accepting provider-style POSTs,
+                           with optional injected 503s to exercise retries
+  - `smtp_sink()`       -- an aiosmtpd SMTP server that counts messages
+                           (requires aiosmtpd: pip install aiosmtpd)
+
+    python delivery.py --guests 50000     # morning send against both stand-ins
+    python delivery.py --check            # failing-backend and pool-sizing check
+
+Standard-library only, except `smtp_sink()`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import http.client
+import json
+import queue
+import random
+import smtplib
+import threading
+import time
+import urllib.parse
+from collections.abc import AsyncIterable, Callable, Iterable
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from email.header import Header
+from email.mime.text import MIMEText
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Protocol
+
+from data_models import ChannelType, JourneyStage
+from engagement_engine import Trigger
+
+
+# ---------------------------------------------------------------------------
+# Errors and policies
+# ---------------------------------------------------------------------------
+
+class DeliveryError(Exception):
+    """A send failed and should be retried."""
+
+
+class PermanentDeliveryError(DeliveryError):
+    """A send failed in a way retrying cannot fix (bad address, 4xx)."""
+
+
+@dataclass(frozen=True)
+class ChannelPolicy:
+    """Concurrency, rate and retry settings for one channel."""
+    concurrency: int = 10            # in-flight sends
+    rate_per_sec: float = 100.0      # token-bucket refill rate
+    burst: int = 50                  # token-bucket capacity
+    max_attempts: int = 4            # first try + retries
+    backoff_base: float = 0.5        # seconds; doubles per attempt
+    backoff_max: float = 30.0
+
+    def __post_init__(self) -> None:
+        if self.concurrency < 1 or self.rate_per_sec <= 0 or self.burst < 1 or self.max_attempts < 1:
+            raise ValueError(f"invalid channel policy: {self}")
+
+
+# Provider-typical limits; override per deployment
+DEFAULT_POLICIES: dict[ChannelType, ChannelPolicy] = {
+    ChannelType.EMAIL: ChannelPolicy(concurrency=20, rate_per_sec=500, burst=200),
+    ChannelType.SMS: ChannelPolicy(concurrency=10, rate_per_sec=100, burst=50),
+    ChannelType.PUSH: ChannelPolicy(concurrency=50, rate_per_sec=2_000, burst=500),
+    ChannelType.WHATSAPP: ChannelPolicy(concurrency=10, rate_per_sec=80, burst=40),
+    ChannelType.IN_APP: ChannelPolicy(concurrency=50, rate_per_sec=2_000, burst=500),
+}
+
+
+class TokenBucket:
+    """Async token bucket: `acquire()` waits until a token is available."""
+
+    def __init__(self, rate_per_sec: float, burst: int) -> None:
+        self.rate = rate_per_sec
+        self.capacity = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+class Backend(Protocol):
+    async def send(self, trigger: Trigger) -> None:
+        """Deliver one trigger; raise DeliveryError (retryable) or PermanentDeliveryError."""
+
+
+def _placeholder_address(trigger: Trigger) -> str:
+    return f"{trigger.guest_id}@guests.novastar.example"
+
+
+class _ThreadedBackend:
+    """
+    Runs a blocking send in the backend's own thread pool.
+
+    The pool is started on first use.  `DeliveryPipeline` sizes it to the
+    total concurrency of the channels routed here (`size_for`), so every
+    in-flight send has a thread.  An explicit `max_workers` smaller than
+    that is rejected rather than queueing sends inside the executor.
+    """
+
+    def __init__(self, max_workers: int | None) -> None:
+        self.max_workers = max_workers
+        self._threads = max_workers or 32
+        self._executor: ThreadPoolExecutor | None = None
+
+    def size_for(self, concurrency: int) -> None:
+        """Make room for `concurrency` in-flight sends, or raise ValueError."""
+        if self.max_workers is not None and self.max_workers < concurrency:
+            raise ValueError(f"{type(self).__name__} max_workers={self.max_workers} is below "
+                             f"the channel concurrency routed to it ({concurrency})")
+        if self._executor is not None and self._threads < concurrency:
+            raise ValueError(f"{type(self).__name__} thread pool already started with "
+                             f"{self._threads} threads; {concurrency} needed")
+        if self._executor is None and self.max_workers is None:
+            self._threads = concurrency
+
+    async def _in_thread(self, fn: Callable, *args) -> None:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self._threads,
+                                                thread_name_prefix=type(self).__name__)
+        await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def close(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+
+
+class SMTPBackend(_ThreadedBackend):
+    """
+    Email over SMTP with smtplib.  Connections are pooled and reused across
+    sends; a connection that errors is discarded.
+    """
+
+    def __init__(
+        self,
+        host: str = "localhost",
+        port: int = 25,
+        sender: str = "stay@novastar.example",
+        address_for: Callable[[Trigger], str] = _placeholder_address,
+        timeout: float = 10.0,
+        max_workers: int | None = None,
+    ) -> None:
+        super().__init__(max_workers)
+        self.host, self.port, self.sender = host, port, sender
+        self.address_for = address_for
+        self.timeout = timeout
+        self._pool: queue.SimpleQueue[smtplib.SMTP] = queue.SimpleQueue()
+
+    async def send(self, trigger: Trigger) -> None:
+        # MIMEText (compat32) renders ~4x faster than EmailMessage; at
+        # morning-send volumes message building dominates the client side.
+        subject = trigger.message.subject_line if trigger.message else ""
+        msg = MIMEText(trigger.message.body if trigger.message else "", "plain", "utf-8")
+        msg["From"] = self.sender
+        msg["To"] = recipient = self.address_for(trigger)
+        msg["Subject"] = subject if subject.isascii() else Header(subject, "utf-8")
+        await self._in_thread(self._send_blocking, recipient, msg.as_bytes())
+
+    def _send_blocking(self, recipient: str, data: bytes) -> None:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            try:
+                conn = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            except OSError as exc:
+                raise DeliveryError(f"SMTP connect failed: {exc}") from exc
+        try:
+            conn.sendmail(self.sender, [recipient], data)
+        except smtplib.SMTPRecipientsRefused as exc:
+            self._pool.put(conn)
+            raise PermanentDeliveryError(f"recipient refused: {exc.recipients}") from exc
+        except (smtplib.SMTPException, OSError) as exc:
+            _close_quietly(conn)
+            raise DeliveryError(f"SMTP send failed: {exc}") from exc
+        self._pool.put(conn)
+
+    def close(self) -> None:
+        super().close()
+        while True:
+            try:
+                _close_quietly(self._pool.get_nowait())
+            except queue.Empty:
+                return
+
+
+def _close_quietly(conn: smtplib.SMTP) -> None:
+    try:
+        conn.quit()
+    except (smtplib.SMTPException, OSError):
+        conn.close()
+
+
+class HTTPBackend(_ThreadedBackend):
+    """
+    JSON POST to a provider API (SMS, push, WhatsApp and in-app gateways all
+    look like this) over pooled keep-alive connections.  429 and 5xx are
+    retried; other 4xx are permanent.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        timeout: float = 10.0,
+        headers: dict[str, str] | None = None,
+        max_workers: int | None = None,
+    ) -> None:
+        super().__init__(max_workers)
+        self.url = url
+        parts = urllib.parse.urlsplit(url)
+        self._conn_cls = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        self._netloc = parts.netloc
+        self._path = parts.path or "/"
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+        self._pool: queue.SimpleQueue[http.client.HTTPConnection] = queue.SimpleQueue()
+
+    async def send(self, trigger: Trigger) -> None:
+        payload = json.dumps({
+            "guest_id": trigger.guest_id,
+            "channel": trigger.channel.value,
+            "stage": trigger.journey_stage.value,
+            "title": trigger.message.subject_line if trigger.message else "",
+            "body": trigger.message.body if trigger.message else "",
+        }).encode()
+        await self._in_thread(self._post_blocking, payload)
+
+    def _post_blocking(self, payload: bytes) -> None:
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._conn_cls(self._netloc, timeout=self.timeout)
+        try:
+            conn.request("POST", self._path, body=payload, headers=self.headers)
+            resp = conn.getresponse()
+            resp.read()
+        except (http.client.HTTPException, OSError) as exc:
+            conn.close()
+            raise DeliveryError(f"POST {self.url} failed: {exc}") from exc
+        self._pool.put(conn)
+        if resp.status == 429 or resp.status >= 500:
+            raise DeliveryError(f"HTTP {resp.status} from {self.url}")
+        if resp.status >= 400:
+            raise PermanentDeliveryError(f"HTTP {resp.status} from {self.url}")
+
+    def close(self) -> None:
+        super().close()
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+class MemoryBackend:
+    """Records triggers in memory; for dry runs and checks."""
+
+    def __init__(self) -> None:
+        self.sent: list[Trigger] = []
+
+    async def send(self, trigger: Trigger) -> None:
+        self.sent.append(trigger)
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+@dataclass
+class DeliveryResult:
+    trigger: Trigger
+    ok: bool
+    attempts: int
+    error: str = ""
+
+
+@dataclass
+class DeliveryReport:
+    """Outcome of one `deliver()` run."""
+    sent: dict[ChannelType, int] = field(default_factory=dict)
+    failed: dict[ChannelType, int] = field(default_factory=dict)
+    retries: int = 0
+    elapsed: float = 0.0
+    failures: list[DeliveryResult] = field(default_factory=list)
+
+    @property
+    def total_sent(self) -> int:
+        return sum(self.sent.values())
+
+    @property
+    def total_failed(self) -> int:
+        return sum(self.failed.values())
+
+
+class DeliveryPipeline:
+    """
+    Fan triggers out to per-channel backends under each channel's policy.
+
+    `on_result` is called (in the event loop) once per trigger with its
+    final outcome -- the hook for marking outbox rows sent or failed.
+    """
+
+    def __init__(
+        self,
+        backends: dict[ChannelType, Backend],
+        policies: dict[ChannelType, ChannelPolicy] | None = None,
+        on_result: Callable[[DeliveryResult], None] | None = None,
+    ) -> None:
+        self.backends = backends
+        self.policies = {**DEFAULT_POLICIES, **(policies or {})}
+        self.on_result = on_result
+        # A backend shared by several channels needs a thread per worker of each
+        demand: dict[int, tuple[Backend, int]] = {}
+        for channel, backend in backends.items():
+            shared, n = demand.get(id(backend), (backend, 0))
+            demand[id(backend)] = (shared, n + self.policies.get(channel, ChannelPolicy()).concurrency)
+        for backend, concurrency in demand.values():
+            if isinstance(backend, _ThreadedBackend):
+                backend.size_for(concurrency)
+
+    async def deliver(self, triggers: Iterable[Trigger] | AsyncIterable[Trigger]) -> DeliveryReport:
+        """Send every trigger and return per-channel counts once all are settled."""
+        report = DeliveryReport()
+        t0 = time.perf_counter()
+        queues: dict[ChannelType, asyncio.Queue] = {}
+        workers: list[asyncio.Task] = []
+
+        for channel, backend in self.backends.items():
+            policy = self.policies.get(channel, ChannelPolicy())
+            q: asyncio.Queue = asyncio.Queue(maxsize=policy.concurrency * 4)
+            queues[channel] = q
+            bucket = TokenBucket(policy.rate_per_sec, policy.burst)
+            workers += [asyncio.create_task(self._worker(q, backend, policy, bucket, report))
+                        for _ in range(policy.concurrency)]
+
+        try:
+            if isinstance(triggers, AsyncIterable):
+                async for trigger in triggers:
+                    await self._route(trigger, queues, report)
+            else:
+                for trigger in triggers:
+                    await self._route(trigger, queues, report)
+            for q in queues.values():
+                await q.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        report.elapsed = time.perf_counter() - t0
+        return report
+
+    async def _route(self, trigger: Trigger, queues: dict[ChannelType, asyncio.Queue],
+                     report: DeliveryReport) -> None:
+        q = queues.get(trigger.channel)
+        if q is None:
+            self._settle(DeliveryResult(trigger, False, 0, f"no backend for {trigger.channel.value}"), report)
+            return
+        await q.put(trigger)
+
+    async def _worker(self, q: asyncio.Queue, backend: Backend, policy: ChannelPolicy,
+                      bucket: TokenBucket, report: DeliveryReport) -> None:
+        while True:
+            trigger = await q.get()
+            try:
+                try:
+                    result = await self._send_with_retry(trigger, backend, policy, bucket, report)
+                except Exception as exc:        # never lose a trigger to a worker crash
+                    result = DeliveryResult(trigger, False, 0, f"{type(exc).__name__}: {exc}")
+                self._settle(result, report)
+            finally:
+                q.task_done()
+
+    @staticmethod
+    async def _send_with_retry(trigger: Trigger, backend: Backend, policy: ChannelPolicy,
+                               bucket: TokenBucket, report: DeliveryReport) -> DeliveryResult:
+        for attempt in range(1, policy.max_attempts + 1):
+            await bucket.acquire()
+            try:
+                await backend.send(trigger)
+                return DeliveryResult(trigger, True, attempt)
+            except PermanentDeliveryError as exc:
+                return DeliveryResult(trigger, False, attempt, str(exc))
+            except Exception as exc:
+                # DeliveryError, or anything a backend failed to wrap (a bug,
+                # an unwrapped OSError): retried under the channel's policy
+                error = str(exc) if isinstance(exc, DeliveryError) else f"{type(exc).__name__}: {exc}"
+                if attempt == policy.max_attempts:
+                    return DeliveryResult(trigger, False, attempt, error)
+                report.retries += 1
+                delay = min(policy.backoff_max, policy.backoff_base * 2 ** (attempt - 1))
+                await asyncio.sleep(random.uniform(0, delay))
+        raise AssertionError("unreachable")
+
+    def _settle(self, result: DeliveryResult, report: DeliveryReport) -> None:
+        counts = report.sent if result.ok else report.failed
+        counts[result.trigger.channel] = counts.get(result.trigger.channel, 0) + 1
+        if not result.ok:
+            report.failures.append(result)
+        if self.on_result is not None:
+            self.on_result(result)
+
+
+# ---------------------------------------------------------------------------
+# Local stand-ins
+# ---------------------------------------------------------------------------
+
+class FakeHTTPEndpoint:
+    """
+    Threaded local HTTP server that accepts provider-style JSON POSTs.
+    `fail_rate` of requests get a 503 so retries are exercised.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, fail_rate: float = 0.0,
+                 seed: int = 0) -> None:
+        self.received = 0
+        self.rejected = 0
+        lock = threading.Lock()
+        rng = random.Random(seed)
+        endpoint = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self) -> None:  # noqa: N802 (http.server API)
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with lock:
+                    fail = rng.random() < fail_rate
+                    if fail:
+                        endpoint.rejected += 1
+                    else:
+                        endpoint.received += 1
+                self.send_response(503 if fail else 202)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/send"
+
+    def __enter__(self) -> FakeHTTPEndpoint:
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class smtp_sink:  # noqa: N801 (used like a function / context manager)
+    """
+    Local aiosmtpd SMTP server that counts delivered messages:
+
+        with smtp_sink() as sink:
+            SMTPBackend(port=sink.port) ...
+            sink.received
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 8025) -> None:
+        try:
+            from aiosmtpd.controller import Controller
+        except ImportError as exc:
+            raise RuntimeError("smtp_sink requires aiosmtpd (pip install aiosmtpd)") from exc
+        self.host, self.port = host, port
+        self.received = 0
+        sink = self
+
+        class Handler:
+            async def handle_DATA(self, server, session, envelope) -> str:  # noqa: N802
+                sink.received += 1
+                return "250 OK"
+
+        self._controller = Controller(Handler(), hostname=host, port=port)
+
+    def __enter__(self) -> smtp_sink:
+        self._controller.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._controller.stop()
+
+
+# ---------------------------------------------------------------------------
+# Demo: a morning send against the local stand-ins
+# ---------------------------------------------------------------------------
+
+def _morning_triggers(guests: int, seed: int = 42) -> list[Trigger]:
+    """Rendered day-0 triggers for a synthetic cohort, channels as the engine picks them."""
+    from data_models import GuestPreferences, GuestSegment, make_sample_guest, make_sample_stay
+    from engagement_engine import GuestProfile, generate_message
+
+    rng = random.Random(seed)
+    segments = list(GuestSegment)
+    triggers = []
+    for _ in range(guests):
+        guest = make_sample_guest(rng.choice(segments))
+        guest.has_app = rng.random() < 0.3
+        if rng.random() < 0.15:
+            guest.email = None          # OTA-masked: falls back to SMS
+        profile = GuestProfile(guest=guest, stay=make_sample_stay(guest),
+                               preferences=GuestPreferences(guest_id=guest.guest_id))
+        msg = generate_message(profile)
+        triggers.append(Trigger(guest_id=guest.guest_id, action=f"send_{msg.channel.value}",
+                                journey_stage=msg.journey_stage, channel=msg.channel,
+                                day_offset=0, message=msg))
+    return triggers
+
+
+class _BrokenBackend:
+    """Raises an unwrapped exception on every send, as a buggy provider SDK would."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+
+    async def send(self, trigger: Trigger) -> None:
+        self.calls += 1
+        raise ValueError("provider SDK bug")
+
+
+def check_pipeline(triggers: int = 20) -> bool:
+    """
+    Unexpected backend exceptions settle their triggers instead of killing
+    workers (deliver() must return); thread pools follow channel concurrency.
+    """
+    broken = _BrokenBackend()
+    results: list[DeliveryResult] = []
+    policy = ChannelPolicy(concurrency=2, burst=5, rate_per_sec=1_000, max_attempts=2, backoff_base=0.001)
+    pipeline = DeliveryPipeline({ChannelType.EMAIL: broken}, policies={ChannelType.EMAIL: policy},
+                                on_result=results.append)
+    batch = [Trigger(guest_id=f"G{i}", action="send_email", journey_stage=JourneyStage.WARM_FAREWELL,
+                     channel=ChannelType.EMAIL, day_offset=0) for i in range(triggers)]
+    try:
+        report = asyncio.run(asyncio.wait_for(pipeline.deliver(batch), timeout=10))
+        returned = True
+    except asyncio.TimeoutError:
+        report, returned = DeliveryReport(), False
+    settled_ok = (returned and len(results) == triggers and report.total_failed == triggers
+                  and all(r.error.startswith("ValueError") and r.attempts == 2 for r in results))
+
+    gateway = HTTPBackend("http://127.0.0.1:9/")
+    wide = ChannelPolicy(concurrency=40)
+    DeliveryPipeline({ChannelType.SMS: gateway, ChannelType.PUSH: gateway},
+                     policies={ChannelType.SMS: wide, ChannelType.PUSH: wide})
+    sized_ok = gateway._threads == 80
+    try:
+        DeliveryPipeline({ChannelType.SMS: HTTPBackend("http://127.0.0.1:9/", max_workers=8)},
+                         policies={ChannelType.SMS: wide})
+        rejected = False
+    except ValueError:
+        rejected = True
+
+    print(f"Raising backend, {triggers} triggers: deliver() returned: {returned}   "
+          f"settled {len(results)}/{triggers}, {broken.calls} sends")
+    print(f"  shared HTTP backend sized to 40+40 threads: {sized_ok}   "
+          f"max_workers below concurrency rejected: {rejected}")
+    return settled_ok and sized_ok and rejected
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Morning send against local SMTP/HTTP stand-ins")
+    parser.add_argument("--guests", type=int, default=50_000)
+    parser.add_argument("--fail-rate", type=float, default=0.02,
+                        help="fraction of HTTP sends answered with 503")
+    parser.add_argument("--smtp-port", type=int, default=8025)
+    parser.add_argument("--check", action="store_true", help="worker-failure and pool-sizing check")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.check:
+        raise SystemExit(0 if check_pipeline() else 1)
+    triggers = _morning_triggers(args.guests)
+    by_channel: dict[ChannelType, int] = {}
+    for t in triggers:
+        by_channel[t.channel] = by_channel.get(t.channel, 0) + 1
+    print(f"{len(triggers):,} triggers: "
+          + ", ".join(f"{c.value}={n:,}" for c, n in sorted(by_channel.items(), key=lambda x: x[0].value)))
+
+    with smtp_sink(port=args.smtp_port) as sink, FakeHTTPEndpoint(fail_rate=args.fail_rate) as endpoint:
+        smtp = SMTPBackend(port=sink.port)
+        gateway = HTTPBackend(endpoint.url)
+        backends: dict[ChannelType, Backend] = {ChannelType.EMAIL: smtp}
+        for channel in (ChannelType.SMS, ChannelType.PUSH, ChannelType.WHATSAPP, ChannelType.IN_APP):
+            backends[channel] = gateway
+        fast = ChannelPolicy(concurrency=20, rate_per_sec=5_000, burst=500, backoff_base=0.05)
+        pipeline = DeliveryPipeline(backends, policies={c: fast for c in ChannelType})
+        report = asyncio.run(pipeline.deliver(triggers))
+        smtp.close()
+        gateway.close()
+
+    print(f"{'Channel':<10} {'Sent':>8} {'Failed':>8}")
+    for channel in ChannelType:
+        if channel in by_channel:
+            print(f"{channel.value:<10} {report.sent.get(channel, 0):>8,} {report.failed.get(channel, 0):>8,}")
+    print(f"\nSent {report.total_sent:,} / {len(triggers):,} in {report.elapsed:.1f}s "
+          f"({report.total_sent / report.elapsed:,.0f}/s), {report.retries:,} retries, "
+          f"{report.total_failed:,} failed")
+    print(f"SMTP sink received {sink.received:,}; HTTP endpoint accepted {endpoint.received:,} "
+          f"(rejected {endpoint.rejected:,} with 503)")
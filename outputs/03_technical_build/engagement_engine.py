@@ -16,7 +16,12 @@ Runnable with Python 3.10+ standard library only.
 
 from __future__ import annotations
 
+import functools
+import os
 import random
+import re
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
 from typing import Optional
@@ -75,6 +80,20 @@ class GuestProfile:
     interactions: list[dict] = field(default_factory=list)
 
 
+# Classifier keyword / amenity signals
+_GROUP_KEYWORDS = ("event", "wedding")
+_FAMILY_AMENITIES = frozenset({"kids_club", "pool", "connecting_room"})
+
+
+def _is_group_purpose(trip_purpose: str) -> bool:
+    purpose = trip_purpose.lower()
+    return any(k in purpose for k in _GROUP_KEYWORDS)
+
+
+def _uses_family_amenity(amenities_used: list[str]) -> bool:
+    return not _FAMILY_AMENITIES.isdisjoint(amenities_used)
+
+
 def classify_segment(stay: Stay) -> GuestSegment:
     """
     Assign a guest to one of Riley's 6 segments based on stay attributes.
@@ -84,57 +103,89 @@ def classify_segment(stay: Stay) -> GuestSegment:
         return GuestSegment.BUSINESS_REGULAR
     if stay.nights >= 7:
         return GuestSegment.EXTENDED_STAY
-    if "event" in stay.trip_purpose.lower() or "wedding" in stay.trip_purpose.lower():
+    if _is_group_purpose(stay.trip_purpose):
         return GuestSegment.GROUP_EVENT
     if stay.rate_per_night < 120 and stay.nights <= 2:
         return GuestSegment.BUDGET_SOLO
-    if any(a in stay.amenities_used for a in ("kids_club", "pool", "connecting_room")):
+    if _uses_family_amenity(stay.amenities_used):
         return GuestSegment.FAMILY_VACATIONER
     # Default for leisure short-stays
     return GuestSegment.WEEKEND_LEISURE_COUPLE
 
 
-def calculate_churn_risk(profile: GuestProfile) -> float:
-    """
-    Churn risk predictor.  High risk = closer to 1.0.
+# OTA guests churn more (Riley, Root Cause #5)
+_OTA_CHANNELS = frozenset({
+    BookingChannel.OTA_BOOKING,
+    BookingChannel.OTA_EXPEDIA,
+    BookingChannel.OTA_OTHER,
+})
 
-    Factors (from Dana's APE spec, Section 5.1 Behavioural + Lifecycle layers):
-      - days since checkout (recency)
-      - engagement score (behavioural signals)
-      - loyalty tier (lifecycle)
-      - booking channel (OTA guests churn more)
-    """
-    risk = 0.5
 
-    # Recency decay
-    if profile.days_since_checkout > 60:
-        risk += 0.15
-    elif profile.days_since_checkout > 30:
-        risk += 0.08
+def _recency_risk(days_since_checkout: int) -> float:
+    """Recency decay term of the churn score."""
+    if days_since_checkout > 60:
+        return 0.15
+    if days_since_checkout > 30:
+        return 0.08
+    return 0.0
+
 
+def _profile_risk_terms(profile: GuestProfile) -> tuple[float, float, float]:
+    """
+    Recency-independent churn terms: (engagement, OTA channel, loyalty cushion).
+    These are fixed for a guest across the journey, so cohort planning
+    computes them once per profile.
+    """
     # Low engagement increases risk
     if profile.engagement_score < 0.2:
-        risk += 0.15
+        engagement = 0.15
     elif profile.engagement_score < 0.5:
-        risk += 0.05
+        engagement = 0.05
+    else:
+        engagement = 0.0
 
-    # OTA guests churn more (Riley, Root Cause #5)
-    if profile.stay.booking_channel in (
-        BookingChannel.OTA_BOOKING,
-        BookingChannel.OTA_EXPEDIA,
-        BookingChannel.OTA_OTHER,
-    ):
-        risk += 0.10
+    ota = _channel_risk(profile.stay.booking_channel)
+    cushion = _tier_cushion(profile.loyalty.tier) if profile.loyalty else 0.0
+    return engagement, ota, cushion
+
+
+def _channel_risk(channel: BookingChannel) -> float:
+    """OTA term of the churn score."""
+    return 0.10 if channel in _OTA_CHANNELS else 0.0
 
-    # Loyalty cushions churn
-    if profile.loyalty and profile.loyalty.tier in (LoyaltyTier.VOYAGER, LoyaltyTier.AMBASSADOR):
-        risk -= 0.20
-    elif profile.loyalty and profile.loyalty.tier == LoyaltyTier.ADVENTURER:
-        risk -= 0.10
 
+def _tier_cushion(tier: LoyaltyTier) -> float:
+    """Loyalty cushions churn: amount subtracted for the guest's tier."""
+    if tier in (LoyaltyTier.VOYAGER, LoyaltyTier.AMBASSADOR):
+        return 0.20
+    if tier == LoyaltyTier.ADVENTURER:
+        return 0.10
+    return 0.0
+
+
+def _combine_risk(recency: float, engagement: float, ota: float, cushion: float) -> float:
+    """Sum the churn terms in a fixed order and clamp to [0, 1]."""
+    risk = 0.5
+    risk += recency
+    risk += engagement
+    risk += ota
+    risk -= cushion
     return max(0.0, min(1.0, risk))
 
 
+def calculate_churn_risk(profile: GuestProfile) -> float:
+    """
+    Churn risk predictor.  High risk = closer to 1.0.
+
+    Factors (from Dana's APE spec, Section 5.1 Behavioural + Lifecycle layers):
+      - days since checkout (recency)
+      - engagement score (behavioural signals)
+      - loyalty tier (lifecycle)
+      - booking channel (OTA guests churn more)
+    """
+    return _combine_risk(_recency_risk(profile.days_since_checkout), *_profile_risk_terms(profile))
+
+
 def determine_journey_stage(days_since_checkout: int) -> JourneyStage:
     """Map days-since-checkout to Dana's 6 journey stages."""
     if days_since_checkout <= 0:
@@ -390,6 +441,111 @@ _SISTER_CITIES: dict[str, str] = {
 }
 
 
+# -- Template compiler ------------------------------------------------
+# Each template is split once, at import, into alternating literal / slot
+# segments.  Rendering fills only the slots a template references and joins
+# the segments in one pass.
+
+def _offer_text(offer: Optional[Offer]) -> str:
+    if offer is None:
+        return ""
+    perk_str = ", ".join(offer.perks) if offer.perks else "special perks"
+    discount_str = f"{int(offer.discount_pct * 100)}% off + " if offer.discount_pct else ""
+    return (
+        f"YOUR OFFER: {discount_str}{perk_str}. "
+        f"{'Plus ' + str(offer.points_bonus) + ' bonus points! ' if offer.points_bonus else ''}"
+        f"Valid until {offer.valid_until.isoformat()}. Book at NovaStar.com."
+    )
+
+
+# Slot name -> value resolver.  Only slots a template uses are ever resolved.
+_SLOT_RESOLVERS: dict[str, Callable[[GuestProfile, Optional[Offer]], str]] = {
+    "name": lambda p, o: p.guest.first_name,
+    "last_name": lambda p, o: p.guest.last_name,
+    "city": lambda p, o: p.stay.property_city,
+    "property": lambda p, o: p.stay.property_name,
+    "nights": lambda p, o: str(p.stay.nights),
+    "room_type": lambda p, o: p.stay.room_type,
+    "points": lambda p, o: str(p.loyalty.points_balance if p.loyalty else 0),
+    "nights_to_next": lambda p, o: str(max(0, 5 - (p.loyalty.nights_qualifying if p.loyalty else 0))),
+    "alt_city": lambda p, o: _SISTER_CITIES.get(p.stay.property_city, "Miami"),
+    "offer_text": lambda p, o: _offer_text(o),
+    "amenities": lambda p, o: ", ".join(p.stay.amenities_used) if p.stay.amenities_used else "our amenities",
+}
+
+# Slots whose value depends on the stage's offer; never cached across stages
+_STAGE_SLOTS = frozenset({"offer_text"})
+
+_SLOT_RE = re.compile(r"\{(" + "|".join(map(re.escape, _SLOT_RESOLVERS)) + r")\}")
+
+
+@dataclass(frozen=True)
+class _CompiledTemplate:
+    """A template pre-split into [literal, slot, literal, slot, ..., literal]."""
+    subject: tuple[str, ...]
+    body: tuple[str, ...]
+    slots: frozenset[str]
+
+    @classmethod
+    def compile(cls, tmpl: dict[str, str]) -> _CompiledTemplate:
+        subject = tuple(_SLOT_RE.split(tmpl["subject"]))
+        body = tuple(_SLOT_RE.split(tmpl["body"]))
+        return cls(subject, body, frozenset(subject[1::2] + body[1::2]))
+
+    def render(
+        self,
+        profile: GuestProfile,
+        offer: Optional[Offer],
+        cache: dict[str, str] | None = None,
+    ) -> tuple[str, str]:
+        """
+        Return (subject, body).  `cache` memoises stage-independent slot
+        values across several renders for the same profile.
+        """
+        values: dict[str, str] = {}
+        for slot in self.slots:
+            if cache is None or slot in _STAGE_SLOTS:
+                values[slot] = _SLOT_RESOLVERS[slot](profile, offer)
+            else:
+                value = cache.get(slot)
+                if value is None:
+                    value = cache[slot] = _SLOT_RESOLVERS[slot](profile, offer)
+                values[slot] = value
+        return self._join(self.subject, values), self._join(self.body, values)
+
+    @staticmethod
+    def _join(parts: tuple[str, ...], values: dict[str, str]) -> str:
+        if len(parts) == 1:
+            return parts[0]
+        out = list(parts)
+        for i in range(1, len(out), 2):
+            out[i] = values[out[i]]
+        return "".join(out)
+
+
+_FALLBACK_TEMPLATE: dict[str, str] = {
+    "subject": "A note from NovaStar Hotels",
+    "body": "Hi {name},\n\nThank you for choosing NovaStar.\n\n-- NovaStar Hotels",
+}
+
+
+def _resolve_template(seg: GuestSegment, stage: JourneyStage) -> dict[str, str]:
+    """Template for seg x stage; if no exact combo, fall back to WARM_FAREWELL."""
+    templates = _TEMPLATES.get(seg, {})
+    tmpl = templates.get(stage)
+    if tmpl is None:
+        tmpl = templates.get(JourneyStage.WARM_FAREWELL, _FALLBACK_TEMPLATE)
+    return tmpl
+
+
+# Every segment x stage, fallbacks included, compiled once at import
+_COMPILED_TEMPLATES: dict[tuple[GuestSegment, JourneyStage], _CompiledTemplate] = {
+    (seg, stage): _CompiledTemplate.compile(_resolve_template(seg, stage))
+    for seg in GuestSegment
+    for stage in JourneyStage
+}
+
+
 def _pick_channel(guest: Guest, stage: JourneyStage) -> ChannelType:
     """
     Channel selection logic per Dana's table (Section 3.2).
@@ -404,14 +560,25 @@ def _pick_channel(guest: Guest, stage: JourneyStage) -> ChannelType:
     return ChannelType.EMAIL
 
 
-def _generate_offer(profile: GuestProfile) -> Offer:
-    """
-    Offer Selector: next-best-action offer calibrated to segment and risk.
-    Discount depth is margin-protected (Dana, Section 3.1 Stage 5: avg < 12%).
-    """
-    seg = profile.guest.segment
-    risk = profile.churn_risk
-
+@dataclass(frozen=True)
+class _OfferTemplate:
+    """The guest-independent part of an offer."""
+    headline: str
+    body: str
+    discount_pct: float
+    points_bonus: int
+    perks: tuple[str, ...]
+    target_property: str
+
+
+def _build_offer_template(
+    seg: GuestSegment,
+    bonus_band: bool,
+    escalate_band: bool,
+    stage: JourneyStage,
+    city: str,
+) -> _OfferTemplate:
+    """Offer content for (segment, risk > 0.6, risk > 0.7, stage, city)."""
     # Base discount by segment
     base_discount = {
         GuestSegment.BUSINESS_REGULAR: 0.0,
@@ -423,7 +590,7 @@ def _generate_offer(profile: GuestProfile) -> Offer:
     }.get(seg, 0.08)
 
     # Escalate for high-churn-risk, high-value guests
-    if risk > 0.7 and SEGMENT_INTENSITY.get(seg, "LOW") != "LOW":
+    if escalate_band and SEGMENT_INTENSITY.get(seg, "LOW") != "LOW":
         base_discount = min(base_discount + 0.05, 0.15)
 
     # Segment-specific perks (Dana, Section 5.3)
@@ -442,92 +609,108 @@ def _generate_offer(profile: GuestProfile) -> Offer:
         case GuestSegment.EXTENDED_STAY:
             perks = ["rate lock", "priority room selection"]
 
-    points_bonus = 500 if risk > 0.6 else 0
+    points_bonus = 500 if bonus_band else 0
 
-    alt_city = _SISTER_CITIES.get(profile.stay.property_city, "Miami")
-    target = alt_city if profile.journey_stage == JourneyStage.CONVERSION_PUSH else profile.stay.property_city
+    alt_city = _SISTER_CITIES.get(city, "Miami")
+    target = alt_city if stage == JourneyStage.CONVERSION_PUSH else city
 
     headline = f"{'Save ' + str(int(base_discount*100)) + '% + ' if base_discount else ''}{' & '.join(perks[:2])}"
 
-    return Offer(
-        guest_id=profile.guest.guest_id,
+    return _OfferTemplate(
         headline=headline,
         body=f"Book direct at NovaStar.com for {target}.",
         discount_pct=base_discount,
         points_bonus=points_bonus,
-        perks=perks,
-        valid_from=date.today(),
-        valid_until=date.today() + timedelta(days=30),
+        perks=tuple(perks),
         target_property=f"NovaStar {target}",
     )
 
 
+# Offer content depends only on the key, so build it once per key.  Call
+# _offer_template.cache_clear() after changing SEGMENT_INTENSITY or
+# _SISTER_CITIES at runtime.
+_offer_template = functools.lru_cache(maxsize=4096)(_build_offer_template)
+
+
+def _issue_offer(template: _OfferTemplate, guest_id: str, today: date | None = None) -> Offer:
+    """Stamp a template with the guest id and a 30-day validity window."""
+    today = today or date.today()
+    return Offer(
+        guest_id=guest_id,
+        headline=template.headline,
+        body=template.body,
+        discount_pct=template.discount_pct,
+        points_bonus=template.points_bonus,
+        perks=list(template.perks),
+        valid_from=today,
+        valid_until=today + timedelta(days=30),
+        target_property=template.target_property,
+    )
+
+
+def _generate_offer(
+    profile: GuestProfile,
+    stage: JourneyStage | None = None,
+    risk: float | None = None,
+) -> Offer:
+    """
+    Offer Selector: next-best-action offer calibrated to segment and risk.
+    Discount depth is margin-protected (Dana, Section 3.1 Stage 5: avg < 12%).
+
+    `stage` and `risk` default to the profile's current values.
+    """
+    risk = profile.churn_risk if risk is None else risk
+    stage = profile.journey_stage if stage is None else stage
+    template = _offer_template(profile.guest.segment, risk > 0.6, risk > 0.7,
+                               stage, profile.stay.property_city)
+    return _issue_offer(template, profile.guest.guest_id)
+
+
 def generate_message(profile: GuestProfile) -> PersonalisedMessage:
     """
     Top-level content generator.
     Selects the right template, fills dynamic fields, attaches an offer
     when appropriate, and decides channel + timing.
     """
-    seg = profile.guest.segment
-    stage = profile.journey_stage
-    templates = _TEMPLATES.get(seg, {})
-    tmpl = templates.get(stage)
+    return _compose_message(profile, profile.journey_stage, profile.churn_risk)
+
+
+def _send_time(segment: GuestSegment, now: datetime | None = None) -> datetime:
+    """Timing model: simple optimal-window heuristic."""
+    send_hour = 9 if segment == GuestSegment.BUSINESS_REGULAR else 18
+    return (now or datetime.now()).replace(hour=send_hour, minute=0, second=0, microsecond=0)
 
-    # Fallback: if no template for this exact combo, use WARM_FAREWELL
-    if tmpl is None:
-        tmpl = templates.get(JourneyStage.WARM_FAREWELL, {
-            "subject": "A note from NovaStar Hotels",
-            "body": "Hi {name},\n\nThank you for choosing NovaStar.\n\n-- NovaStar Hotels",
-        })
+
+def _compose_message(
+    profile: GuestProfile,
+    stage: JourneyStage,
+    risk: float,
+    slot_cache: dict[str, str] | None = None,
+    send_at: datetime | None = None,
+) -> PersonalisedMessage:
+    """
+    `generate_message` for an explicit stage and risk; never mutates `profile`.
+    Cohort planning passes a per-profile `slot_cache` and a shared send time.
+    """
+    seg = profile.guest.segment
+    compiled = _COMPILED_TEMPLATES.get((seg, stage))
+    if compiled is None:
+        compiled = _CompiledTemplate.compile(_resolve_template(seg, stage))
 
     # Build offer for conversion-oriented stages
     offer: Optional[Offer] = None
-    offer_text = ""
     if stage in (
         JourneyStage.CONVERSION_PUSH,
         JourneyStage.CONTEXTUAL_REENGAGEMENT,
         JourneyStage.VALUE_REINFORCEMENT,
     ):
-        offer = _generate_offer(profile)
-        perk_str = ", ".join(offer.perks) if offer.perks else "special perks"
-        discount_str = f"{int(offer.discount_pct * 100)}% off + " if offer.discount_pct else ""
-        offer_text = (
-            f"YOUR OFFER: {discount_str}{perk_str}. "
-            f"{'Plus ' + str(offer.points_bonus) + ' bonus points! ' if offer.points_bonus else ''}"
-            f"Valid until {offer.valid_until.isoformat()}. Book at NovaStar.com."
-        )
-
-    # Resolve variables
-    alt_city = _SISTER_CITIES.get(profile.stay.property_city, "Miami")
-    nights_to_next = max(0, 5 - (profile.loyalty.nights_qualifying if profile.loyalty else 0))
-    pts = profile.loyalty.points_balance if profile.loyalty else 0
-    amenities_str = ", ".join(profile.stay.amenities_used) if profile.stay.amenities_used else "our amenities"
-
-    fill = {
-        "name": profile.guest.first_name,
-        "last_name": profile.guest.last_name,
-        "city": profile.stay.property_city,
-        "property": profile.stay.property_name,
-        "nights": str(profile.stay.nights),
-        "room_type": profile.stay.room_type,
-        "points": str(pts),
-        "nights_to_next": str(nights_to_next),
-        "alt_city": alt_city,
-        "offer_text": offer_text,
-        "amenities": amenities_str,
-    }
-
-    subject = tmpl["subject"]
-    body = tmpl["body"]
-    for k, v in fill.items():
-        subject = subject.replace("{" + k + "}", v)
-        body = body.replace("{" + k + "}", v)
+        offer = _generate_offer(profile, stage, risk)
 
-    channel = _pick_channel(profile.guest, stage)
+    subject, body = compiled.render(profile, offer, slot_cache)
 
-    # Timing model: simple optimal-window heuristic
-    send_hour = 9 if seg == GuestSegment.BUSINESS_REGULAR else 18
-    send_at = datetime.now().replace(hour=send_hour, minute=0, second=0, microsecond=0)
+    channel = _pick_channel(profile.guest, stage)
+    if send_at is None:
+        send_at = _send_time(seg)
 
     return PersonalisedMessage(
         subject_line=subject,
@@ -565,42 +748,98 @@ _TRIGGER_SCHEDULE: list[dict] = [
 ]
 
 
-def build_trigger_plan(profile: GuestProfile) -> list[Trigger]:
-    """
-    Build the full post-stay trigger plan for a guest.
-    Budget Solo guests get fewer touches (Dana, Section 5.3: LOW intensity).
-    """
-    intensity = SEGMENT_INTENSITY.get(profile.guest.segment, "LOW")
-    schedule = _TRIGGER_SCHEDULE[:]
-
-    # LOW-intensity segments skip mid-funnel stages
-    if intensity == "LOW":
-        schedule = [t for t in schedule if t["stage"] in (
+def _schedule_for(segment: GuestSegment) -> list[dict]:
+    """Trigger schedule for a segment.  LOW-intensity segments skip mid-funnel stages."""
+    if SEGMENT_INTENSITY.get(segment, "LOW") == "LOW":
+        return [t for t in _TRIGGER_SCHEDULE if t["stage"] in (
             JourneyStage.WARM_FAREWELL,
             JourneyStage.CONVERSION_PUSH,
         )]
+    return _TRIGGER_SCHEDULE[:]
+
+
+# Precomputed per-segment schedules with each stage's recency risk term,
+# shared by every profile in a cohort
+_SEGMENT_SCHEDULES: dict[GuestSegment, tuple[tuple[JourneyStage, int, float], ...]] = {
+    seg: tuple((t["stage"], t["day"], _recency_risk(t["day"])) for t in _schedule_for(seg))
+    for seg in GuestSegment
+}
+
+
+def _plan_for(profile: GuestProfile, now: datetime | None = None) -> list[Trigger]:
+    """Trigger plan for one profile without mutating it."""
+    schedule = _SEGMENT_SCHEDULES.get(profile.guest.segment)
+    if schedule is None:
+        schedule = tuple((t["stage"], t["day"], _recency_risk(t["day"]))
+                         for t in _schedule_for(profile.guest.segment))
+    terms = _profile_risk_terms(profile)
+    slot_cache: dict[str, str] = {}
+    send_at = _send_time(profile.guest.segment, now)
+    guest_id = profile.guest.guest_id
 
     triggers: list[Trigger] = []
-    for entry in schedule:
-        stage = entry["stage"]
-        profile.journey_stage = stage
-        profile.days_since_checkout = entry["day"]
-        profile.churn_risk = calculate_churn_risk(profile)
-        msg = generate_message(profile)
+    for stage, day, recency in schedule:
+        risk = _combine_risk(recency, *terms)
+        msg = _compose_message(profile, stage, risk, slot_cache, send_at)
         channel = msg.channel
-
         triggers.append(Trigger(
-            guest_id=profile.guest.guest_id,
+            guest_id=guest_id,
             action=f"send_{channel.value}",
             journey_stage=stage,
             channel=channel,
-            day_offset=entry["day"],
+            day_offset=day,
             message=msg,
         ))
+    return triggers
+
 
+def build_trigger_plan(profile: GuestProfile) -> list[Trigger]:
+    """
+    Build the full post-stay trigger plan for a guest.
+    Budget Solo guests get fewer touches (Dana, Section 5.3: LOW intensity).
+
+    Leaves `profile` positioned at the last planned stage (journey_stage,
+    days_since_checkout and churn_risk), as callers displaying the profile
+    expect.  Use `build_trigger_plans` for cohorts.
+    """
+    triggers = _plan_for(profile)
+    if triggers:
+        last = triggers[-1]
+        profile.journey_stage = last.journey_stage
+        profile.days_since_checkout = last.day_offset
+        profile.churn_risk = calculate_churn_risk(profile)
     return triggers
 
 
+def _plan_chunk(profiles: Sequence[GuestProfile], now: datetime) -> list[list[Trigger]]:
+    return [_plan_for(p, now) for p in profiles]
+
+
+def build_trigger_plans(
+    profiles: Sequence[GuestProfile],
+    workers: int | None = 1,
+    chunksize: int = 2_000,
+) -> list[list[Trigger]]:
+    """
+    Cohort-level `build_trigger_plan`: one plan per profile, in input order.
+
+    Profiles are not mutated.  Per-segment schedules and recency risk terms
+    are shared across the cohort, each profile's engagement/channel/loyalty
+    risk terms are computed once rather than per stage, and one send-time
+    base is used for the whole batch.  With `workers` > 1 (None = all
+    cores) the cohort is split into `chunksize` slices across processes.
+    """
+    now = datetime.now()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(profiles) <= chunksize:
+        return _plan_chunk(profiles, now)
+
+    chunks = [profiles[i:i + chunksize] for i in range(0, len(profiles), chunksize)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = pool.map(_plan_chunk, chunks, [now] * len(chunks))
+        return [plan for part in parts for plan in part]
+
+
 # ===================================================================
 # 4. DEMO
 # ===================================================================
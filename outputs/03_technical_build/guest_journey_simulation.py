@@ -14,8 +14,11 @@ Prepared by: Max the Maker (Agent 03, Team AWESOME)
 
 from __future__ import annotations
 
+import hashlib
+import json
 import random
-from dataclasses import dataclass, field
+from collections.abc import Callable, Iterator, Mapping
+from dataclasses import dataclass, field, fields, replace
 from enum import Enum
 
 # ---------------------------------------------------------------------------
@@ -64,6 +67,17 @@ BEFORE_EMAIL_CLICK = 0.021  # per email (unconditional)
 AFTER_EMAIL_OPEN = 0.38
 AFTER_EMAIL_CLICK = 0.08
 
+# Data capture rate: 43% currently (Riley), 75% with engagement system
+BEFORE_CAPTURE_RATE = 0.43
+AFTER_CAPTURE_RATE = 0.75
+
+# App install among loyalty members ~35% target (Dana, Section 7.4)
+APP_INSTALL_RATE = 0.30
+
+# Per-stage push open and organic app-session probabilities (after system)
+PUSH_OPEN_RATE = 0.35
+APP_SESSION_RATE = 0.20
+
 # Dana's 6 journey stages (Section 3.1)
 class Stage(Enum):
     WARM_FAREWELL = 0            # Day 0
@@ -145,6 +159,101 @@ class SimResult:
     # (segment -> (rebooked_count, total_count))
 
 
+class FrozenDict(dict):
+    """Read-only, hashable dict used for the mapping fields of ScenarioConfig."""
+    __slots__ = ()
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError(f"{type(self).__name__} is read-only")
+
+    __setitem__ = __delitem__ = __ior__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+
+    def __hash__(self) -> int:  # type: ignore[override]
+        return hash(frozenset(self.items()))
+
+    def __reduce__(self):
+        return (type(self), (dict(self),))
+
+
+@dataclass(frozen=True)
+class ScenarioConfig:
+    """
+    Immutable description of one simulation scenario.
+
+    Everything `simulate()` needs is carried here and passed explicitly, so
+    any number of simulations can run concurrently in threads or processes
+    without touching module globals.  Defaults describe the BEFORE (current
+    state) scenario; use `before()` / `after()` for the two presets and
+    `dataclasses.replace()` for variants.
+    """
+    label: str = "BEFORE"
+    num_guests: int = NUM_GUESTS
+    seed: int = SEED
+    email_open_rate: float = BEFORE_EMAIL_OPEN
+    email_click_rate: float = BEFORE_EMAIL_CLICK
+    rebook_rates: Mapping[str, float] = field(default_factory=lambda: BEFORE_REBOOK)
+    emails_per_stage: Mapping[Stage, int] = field(default_factory=lambda: BEFORE_EMAILS_PER_STAGE)
+    use_push: bool = False
+    use_app: bool = False
+    capture_rate: float = BEFORE_CAPTURE_RATE
+    app_install_rate: float = APP_INSTALL_RATE
+    push_open_rate: float = PUSH_OPEN_RATE
+    app_session_rate: float = APP_SESSION_RATE
+    intensity: Mapping[str, float] = field(default_factory=lambda: INTENSITY)
+
+    def __post_init__(self) -> None:
+        # Snapshot the mappings so later edits to the source dicts can't leak in
+        for name in ("rebook_rates", "emails_per_stage", "intensity"):
+            object.__setattr__(self, name, FrozenDict(getattr(self, name)))
+        if self.num_guests < 0:
+            raise ValueError(f"num_guests must be >= 0, got {self.num_guests}")
+        for name in ("email_open_rate", "email_click_rate", "capture_rate",
+                     "app_install_rate", "push_open_rate", "app_session_rate"):
+            value = getattr(self, name)
+            if not 0.0 <= value <= 1.0:
+                raise ValueError(f"{name} must be in [0, 1], got {value}")
+
+    @classmethod
+    def before(cls, num_guests: int = NUM_GUESTS, seed: int = SEED, **overrides) -> ScenarioConfig:
+        """Current state: 3 generic emails, 43% capture, no push or app."""
+        return cls(label="BEFORE", num_guests=num_guests, seed=seed, **overrides)
+
+    @classmethod
+    def after(cls, num_guests: int = NUM_GUESTS, seed: int = SEED, **overrides) -> ScenarioConfig:
+        """With the AI engagement system: 6 personalised emails, push and app."""
+        params = dict(
+            label="AFTER",
+            num_guests=num_guests,
+            seed=seed,
+            email_open_rate=AFTER_EMAIL_OPEN,
+            email_click_rate=AFTER_EMAIL_CLICK,
+            rebook_rates=AFTER_REBOOK,
+            emails_per_stage=AFTER_EMAILS_PER_STAGE,
+            use_push=True,
+            use_app=True,
+            capture_rate=AFTER_CAPTURE_RATE,
+        )
+        params.update(overrides)
+        return cls(**params)
+
+    def fingerprint(self) -> str:
+        """
+        Stable SHA-256 hex digest of every parameter.
+
+        Equal configs give equal fingerprints across processes and restarts
+        (unlike `hash()`, which is salted per process for strings).
+        """
+        payload = {}
+        for f in fields(self):
+            value = getattr(self, f.name)
+            if isinstance(value, Mapping):
+                value = sorted((k.name if isinstance(k, Enum) else k, v) for k, v in value.items())
+            payload[f.name] = value
+        blob = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+        return hashlib.sha256(blob.encode()).hexdigest()
+
+
 # ---------------------------------------------------------------------------
 # Simulation Engine
 # ---------------------------------------------------------------------------
@@ -164,30 +273,185 @@ def _assign_segments(rng: random.Random, n: int) -> list[str]:
     return segments
 
 
-def simulate(
-    label: str,
-    rng: random.Random,
-    email_open_rate: float,
-    email_click_rate: float,
-    rebook_rates: dict[str, float],
-    emails_per_stage: dict[Stage, int],
-    use_push: bool = False,
-    use_app: bool = False,
-) -> SimResult:
-    """Run the 90-day simulation for one scenario."""
-
-    segments = _assign_segments(rng, NUM_GUESTS)
+def _segment_counts(n: int) -> list[int]:
+    """Per-segment guest counts, rounded exactly as `_assign_segments` does."""
+    counts = [round(pct * n) for _, pct in SEGMENT_DIST]
+    total = sum(counts)
+    if total < n:
+        counts[0] += n - total
+    # Excess is popped from the end of the list, i.e. the last segments
+    i = len(counts) - 1
+    while total > n:
+        take = min(counts[i], total - n)
+        counts[i] -= take
+        total -= take
+        i -= 1
+    return counts
+
+
+def _stream_segments(rng: random.Random, n: int) -> Iterator[str]:
+    """
+    Yield n segment names with the same counts as `_assign_segments`, in
+    uniformly random order, using O(segments) memory.
+
+    Sequential sampling without replacement: each guest takes segment s
+    with probability remaining[s] / remaining_total, which produces the
+    same distribution of orderings as shuffling the full list.
+    """
+    names = [s for s, _ in SEGMENT_DIST]
+    remaining = _segment_counts(n)
+    left = n
+    while left:
+        pick = rng.random() * left
+        for i, count in enumerate(remaining):
+            if pick < count:
+                break
+            pick -= count
+        else:  # float round-off on the last segment
+            i = max(j for j, c in enumerate(remaining) if c)
+        remaining[i] -= 1
+        left -= 1
+        yield names[i]
+
+
+def _walk_guest(guest: GuestSim, rng: random.Random, config: ScenarioConfig) -> None:
+    """Walk one guest through the 90-day journey, updating it in place."""
+    if not guest.has_email and not guest.has_app:
+        # Guest is unreachable -- mirrors the 57% data-void problem
+        return
+
+    email_open_rate = config.email_open_rate
+    email_click_rate = config.email_click_rate
+    use_push = config.use_push
+    use_app = config.use_app
+    intensity = config.intensity.get(guest.segment, 1.0)
+    cumulative_engagement = 0.0
+
+    for stage in Stage:
+        day = stage.value
+        if day > SIM_DAYS:
+            break
+
+        guest.stages_reached.append(stage.name)
+
+        # --- Emails ---
+        n_emails = config.emails_per_stage.get(stage, 0)
+        for _ in range(n_emails):
+            if guest.has_email:
+                guest.emails_sent += 1
+                if rng.random() < email_open_rate * intensity:
+                    guest.emails_opened += 1
+                    cumulative_engagement += 0.15
+                    if rng.random() < (email_click_rate / email_open_rate):
+                        guest.emails_clicked += 1
+                        cumulative_engagement += 0.25
+
+        # --- Push notifications (after system only) ---
+        if use_push and guest.has_app and stage not in (
+            Stage.WARM_FAREWELL,
+            Stage.ONGOING_RELATIONSHIP,
+        ):
+            guest.push_sent += 1
+            if rng.random() < config.push_open_rate * intensity:
+                guest.push_opened += 1
+                cumulative_engagement += 0.10
+
+        # --- App sessions (organic, after system only) ---
+        if use_app and guest.has_app:
+            if rng.random() < config.app_session_rate * intensity:
+                guest.app_sessions += 1
+                cumulative_engagement += 0.10
+
+    # --- Rebooking decision ---
+    base_rate = config.rebook_rates.get(guest.segment, 0.12)
+
+    # Engagement lift: each unit of cumulative engagement nudges rebooking
+    engagement_boost = min(cumulative_engagement * 0.08, 0.10)
+    final_prob = min(base_rate + engagement_boost, 0.60)
+
+    if rng.random() < final_prob:
+        guest.rebooked = True
+        # Estimate rebook day (weighted toward later stages)
+        guest.rebook_day = rng.randint(30, SIM_DAYS)
+
+
+class _Accumulator:
+    """Running per-segment totals; folds guests into a SimResult one at a time."""
+
+    def __init__(self, label: str, total_guests: int) -> None:
+        self.result = SimResult(label=label, total_guests=total_guests)
+        self.seg_counts: dict[str, list[int]] = {s: [0, 0] for s, _ in SEGMENT_DIST}
+
+    def add(self, g: GuestSim) -> None:
+        result = self.result
+        if g.has_email:
+            result.guests_with_email += 1
+        result.total_emails_sent += g.emails_sent
+        result.total_emails_opened += g.emails_opened
+        result.total_emails_clicked += g.emails_clicked
+        result.total_push_sent += g.push_sent
+        result.total_push_opened += g.push_opened
+        result.total_app_sessions += g.app_sessions
+        if g.rebooked:
+            result.total_rebooked += 1
+        self.seg_counts[g.segment][1] += 1
+        if g.rebooked:
+            self.seg_counts[g.segment][0] += 1
+
+    def finish(self) -> SimResult:
+        self.result.rebook_by_segment = {s: (v[0], v[1]) for s, v in self.seg_counts.items()}
+        return self.result
+
+    def snapshot(self) -> SimResult:
+        """Copy of the running totals, safe to hand out mid-run."""
+        partial = replace(self.result)
+        partial.rebook_by_segment = {s: (v[0], v[1]) for s, v in self.seg_counts.items()}
+        return partial
+
+
+class GuestReservoir:
+    """
+    Fixed-size uniform sample of simulated guests (reservoir sampling,
+    Algorithm R).  Opt-in debugging aid for streaming runs: keeps `size`
+    example guests however large the population is.
+
+    Uses its own RNG so sampling never perturbs the simulation stream.
+    """
+
+    def __init__(self, size: int = 10, seed: int | None = None) -> None:
+        self.size = size
+        self.seen = 0
+        self.guests: list[GuestSim] = []
+        self._rng = random.Random(seed)
+
+    def offer(self, guest: GuestSim) -> None:
+        self.seen += 1
+        if len(self.guests) < self.size:
+            self.guests.append(guest)
+            return
+        j = self._rng.randrange(self.seen)
+        if j < self.size:
+            self.guests[j] = guest
+
+
+def simulate(config: ScenarioConfig, rng: random.Random | None = None) -> SimResult:
+    """
+    Run the 90-day simulation for one scenario.
+
+    `rng` defaults to `random.Random(config.seed)`.
+    """
+    if rng is None:
+        rng = random.Random(config.seed)
+
+    segments = _assign_segments(rng, config.num_guests)
     guests: list[GuestSim] = []
 
     for i, seg in enumerate(segments):
-        # Data capture rate: 43% currently (Riley), 75% with engagement system
-        capture_rate = 0.75 if label == "AFTER" else 0.43
-        has_email = rng.random() < capture_rate
+        has_email = rng.random() < config.capture_rate
 
         has_app_flag = False
-        if use_app and has_email:
-            # App install among loyalty members ~35% target (Dana, Section 7.4)
-            has_app_flag = rng.random() < 0.30
+        if config.use_app and has_email:
+            has_app_flag = rng.random() < config.app_install_rate
 
         guests.append(GuestSim(
             guest_id=i,
@@ -198,89 +462,68 @@ def simulate(
 
     # Walk each guest through the 90-day journey
     for guest in guests:
-        if not guest.has_email and not guest.has_app:
-            # Guest is unreachable -- mirrors the 57% data-void problem
-            continue
-
-        intensity = INTENSITY.get(guest.segment, 1.0)
-        cumulative_engagement = 0.0
-
-        for stage in Stage:
-            day = stage.value
-            if day > SIM_DAYS:
-                break
-
-            guest.stages_reached.append(stage.name)
-
-            # --- Emails ---
-            n_emails = emails_per_stage.get(stage, 0)
-            for _ in range(n_emails):
-                if guest.has_email:
-                    guest.emails_sent += 1
-                    if rng.random() < email_open_rate * intensity:
-                        guest.emails_opened += 1
-                        cumulative_engagement += 0.15
-                        if rng.random() < (email_click_rate / email_open_rate):
-                            guest.emails_clicked += 1
-                            cumulative_engagement += 0.25
-
-            # --- Push notifications (after system only) ---
-            if use_push and guest.has_app and stage not in (
-                Stage.WARM_FAREWELL,
-                Stage.ONGOING_RELATIONSHIP,
-            ):
-                guest.push_sent += 1
-                if rng.random() < 0.35 * intensity:  # push open ~35%
-                    guest.push_opened += 1
-                    cumulative_engagement += 0.10
-
-            # --- App sessions (organic, after system only) ---
-            if use_app and guest.has_app:
-                if rng.random() < 0.20 * intensity:
-                    guest.app_sessions += 1
-                    cumulative_engagement += 0.10
-
-        # --- Rebooking decision ---
-        base_rate = rebook_rates.get(guest.segment, 0.12)
-
-        # Engagement lift: each unit of cumulative engagement nudges rebooking
-        engagement_boost = min(cumulative_engagement * 0.08, 0.10)
-        final_prob = min(base_rate + engagement_boost, 0.60)
-
-        if rng.random() < final_prob:
-            guest.rebooked = True
-            # Estimate rebook day (weighted toward later stages)
-            guest.rebook_day = rng.randint(30, SIM_DAYS)
+        _walk_guest(guest, rng, config)
 
     # --- Aggregate ---
-    result = SimResult(label=label, total_guests=NUM_GUESTS)
-    seg_counts: dict[str, list[int]] = {s: [0, 0] for s, _ in SEGMENT_DIST}
-
+    acc = _Accumulator(config.label, config.num_guests)
     for g in guests:
-        if g.has_email:
-            result.guests_with_email += 1
-        result.total_emails_sent += g.emails_sent
-        result.total_emails_opened += g.emails_opened
-        result.total_emails_clicked += g.emails_clicked
-        result.total_push_sent += g.push_sent
-        result.total_push_opened += g.push_opened
-        result.total_app_sessions += g.app_sessions
-        if g.rebooked:
-            result.total_rebooked += 1
-        seg_counts[g.segment][1] += 1
-        if g.rebooked:
-            seg_counts[g.segment][0] += 1
-
-    result.rebook_by_segment = {s: (v[0], v[1]) for s, v in seg_counts.items()}
-    return result
+        acc.add(g)
+    return acc.finish()
+
+
+def iter_guest_journeys(config: ScenarioConfig, rng: random.Random | None = None) -> Iterator[GuestSim]:
+    """
+    Generate guests one at a time, each already walked through the journey.
+
+    Same model as `simulate()`, but segments are drawn sequentially and each
+    guest's capture/app rolls happen just before its walk, so nothing is
+    kept in memory.  Results are statistically equivalent to `simulate()`
+    but not draw-for-draw identical for the same seed.
+    """
+    if rng is None:
+        rng = random.Random(config.seed)
+
+    for i, seg in enumerate(_stream_segments(rng, config.num_guests)):
+        has_email = rng.random() < config.capture_rate
+        has_app_flag = config.use_app and has_email and rng.random() < config.app_install_rate
+        guest = GuestSim(guest_id=i, segment=seg, has_email=has_email, has_app=has_app_flag)
+        _walk_guest(guest, rng, config)
+        yield guest
+
+
+def simulate_streaming(
+    config: ScenarioConfig,
+    rng: random.Random | None = None,
+    reservoir: GuestReservoir | None = None,
+    on_progress: Callable[[int, SimResult], None] | None = None,
+    progress_every: int = 10_000,
+) -> SimResult:
+    """
+    Streaming variant of `simulate()` with O(segments) memory.
+
+    Each guest from `iter_guest_journeys()` is folded straight into running
+    per-segment accumulators and then dropped.  Pass a `GuestReservoir` to
+    keep a small uniform sample of example guests for debugging, and
+    `on_progress(guests_processed, partial_result)` to be called every
+    `progress_every` guests with a snapshot of the running totals.
+    """
+    acc = _Accumulator(config.label, config.num_guests)
+    for processed, guest in enumerate(iter_guest_journeys(config, rng), 1):
+        acc.add(guest)
+        if reservoir is not None:
+            reservoir.offer(guest)
+        if on_progress is not None and processed % progress_every == 0:
+            on_progress(processed, acc.snapshot())
+    return acc.finish()
 
 
 # ---------------------------------------------------------------------------
 # Reporting
 # ---------------------------------------------------------------------------
 
-def print_report(before: SimResult, after: SimResult) -> None:
+def print_report(before: SimResult, after: SimResult, seed: int = SEED) -> None:
     """Pretty-print comparative results."""
+    num_guests = before.total_guests
 
     def pct(n: int, d: int) -> str:
         return f"{n/d*100:.1f}%" if d > 0 else "N/A"
@@ -288,7 +531,7 @@ def print_report(before: SimResult, after: SimResult) -> None:
     w = 72
     print("=" * w)
     print("  NovaStar Hotels -- 90-Day Post-Stay Journey Simulation")
-    print(f"  {NUM_GUESTS} guests, {SIM_DAYS} days, seed={SEED}")
+    print(f"  {num_guests:,} guests, {SIM_DAYS} days, seed={seed}")
     print("=" * w)
 
     print(f"\n{'Metric':<40} {'BEFORE':>12} {'AFTER':>12}  {'Delta':>8}")
@@ -331,8 +574,8 @@ def print_report(before: SimResult, after: SimResult) -> None:
          f"+{after.total_app_sessions - before.total_app_sessions}"),
 
         ("REBOOKED (total)",
-         f"{before.total_rebooked} ({pct(before.total_rebooked, NUM_GUESTS)})",
-         f"{after.total_rebooked} ({pct(after.total_rebooked, NUM_GUESTS)})",
+         f"{before.total_rebooked} ({pct(before.total_rebooked, num_guests)})",
+         f"{after.total_rebooked} ({pct(after.total_rebooked, num_guests)})",
          f"+{after.total_rebooked - before.total_rebooked}"),
     ]
 
@@ -351,7 +594,7 @@ def print_report(before: SimResult, after: SimResult) -> None:
         print(f"  {seg:<38} {b_str:>12} {a_str:>12}  {'+' if delta >= 0 else ''}{delta:>7}")
 
     # Financial projections (scaled to 80,000 guests)
-    scale = 80_000 / NUM_GUESTS
+    scale = 80_000 / num_guests if num_guests > 0 else 0.0   # empty run: nothing to scale
     b_repeat_80k = int(before.total_rebooked * scale)
     a_repeat_80k = int(after.total_rebooked * scale)
     incremental = a_repeat_80k - b_repeat_80k
@@ -378,28 +621,6 @@ def print_report(before: SimResult, after: SimResult) -> None:
 # ---------------------------------------------------------------------------
 
 if __name__ == "__main__":
-    rng_before = random.Random(SEED)
-    before = simulate(
-        label="BEFORE",
-        rng=rng_before,
-        email_open_rate=BEFORE_EMAIL_OPEN,
-        email_click_rate=BEFORE_EMAIL_CLICK,
-        rebook_rates=BEFORE_REBOOK,
-        emails_per_stage=BEFORE_EMAILS_PER_STAGE,
-        use_push=False,
-        use_app=False,
-    )
-
-    rng_after = random.Random(SEED)
-    after = simulate(
-        label="AFTER",
-        rng=rng_after,
-        email_open_rate=AFTER_EMAIL_OPEN,
-        email_click_rate=AFTER_EMAIL_CLICK,
-        rebook_rates=AFTER_REBOOK,
-        emails_per_stage=AFTER_EMAILS_PER_STAGE,
-        use_push=True,
-        use_app=True,
-    )
-
+    before = simulate(ScenarioConfig.before(NUM_GUESTS, SEED))
+    after = simulate(ScenarioConfig.after(NUM_GUESTS, SEED))
     print_report(before, after)
@@ -0,0 +1,437 @@
+"""
+NovaStar Hotels -- Columnar Guest Store
+========================================
+The whole guest base as one NumPy structured array: one row per guest
+holding the `Guest`, their latest `Stay`, their `LoyaltyAccount` (if any)
+and the running engagement score.
+
+  - enums            -> int8 codes (position in enum definition order,
+                        shared with `vectorized_scoring`)
+  - dates            -> int32 day numbers since 1970-01-01
+  - timestamps       -> datetime64[us]
+  - strings / ids    -> int32 indexes into an interned `StringTable`
+                        (-1 for None), so repeated cities, room types and
+                        trip purposes are stored once
+
+Rows are found by `guest_id` in O(1) through a dict index.  `column()`
+returns a zero-copy view of one field, and the `churn_columns()` /
+`stay_features()` / `simulation_segment_codes()` helpers produce exactly
+the inputs the vectorized scorers and simulator take.  `add()` and
+`profile()` adapt to and from the dataclasses for row-at-a-time code.
+
+Views are only valid until the store next grows; take them after loading.
+
+Requires NumPy.  Python 3.10+.
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime
+
+import numpy as np
+
+from data_models import (
+    BookingChannel,
+    Guest,
+    GuestPreferences,
+    GuestSegment,
+    LoyaltyAccount,
+    Stay,
+)
+from engagement_engine import GuestProfile, _is_group_purpose, _uses_family_amenity
+from vectorized_scoring import (
+    _CHANNEL_INDEX,
+    _SEGMENT_INDEX,
+    _TIER_INDEX,
+    CHANNEL_CODES,
+    SEGMENT_CODES,
+    TIER_CODES,
+    StayFeatures,
+    tier_code,
+)
+from vectorized_simulation import SEGMENT_NAMES
+
+_EPOCH = date(1970, 1, 1).toordinal()
+_NONE = -1                                  # missing string / NPS
+_LIST_SEP = "\x1f"                          # joins list[str] fields into one interned string
+
+GUEST_DTYPE = np.dtype([
+    # Guest
+    ("guest_id", np.int32),
+    ("first_name", np.int32),
+    ("last_name", np.int32),
+    ("email", np.int32),
+    ("phone", np.int32),
+    ("segment", np.int8),
+    ("has_app", np.bool_),
+    ("data_capture_complete", np.bool_),
+    ("created_at", "datetime64[us]"),
+    ("engagement_score", np.float64),
+    # Latest stay
+    ("has_stay", np.bool_),
+    ("stay_id", np.int32),
+    ("property_name", np.int32),
+    ("property_city", np.int32),
+    ("check_in", np.int32),
+    ("check_out", np.int32),
+    ("nights", np.int16),
+    ("room_type", np.int32),
+    ("rate_per_night", np.float64),
+    ("total_spend", np.float64),
+    ("booking_channel", np.int8),
+    ("trip_purpose", np.int32),
+    ("nps_score", np.int8),
+    ("amenities_used", np.int32),
+    # Loyalty account
+    ("has_loyalty", np.bool_),
+    ("account_id", np.int32),
+    ("tier", np.int8),
+    ("points_balance", np.int64),
+    ("points_lifetime", np.int64),
+    ("nights_qualifying", np.int32),
+    ("stays_qualifying", np.int32),
+    ("enrolled_date", np.int32),
+    ("last_activity", np.int32),
+    ("is_active", np.bool_),
+])
+
+# GuestSegment code -> vectorized_simulation segment index
+_SIM_SEGMENT = np.array(
+    [SEGMENT_NAMES.index(seg.value.replace(" / ", "/")) for seg in SEGMENT_CODES], dtype=np.int8,
+)
+
+
+def _day(d: date) -> int:
+    return d.toordinal() - _EPOCH
+
+
+def _date(n: int) -> date:
+    return date.fromordinal(int(n) + _EPOCH)
+
+
+# ---------------------------------------------------------------------------
+# String interning
+# ---------------------------------------------------------------------------
+
+class StringTable:
+    """Interned strings: each distinct value is stored once and referenced by index."""
+
+    def __init__(self) -> None:
+        self._values: list[str] = []
+        self._index: dict[str, int] = {}
+
+    def intern(self, value: str | None) -> int:
+        if value is None:
+            return _NONE
+        i = self._index.get(value)
+        if i is None:
+            i = self._index[value] = len(self._values)
+            self._values.append(value)
+        return i
+
+    def lookup(self, i: int) -> str | None:
+        return None if i == _NONE else self._values[i]
+
+    @property
+    def values(self) -> list[str]:
+        """All interned strings, indexed by code (do not mutate)."""
+        return self._values
+
+    def code_of(self, value: str) -> int:
+        """Index of `value`, or -1 if it was never interned."""
+        return self._index.get(value, _NONE)
+
+    def flags(self, codes: np.ndarray, test) -> np.ndarray:
+        """`test(string)` per row of a code column, evaluated once per distinct code."""
+        distinct, inverse = np.unique(codes, return_inverse=True)
+        by_code = np.fromiter((test(self._values[c]) for c in distinct), np.bool_, len(distinct))
+        return by_code[inverse]
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+class GuestStore:
+    """One structured-array row per guest, indexed by guest_id."""
+
+    def __init__(self, capacity: int = 1_024) -> None:
+        self._rows = np.zeros(max(1, capacity), dtype=GUEST_DTYPE)
+        self._n = 0
+        self._row_of: dict[str, int] = {}
+        self.strings = StringTable()
+
+    @classmethod
+    def from_profiles(cls, profiles: Iterable[GuestProfile]) -> GuestStore:
+        profiles = profiles if isinstance(profiles, list) else list(profiles)
+        store = cls(capacity=len(profiles))
+        for p in profiles:
+            store.add(p.guest, p.stay, p.loyalty, p.engagement_score)
+        return store
+
+    # -- writes -----------------------------------------------------------
+
+    def add(
+        self,
+        guest: Guest,
+        stay: Stay | None = None,
+        loyalty: LoyaltyAccount | None = None,
+        engagement_score: float = 0.0,
+    ) -> int:
+        """Insert a guest, or overwrite their row if already present.  Returns the row."""
+        row = self._row_of.get(guest.guest_id)
+        if row is None:
+            if self._n == len(self._rows):
+                self._grow()
+            row = self._n
+            self._n += 1
+            self._row_of[guest.guest_id] = row
+        s = self.strings.intern
+        r = self._rows[row]
+
+        r["guest_id"] = s(guest.guest_id)
+        r["first_name"] = s(guest.first_name)
+        r["last_name"] = s(guest.last_name)
+        r["email"] = s(guest.email)
+        r["phone"] = s(guest.phone)
+        r["segment"] = _SEGMENT_INDEX[guest.segment]
+        r["has_app"] = guest.has_app
+        r["data_capture_complete"] = guest.data_capture_complete
+        r["created_at"] = np.datetime64(guest.created_at, "us")
+        r["engagement_score"] = engagement_score
+
+        r["has_stay"] = stay is not None
+        if stay is not None:
+            r["stay_id"] = s(stay.stay_id)
+            r["property_name"] = s(stay.property_name)
+            r["property_city"] = s(stay.property_city)
+            r["check_in"] = _day(stay.check_in)
+            r["check_out"] = _day(stay.check_out)
+            r["nights"] = stay.nights
+            r["room_type"] = s(stay.room_type)
+            r["rate_per_night"] = stay.rate_per_night
+            r["total_spend"] = stay.total_spend
+            r["booking_channel"] = _CHANNEL_INDEX[stay.booking_channel]
+            r["trip_purpose"] = s(stay.trip_purpose)
+            r["nps_score"] = _NONE if stay.nps_score is None else stay.nps_score
+            r["amenities_used"] = s(_LIST_SEP.join(stay.amenities_used))
+
+        r["has_loyalty"] = loyalty is not None
+        if loyalty is not None:
+            r["account_id"] = s(loyalty.account_id)
+            r["tier"] = _TIER_INDEX[loyalty.tier]
+            r["points_balance"] = loyalty.points_balance
+            r["points_lifetime"] = loyalty.points_lifetime
+            r["nights_qualifying"] = loyalty.nights_qualifying
+            r["stays_qualifying"] = loyalty.stays_qualifying
+            r["enrolled_date"] = _day(loyalty.enrolled_date)
+            r["last_activity"] = _day(loyalty.last_activity)
+            r["is_active"] = loyalty.is_active
+        else:
+            r["tier"] = tier_code(None)
+        return row
+
+    def _grow(self) -> None:
+        rows = np.zeros(len(self._rows) * 2, dtype=GUEST_DTYPE)
+        rows[: self._n] = self._rows[: self._n]
+        self._rows = rows
+
+    # -- lookups ----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __contains__(self, guest_id: str) -> bool:
+        return guest_id in self._row_of
+
+    def row_of(self, guest_id: str) -> int:
+        """Row number of a guest (KeyError if absent)."""
+        return self._row_of[guest_id]
+
+    @property
+    def rows(self) -> np.ndarray:
+        """The live rows as a structured-array view."""
+        return self._rows[: self._n]
+
+    def column(self, name: str) -> np.ndarray:
+        """Zero-copy view of one column."""
+        return self._rows[name][: self._n]
+
+    # -- scorer / simulator inputs ----------------------------------------
+
+    def days_since_checkout(self, today: date) -> np.ndarray:
+        return _day(today) - self.column("check_out").astype(np.int64)
+
+    def churn_columns(self, today: date) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Arguments for `vectorized_scoring.score_churn_batch`, as of `today`."""
+        return (
+            self.days_since_checkout(today),
+            self.column("engagement_score"),
+            self.column("booking_channel"),
+            self.column("tier"),
+        )
+
+    def stay_features(self) -> StayFeatures:
+        """
+        Arguments for `vectorized_scoring.classify_segments_batch`.  Keyword
+        and amenity tests run once per distinct interned string.
+        """
+        flags = self.strings.flags
+        return StayFeatures(
+            corporate=self.column("booking_channel") == _CHANNEL_INDEX[BookingChannel.CORPORATE],
+            nights=self.column("nights").astype(np.int32),
+            rate_per_night=self.column("rate_per_night"),
+            group_purpose=flags(self.column("trip_purpose"), _is_group_purpose),
+            family_amenity=flags(self.column("amenities_used"),
+                                 lambda v: _uses_family_amenity(v.split(_LIST_SEP))),
+        )
+
+    def simulation_segment_codes(self) -> np.ndarray:
+        """Segment codes in `vectorized_simulation.SEGMENT_NAMES` order (Population.codes)."""
+        return _SIM_SEGMENT[self.column("segment")]
+
+    # -- dataclass adapters -----------------------------------------------
+
+    def guest(self, row: int) -> Guest:
+        r, t = self._rows[row], self.strings.lookup
+        return Guest(
+            guest_id=t(r["guest_id"]),
+            first_name=t(r["first_name"]),
+            last_name=t(r["last_name"]),
+            email=t(r["email"]),
+            phone=t(r["phone"]),
+            segment=SEGMENT_CODES[r["segment"]],
+            has_app=bool(r["has_app"]),
+            data_capture_complete=bool(r["data_capture_complete"]),
+            created_at=r["created_at"].astype(datetime),
+        )
+
+    def stay(self, row: int) -> Stay | None:
+        r, t = self._rows[row], self.strings.lookup
+        if not r["has_stay"]:
+            return None
+        amenities = t(r["amenities_used"])
+        return Stay(
+            stay_id=t(r["stay_id"]),
+            guest_id=t(r["guest_id"]),
+            property_name=t(r["property_name"]),
+            property_city=t(r["property_city"]),
+            check_in=_date(r["check_in"]),
+            check_out=_date(r["check_out"]),
+            nights=int(r["nights"]),
+            room_type=t(r["room_type"]),
+            rate_per_night=float(r["rate_per_night"]),
+            total_spend=float(r["total_spend"]),
+            booking_channel=CHANNEL_CODES[r["booking_channel"]],
+            trip_purpose=t(r["trip_purpose"]),
+            nps_score=None if r["nps_score"] == _NONE else int(r["nps_score"]),
+            amenities_used=amenities.split(_LIST_SEP) if amenities else [],
+        )
+
+    def loyalty(self, row: int) -> LoyaltyAccount | None:
+        r, t = self._rows[row], self.strings.lookup
+        if not r["has_loyalty"]:
+            return None
+        return LoyaltyAccount(
+            account_id=t(r["account_id"]),
+            guest_id=t(r["guest_id"]),
+            tier=TIER_CODES[r["tier"]],
+            points_balance=int(r["points_balance"]),
+            points_lifetime=int(r["points_lifetime"]),
+            nights_qualifying=int(r["nights_qualifying"]),
+            stays_qualifying=int(r["stays_qualifying"]),
+            enrolled_date=_date(r["enrolled_date"]),
+            last_activity=_date(r["last_activity"]),
+            is_active=bool(r["is_active"]),
+        )
+
+    def profile(self, guest_id: str, today: date | None = None) -> GuestProfile:
+        """Rebuild a GuestProfile for the engine's row-at-a-time paths."""
+        row = self._row_of[guest_id]
+        guest, stay = self.guest(row), self.stay(row)
+        if stay is None:
+            raise ValueError(f"guest {guest_id} has no stay on record")
+        return GuestProfile(
+            guest=guest,
+            stay=stay,
+            preferences=GuestPreferences(guest_id=guest_id),
+            loyalty=self.loyalty(row),
+            engagement_score=float(self._rows[row]["engagement_score"]),
+            days_since_checkout=(today - stay.check_out).days if today else 0,
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        """Guest ids in row order."""
+        return iter(self._row_of)
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the live rows (excluding the string table)."""
+        return self._rows[: self._n].nbytes
+
+
+# ---------------------------------------------------------------------------
+# Check
+# ---------------------------------------------------------------------------
+
+def check_store(guests: int = 50_000, seed: int = 42) -> bool:
+    """
+    Load synthetic profiles, then verify dataclass round-trips and that
+    store-fed batch scoring matches the per-profile functions.
+    """
+    import random
+
+    from data_models import make_sample_guest, make_sample_loyalty, make_sample_stay
+    from engagement_engine import calculate_churn_risk, classify_segment
+    from vectorized_scoring import classify_segments_batch, score_churn_batch
+
+    rng = random.Random(seed)
+    cities = ["Austin", "Orlando", "Chicago", "Lisbon", "London", "Osaka"]
+    profiles = []
+    for _ in range(guests):
+        guest = make_sample_guest(rng.choice(list(GuestSegment)))
+        stay = make_sample_stay(guest, property_city=rng.choice(cities))
+        stay.trip_purpose = rng.choice(["", "Wedding", "conference event", "leisure"])
+        stay.nps_score = rng.choice([None, 3, 9])
+        profiles.append(GuestProfile(
+            guest=guest, stay=stay, preferences=GuestPreferences(guest_id=guest.guest_id),
+            loyalty=make_sample_loyalty(guest) if rng.random() < 0.6 else None,
+            engagement_score=rng.random(),
+        ))
+
+    t0 = time.perf_counter()
+    store = GuestStore.from_profiles(profiles)
+    t_load = time.perf_counter() - t0
+
+    today = date(2026, 3, 1)
+    round_trip = all(
+        store.guest(i) == p.guest and store.stay(i) == p.stay and store.loyalty(i) == p.loyalty
+        for i, p in enumerate(profiles)
+    )
+    for p in profiles:
+        p.days_since_checkout = (today - p.stay.check_out).days
+    churn_ok = bool((score_churn_batch(*store.churn_columns(today))
+                     == np.array([calculate_churn_risk(p) for p in profiles])).all())
+    seg_ok = bool((classify_segments_batch(store.stay_features())
+                   == np.array([_SEGMENT_INDEX[classify_segment(p.stay)] for p in profiles])).all())
+    lookup_ok = all(store.row_of(p.guest.guest_id) == i for i, p in enumerate(profiles))
+
+    print(f"GuestStore, {guests:,} guests loaded in {t_load:.2f}s: "
+          f"{store.nbytes / guests:.0f} bytes/row + {len(store.strings):,} interned strings")
+    print(f"  dataclass round-trip: {round_trip}   row lookup: {lookup_ok}   "
+          f"churn == calculate_churn_risk: {churn_ok}   segments == classify_segment: {seg_ok}")
+    return round_trip and lookup_ok and churn_ok and seg_ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Columnar guest store self-check")
+    parser.add_argument("--guests", type=int, default=50_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    raise SystemExit(0 if check_store(args.guests, args.seed) else 1)
@@ -0,0 +1,356 @@
+"""
+NovaStar Hotels -- Identity Resolution
+=======================================
+Local matching engine that links OTA-masked guest records (`email` None or
+an OTA relay address) to the real profiles they belong to, so the 57%
+"data void" shrinks without waiting for the guest to hand over an email.
+
+Blocking, scoring and merging, never all pairs:
+
+  1. every guest record emits a few blocking keys into hash indexes
+       - normalised last name + first initial + phone suffix
+       - normalised email (real addresses only)
+       - hash of each payment token used on their stays
+       - normalised last name + stay city + check-in day (with a +1 day
+         key, so stays a day apart share a block)
+     blocks larger than `max_block` (common surname at a big property)
+     are skipped as uninformative
+  2. only records sharing a block become candidate pairs; each pair gets
+     an additive evidence score (`MatchWeights`) with penalties for
+     conflicting emails / phones
+  3. pairs at or above `threshold` are merged with union-find, strongest
+     first, so transitive matches (A~B via card, B~C via phone) form one
+     cluster -- unless that would join two different real email addresses
+
+Cost is O(records x keys + candidate pairs) instead of the O(n^2) of
+comparing every pair.
+
+    result = resolve(guests, stays, payment_tokens)
+    result.cluster_of["G123"]       # all guest_ids of that person
+    golden = result.golden_records(guests)
+
+Standard-library only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import unicodedata
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass, field
+from difflib import SequenceMatcher
+
+from data_models import Guest, Stay
+
+# Relay domains OTAs use instead of the guest's address
+_RELAY_DOMAINS = ("guest.booking.com", "m.expediapartnercentral.com", "relay.otas.example")
+
+
+@dataclass(frozen=True)
+class MatchWeights:
+    """Additive evidence per matching signal; a pair merges at `resolve(threshold=...)`."""
+    email: float = 1.0
+    payment: float = 0.7
+    phone: float = 0.45             # full normalised number
+    phone_suffix: float = 0.15      # last 4 digits only
+    last_name: float = 0.25
+    last_name_fuzzy: float = 0.15   # e.g. Thompson / Thomson
+    first_name: float = 0.15
+    first_initial: float = 0.05
+    stay_nearby: float = 0.2        # same city, check-ins at most a day apart
+    email_conflict: float = -0.6    # both have real, different addresses
+    phone_conflict: float = -0.3
+
+
+# ---------------------------------------------------------------------------
+# Normalisation
+# ---------------------------------------------------------------------------
+
+def normalize_name(name: str | None) -> str:
+    """Lower-case ASCII letters only: 'Ó’Brien ' -> 'obrien'."""
+    if not name:
+        return ""
+    ascii_name = unicodedata.normalize("NFKD", name).encode("ascii", "ignore").decode()
+    return "".join(ch for ch in ascii_name.lower() if ch.isalpha())
+
+
+def normalize_phone(phone: str | None) -> str:
+    """Digits only, last 10 (drops country code and formatting)."""
+    if not phone:
+        return ""
+    return "".join(ch for ch in phone if ch.isdigit())[-10:]
+
+
+def normalize_email(email: str | None) -> str | None:
+    """Lower-cased address without +tags; None for missing or OTA relay addresses."""
+    if not email or "@" not in email:
+        return None
+    local, _, domain = email.strip().lower().rpartition("@")
+    if domain.endswith(_RELAY_DOMAINS):
+        return None
+    return f"{local.split('+', 1)[0]}@{domain}"
+
+
+def payment_hash(token: str) -> str:
+    """Stable digest of a payment token; the index never holds the token itself."""
+    return hashlib.sha256(token.encode()).hexdigest()[:20]
+
+
+# ---------------------------------------------------------------------------
+# Records and blocking
+# ---------------------------------------------------------------------------
+
+@dataclass(slots=True)
+class IdentityRecord:
+    """Normalised matching view of one guest record."""
+    guest_id: str
+    first: str
+    last: str
+    email: str | None
+    phone: str
+    payments: frozenset[str] = frozenset()
+    stays: frozenset[tuple[str, int]] = frozenset()     # (city, check-in ordinal)
+
+    def blocking_keys(self) -> list[str]:
+        keys = []
+        if self.last and self.phone:
+            keys.append(f"np:{self.last}|{self.first[:1]}|{self.phone[-4:]}")
+        if self.email:
+            keys.append(f"e:{self.email}")
+        keys.extend(f"p:{h}" for h in self.payments)
+        if self.last:
+            for city, day in self.stays:
+                keys.append(f"s:{self.last}|{city}|{day}")
+                keys.append(f"s:{self.last}|{city}|{day + 1}")
+        return keys
+
+
+def build_records(
+    guests: Iterable[Guest],
+    stays: Iterable[Stay] = (),
+    payment_tokens: Mapping[str, str] | None = None,
+) -> list[IdentityRecord]:
+    """
+    Matching records for `guests`, with their stays and the payment tokens
+    used on them (`payment_tokens` maps stay_id -> token).
+    """
+    tokens = payment_tokens or {}
+    by_guest: dict[str, tuple[set, set]] = {}
+    for stay in stays:
+        places, payments = by_guest.setdefault(stay.guest_id, (set(), set()))
+        places.add((normalize_name(stay.property_city), stay.check_in.toordinal()))
+        token = tokens.get(stay.stay_id)
+        if token:
+            payments.add(payment_hash(token))
+    records = []
+    for g in guests:
+        places, payments = by_guest.get(g.guest_id, ((), ()))
+        records.append(IdentityRecord(
+            guest_id=g.guest_id,
+            first=normalize_name(g.first_name),
+            last=normalize_name(g.last_name),
+            email=normalize_email(g.email),
+            phone=normalize_phone(g.phone),
+            payments=frozenset(payments),
+            stays=frozenset(places),
+        ))
+    return records
+
+
+class BlockingIndex:
+    """Hash index of blocking key -> record positions."""
+
+    def __init__(self, max_block: int = 64) -> None:
+        self.max_block = max_block
+        self.blocks: dict[str, list[int]] = {}
+
+    def add(self, position: int, keys: Iterable[str]) -> None:
+        blocks = self.blocks
+        for key in keys:
+            members = blocks.get(key)
+            if members is None:
+                blocks[key] = [position]
+            elif not members or members[-1] != position:
+                members.append(position)
+
+    def candidate_pairs(self) -> set[tuple[int, int]]:
+        """Distinct (i, j), i < j, sharing at least one block of usable size."""
+        pairs: set[tuple[int, int]] = set()
+        for members in self.blocks.values():
+            n = len(members)
+            if n < 2 or n > self.max_block:
+                continue
+            for a in range(n):
+                i = members[a]
+                for b in range(a + 1, n):
+                    j = members[b]
+                    pairs.add((i, j) if i < j else (j, i))
+        return pairs
+
+    @property
+    def skipped_blocks(self) -> int:
+        return sum(1 for m in self.blocks.values() if len(m) > self.max_block)
+
+
+# ---------------------------------------------------------------------------
+# Scoring
+# ---------------------------------------------------------------------------
+
+def _stays_nearby(a: frozenset, b: frozenset) -> bool:
+    if not a or not b:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    return any((city, day) in b or (city, day - 1) in b or (city, day + 1) in b for city, day in a)
+
+
+def score_pair(a: IdentityRecord, b: IdentityRecord, w: MatchWeights = MatchWeights()) -> float:
+    """Evidence that two records are the same person."""
+    score = 0.0
+    if a.email and b.email:
+        score += w.email if a.email == b.email else w.email_conflict
+    if a.payments & b.payments:
+        score += w.payment
+    if a.phone and b.phone:
+        if a.phone == b.phone:
+            score += w.phone
+        elif a.phone[-4:] == b.phone[-4:]:
+            score += w.phone_suffix
+        else:
+            score += w.phone_conflict
+    if a.last and b.last:
+        if a.last == b.last:
+            score += w.last_name
+        elif a.last[0] == b.last[0] and SequenceMatcher(None, a.last, b.last).ratio() >= 0.85:
+            score += w.last_name_fuzzy
+    if a.first and b.first:
+        if a.first == b.first:
+            score += w.first_name
+        elif a.first[0] == b.first[0]:
+            score += w.first_initial
+    if _stays_nearby(a.stays, b.stays):
+        score += w.stay_nearby
+    return score
+
+
+# ---------------------------------------------------------------------------
+# Union-find and result
+# ---------------------------------------------------------------------------
+
+class UnionFind:
+    """Disjoint sets over 0..n-1 with union by size and path halving."""
+
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+        self.size = [1] * n
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> bool:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return False
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size[rb]
+        return True
+
+
+@dataclass
+class Resolution:
+    """Clusters of guest_ids believed to be one person."""
+    clusters: list[list[str]]
+    cluster_of: dict[str, list[str]]
+    candidate_pairs: int
+    matched_pairs: int
+    skipped_blocks: int = 0
+    records: dict[str, IdentityRecord] = field(default_factory=dict, repr=False)
+
+    def golden_records(self, guests: Iterable[Guest]) -> list[Guest]:
+        """
+        One Guest per cluster, keyed by the most complete record's
+        guest_id, with email / phone / app flags filled from the others.
+        """
+        by_id = {g.guest_id: g for g in guests}
+        golden = []
+        for ids in self.clusters:
+            members = [by_id[i] for i in ids if i in by_id]
+            if not members:
+                continue
+            best = max(members, key=lambda g: (normalize_email(g.email) is not None, bool(g.phone),
+                                               g.data_capture_complete, -g.created_at.timestamp()))
+            email = next((g.email for g in [best, *members] if normalize_email(g.email)), best.email)
+            phone = next((g.phone for g in [best, *members] if g.phone), None)
+            golden.append(Guest(
+                guest_id=best.guest_id,
+                first_name=best.first_name,
+                last_name=best.last_name,
+                email=email,
+                phone=phone,
+                segment=best.segment,
+                has_app=any(g.has_app for g in members),
+                data_capture_complete=bool(normalize_email(email) and phone),
+                created_at=min(g.created_at for g in members),
+            ))
+        return golden
+
+
+def resolve(
+    guests: Iterable[Guest],
+    stays: Iterable[Stay] = (),
+    payment_tokens: Mapping[str, str] | None = None,
+    threshold: float = 0.8,
+    weights: MatchWeights = MatchWeights(),
+    max_block: int = 64,
+) -> Resolution:
+    """Block, score and merge `guests` into clusters of the same person."""
+    records = build_records(guests, stays, payment_tokens)
+    index = BlockingIndex(max_block)
+    for position, record in enumerate(records):
+        index.add(position, record.blocking_keys())
+    pairs = index.candidate_pairs()
+
+    scored = []
+    for i, j in pairs:
+        score = score_pair(records[i], records[j], weights)
+        if score >= threshold:
+            scored.append((-score, i, j))
+    scored.sort()
+
+    # Strongest evidence first; never chain two clusters holding different
+    # real emails together (A~B and B~C must not merge A's and C's people)
+    uf = UnionFind(len(records))
+    emails = {p: {r.email} for p, r in enumerate(records) if r.email}
+    matched = 0
+    for _, i, j in scored:
+        ri, rj = uf.find(i), uf.find(j)
+        if ri == rj:
+            continue
+        ei, ej = emails.get(ri), emails.get(rj)
+        if ei and ej and ei.isdisjoint(ej):
+            continue
+        uf.union(ri, rj)
+        matched += 1
+        root = uf.find(ri)
+        merged = (ei or set()) | (ej or set())
+        if merged:
+            emails[root] = merged
+
+    groups: dict[int, list[str]] = {}
+    for position, record in enumerate(records):
+        groups.setdefault(uf.find(position), []).append(record.guest_id)
+    clusters = list(groups.values())
+    return Resolution(
+        clusters=clusters,
+        cluster_of={gid: ids for ids in clusters for gid in ids},
+        candidate_pairs=len(pairs),
+        matched_pairs=matched,
+        skipped_blocks=index.skipped_blocks,
+        records={r.guest_id: r for r in records},
+    )
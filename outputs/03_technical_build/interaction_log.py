@@ -0,0 +1,395 @@
+"""
+NovaStar Hotels -- Interaction Event Log
+=========================================
+Append-only, on-disk store for the event-sourced `Interaction` log.
+
+Each event is one fixed-width 24-byte little-endian record:
+
+    timestamp   int64   microseconds since 1970-01-01 (naive, like Interaction)
+    guest       int32   interned guest_id
+    campaign    int32   interned campaign_id, -1 for None
+    offer       int32   interned offer_id, -1 for None
+    type        uint8   index into INTERACTION_TYPE_CODES
+    channel     uint8   index into CHANNEL_CODES
+    stage       uint8   index into STAGE_CODES
+    (pad)       1 byte
+
+The records go into numbered segment files (`events-000000.log`, ...) that
+roll over at `segment_bytes`.  Each segment starts with a 32-byte header
+that holds the range of timestamps it contains, so a time-window scan opens
+only the segments that can match.  Ids are interned in `strings.log`, one
+length-prefixed UTF-8 entry per distinct id, and records refer to an id by
+its position in that file.  `interaction_id` and `metadata` are not stored.
+
+Readers mmap the segments.  `records()` iterates raw tuples with
+`struct.iter_unpack`.  With NumPy installed, `columns()` returns each
+segment as a structured array that shares the mapped memory, and
+`counts()` aggregates a window with `bincount`.  Neither path builds
+Python objects per event.
+
+    with InteractionLog("var/interactions") as log:
+        log.append_many(interactions)
+    start, end = day_window(date(2026, 3, 1))
+    InteractionLog("var/interactions").counts("type", start, end)
+
+There is one writer per directory.  Any number of readers may share it,
+including readers in other processes while the writer is still appending.
+Events become visible to readers on `flush()`.  A torn final record left by
+a crash is truncated the next time a writer opens the log.
+
+Standard-library only; `columns()` and `counts()` need NumPy.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+from collections.abc import Iterable, Iterator
+from datetime import date, datetime, time, timedelta
+
+from data_models import ChannelType, Interaction, InteractionType, JourneyStage
+
+INTERACTION_TYPE_CODES: tuple[InteractionType, ...] = tuple(InteractionType)
+CHANNEL_CODES: tuple[ChannelType, ...] = tuple(ChannelType)
+STAGE_CODES: tuple[JourneyStage, ...] = tuple(JourneyStage)
+_TYPE_INDEX = {t: i for i, t in enumerate(INTERACTION_TYPE_CODES)}
+_CHANNEL_INDEX = {ch: i for i, ch in enumerate(CHANNEL_CODES)}
+_STAGE_INDEX = {s: i for i, s in enumerate(STAGE_CODES)}
+_CODES = {"type": INTERACTION_TYPE_CODES, "channel": CHANNEL_CODES, "stage": STAGE_CODES}
+
+_RECORD = struct.Struct("<qiiiBBBx")
+RECORD_SIZE = _RECORD.size                  # 24
+_HEADER = struct.Struct("<4sHHqq8x")        # magic, version, record size, min ts, max ts
+HEADER_SIZE = _HEADER.size                  # 32
+_MAGIC = b"NSIL"
+_VERSION = 1
+_LEN = struct.Struct("<H")
+
+_EPOCH = datetime(1970, 1, 1)
+_US = timedelta(microseconds=1)
+_NO_TS = (2**63 - 1, -(2**63))              # empty segment: min > max
+_NONE = -1
+
+# NumPy dtype matching _RECORD, built on first use
+_DTYPE_FIELDS = [("timestamp", "<i8"), ("guest", "<i4"), ("campaign", "<i4"), ("offer", "<i4"),
+                 ("type", "u1"), ("channel", "u1"), ("stage", "u1"), ("_pad", "u1")]
+
+
+def to_micros(ts: datetime) -> int:
+    return (ts - _EPOCH) // _US
+
+
+def from_micros(us: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(us))
+
+
+def day_window(day: date) -> tuple[datetime, datetime]:
+    """[start, end) of a calendar day, for the scan methods."""
+    start = datetime.combine(day, time())
+    return start, start + timedelta(days=1)
+
+
+def _numpy():
+    try:
+        import numpy as np
+    except ImportError as exc:  # pragma: no cover - depends on environment
+        raise RuntimeError("columnar scans need NumPy: pip install numpy") from exc
+    return np
+
+
+# ---------------------------------------------------------------------------
+# Interned ids
+# ---------------------------------------------------------------------------
+
+class _StringFile:
+    """Append-only interned string table persisted as length-prefixed UTF-8."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.values: list[str] = []
+        self._index: dict[str, int] = {}
+        self._read_offset = 0
+        self._pending = bytearray()
+        self.refresh()
+
+    def refresh(self) -> None:
+        """Load entries appended (by this or another process) since the last read."""
+        try:
+            with open(self.path, "rb") as fh:
+                fh.seek(self._read_offset)
+                data = fh.read()
+        except FileNotFoundError:
+            return
+        pos = 0
+        while pos + 2 <= len(data):
+            (n,) = _LEN.unpack_from(data, pos)
+            if pos + 2 + n > len(data):
+                break                       # entry still being written
+            value = data[pos + 2:pos + 2 + n].decode()
+            self._index[value] = len(self.values)
+            self.values.append(value)
+            pos += 2 + n
+        self._read_offset += pos
+
+    def truncate_torn_tail(self) -> None:
+        if os.path.exists(self.path) and os.path.getsize(self.path) > self._read_offset:
+            os.truncate(self.path, self._read_offset)
+
+    def intern(self, value: str | None) -> int:
+        if value is None:
+            return _NONE
+        code = self._index.get(value)
+        if code is None:
+            raw = value.encode()
+            code = self._index[value] = len(self.values)
+            self.values.append(value)
+            self._pending += _LEN.pack(len(raw)) + raw
+        return code
+
+    def lookup(self, code: int) -> str | None:
+        if code == _NONE:
+            return None
+        if code >= len(self.values):
+            self.refresh()
+        return self.values[code]
+
+    def flush(self) -> None:
+        if self._pending:
+            with open(self.path, "ab") as fh:
+                fh.write(self._pending)
+            self._read_offset += len(self._pending)
+            self._pending.clear()
+
+
+# ---------------------------------------------------------------------------
+# Log
+# ---------------------------------------------------------------------------
+
+class InteractionLog:
+    """Segmented append-only log of interactions in one directory."""
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 << 20,
+        buffer_records: int = 32_768,
+    ) -> None:
+        self.directory = directory
+        self.segment_records = max(1, (segment_bytes - HEADER_SIZE) // RECORD_SIZE)
+        self.buffer_records = buffer_records
+        os.makedirs(directory, exist_ok=True)
+        self.strings = _StringFile(os.path.join(directory, "strings.log"))
+        self._buf = bytearray()
+        self._buffered = 0
+        self._buf_min, self._buf_max = _NO_TS
+        self._fd: int | None = None           # open for writing on first append
+
+    # -- segment files ----------------------------------------------------
+
+    def segments(self) -> list[str]:
+        """Segment paths in append order."""
+        names = sorted(n for n in os.listdir(self.directory)
+                       if n.startswith("events-") and n.endswith(".log"))
+        return [os.path.join(self.directory, n) for n in names]
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"events-{number:06d}.log")
+
+    def _open_writer(self) -> None:
+        """Open the last segment for appending, dropping any torn tail record."""
+        self.strings.truncate_torn_tail()
+        paths = self.segments()
+        if paths:
+            self._seg_number = len(paths) - 1
+            self._fd = os.open(paths[-1], os.O_RDWR)
+            with open(paths[-1], "rb") as fh:
+                self._seg_min, self._seg_max = _read_header(fh.read(HEADER_SIZE))[1:]
+            size = os.fstat(self._fd).st_size
+            self._seg_count = (size - HEADER_SIZE) // RECORD_SIZE
+            os.ftruncate(self._fd, HEADER_SIZE + self._seg_count * RECORD_SIZE)
+        else:
+            self._new_segment(0)
+
+    def _new_segment(self, number: int) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+        self._seg_number = number
+        self._fd = os.open(self._segment_path(number), os.O_RDWR | os.O_CREAT | os.O_EXCL, 0o644)
+        self._seg_min, self._seg_max = _NO_TS
+        self._seg_count = 0
+        os.write(self._fd, _HEADER.pack(_MAGIC, _VERSION, RECORD_SIZE, *_NO_TS))
+
+    # -- writing ----------------------------------------------------------
+
+    def append(self, interaction: Interaction) -> None:
+        intern = self.strings.intern
+        ts = (interaction.timestamp - _EPOCH) // _US
+        self._buf += _RECORD.pack(
+            ts, intern(interaction.guest_id), intern(interaction.campaign_id),
+            intern(interaction.offer_id), _TYPE_INDEX[interaction.interaction_type],
+            _CHANNEL_INDEX[interaction.channel], _STAGE_INDEX[interaction.journey_stage],
+        )
+        if ts < self._buf_min:
+            self._buf_min = ts
+        if ts > self._buf_max:
+            self._buf_max = ts
+        self._buffered += 1
+        if self._buffered >= self.buffer_records:
+            self.flush()
+
+    def append_many(self, interactions: Iterable[Interaction]) -> int:
+        """`append` for a batch, with the per-event work inlined.  Returns the count."""
+        intern, pack, buf = self.strings.intern, _RECORD.pack, self._buf
+        types, channels, stages = _TYPE_INDEX, _CHANNEL_INDEX, _STAGE_INDEX
+        n = 0
+        for i in interactions:
+            ts = (i.timestamp - _EPOCH) // _US
+            buf += pack(ts, intern(i.guest_id), intern(i.campaign_id), intern(i.offer_id),
+                        types[i.interaction_type], channels[i.channel], stages[i.journey_stage])
+            if ts < self._buf_min:
+                self._buf_min = ts
+            if ts > self._buf_max:
+                self._buf_max = ts
+            n += 1
+            self._buffered += 1
+            if self._buffered >= self.buffer_records:
+                self.flush()
+        return n
+
+    def flush(self) -> None:
+        """Write buffered events; they are visible to readers afterwards."""
+        if not self._buffered:
+            return
+        if self._fd is None:
+            self._open_writer()
+        self.strings.flush()                 # ids before the records that use them
+        records, pos = self._buffered, 0
+        lo, hi = self._buf_min, self._buf_max
+        while records:
+            if self._seg_count == self.segment_records:
+                self._new_segment(self._seg_number + 1)
+            take = min(records, self.segment_records - self._seg_count)
+            # Header first: a crash leaves its range too wide, never too narrow
+            self._seg_min, self._seg_max = min(self._seg_min, lo), max(self._seg_max, hi)
+            os.pwrite(self._fd, _HEADER.pack(_MAGIC, _VERSION, RECORD_SIZE,
+                                             self._seg_min, self._seg_max), 0)
+            end = pos + take * RECORD_SIZE
+            os.pwrite(self._fd, self._buf[pos:end], HEADER_SIZE + self._seg_count * RECORD_SIZE)
+            self._seg_count += take
+            pos, records = end, records - take
+        self._buf.clear()
+        self._buffered = 0
+        self._buf_min, self._buf_max = _NO_TS
+
+    def sync(self) -> None:
+        """flush() and fsync the active segment."""
+        self.flush()
+        if self._fd is not None:
+            os.fsync(self._fd)
+
+    def close(self) -> None:
+        self.flush()
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self) -> InteractionLog:
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # -- reading ----------------------------------------------------------
+
+    def _mapped(self, start: datetime | None, end: datetime | None) -> Iterator[tuple[mmap.mmap, int, int, int]]:
+        """
+        (mmap, record count, min ts, max ts) for each segment whose time range
+        meets [start, end).  Maps are closed when the last view of them goes.
+        """
+        lo = _NO_TS[1] if start is None else to_micros(start)
+        hi = _NO_TS[0] if end is None else to_micros(end)
+        for path in self.segments():
+            with open(path, "rb") as fh:
+                count = (os.fstat(fh.fileno()).st_size - HEADER_SIZE) // RECORD_SIZE
+                if count <= 0:
+                    continue
+                mm = mmap.mmap(fh.fileno(), HEADER_SIZE + count * RECORD_SIZE, access=mmap.ACCESS_READ)
+            seg_min, seg_max = _read_header(mm[:HEADER_SIZE])[1:]
+            if seg_max < lo or seg_min >= hi:
+                continue
+            yield mm, count, seg_min, seg_max
+
+    def records(
+        self, start: datetime | None = None, end: datetime | None = None,
+    ) -> Iterator[tuple[int, int, int, int, int, int, int]]:
+        """
+        Raw (timestamp_us, guest, campaign, offer, type, channel, stage)
+        tuples with start <= timestamp < end, in append order.
+        """
+        lo = None if start is None else to_micros(start)
+        hi = None if end is None else to_micros(end)
+        for mm, _, seg_min, seg_max in self._mapped(start, end):
+            recs = _RECORD.iter_unpack(memoryview(mm)[HEADER_SIZE:])
+            if (lo is None or seg_min >= lo) and (hi is None or seg_max < hi):
+                yield from recs
+            else:
+                yield from (r for r in recs if (lo is None or r[0] >= lo) and (hi is None or r[0] < hi))
+
+    def columns(self, start: datetime | None = None, end: datetime | None = None):
+        """
+        One NumPy structured array per matching segment.  Segments entirely
+        inside the window are zero-copy views of the mapped file; partially
+        covered ones are filtered copies.
+        """
+        np = _numpy()
+        dtype = np.dtype(_DTYPE_FIELDS)
+        lo = None if start is None else to_micros(start)
+        hi = None if end is None else to_micros(end)
+        for mm, count, seg_min, seg_max in self._mapped(start, end):
+            rows = np.frombuffer(mm, dtype=dtype, count=count, offset=HEADER_SIZE)
+            if (lo is None or seg_min >= lo) and (hi is None or seg_max < hi):
+                yield rows
+                continue
+            ts = rows["timestamp"]
+            keep = np.ones(count, dtype=bool)
+            if lo is not None:
+                keep &= ts >= lo
+            if hi is not None:
+                keep &= ts < hi
+            yield rows[keep]
+
+    def counts(self, by: str, start: datetime | None = None, end: datetime | None = None) -> dict:
+        """Events per type, channel or stage in [start, end), e.g. for dashboards."""
+        np = _numpy()
+        codes = _CODES[by]
+        totals = np.zeros(len(codes), dtype=np.int64)
+        for rows in self.columns(start, end):
+            totals += np.bincount(rows[by], minlength=len(codes))[: len(codes)]
+        return {code: int(n) for code, n in zip(codes, totals)}
+
+    def interactions(self, start: datetime | None = None, end: datetime | None = None) -> Iterator[Interaction]:
+        """Rebuild `Interaction` objects (without interaction_id / metadata)."""
+        lookup = self.strings.lookup
+        for ts, guest, campaign, offer, kind, channel, stage in self.records(start, end):
+            yield Interaction(
+                guest_id=lookup(guest),
+                timestamp=_EPOCH + timedelta(microseconds=ts),
+                interaction_type=INTERACTION_TYPE_CODES[kind],
+                channel=CHANNEL_CODES[channel],
+                journey_stage=STAGE_CODES[stage],
+                campaign_id=lookup(campaign),
+                offer_id=lookup(offer),
+            )
+
+    def __len__(self) -> int:
+        """Events on disk plus those still buffered."""
+        on_disk = sum(max(0, (os.path.getsize(p) - HEADER_SIZE) // RECORD_SIZE) for p in self.segments())
+        return on_disk + self._buffered
+
+
+def _read_header(raw: bytes) -> tuple[int, int, int]:
+    magic, version, record_size, ts_min, ts_max = _HEADER.unpack(raw)
+    if magic != _MAGIC or version != _VERSION or record_size != RECORD_SIZE:
+        raise ValueError(f"not an interaction log segment (magic={magic!r}, version={version})")
+    return version, ts_min, ts_max
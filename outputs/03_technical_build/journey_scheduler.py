@@ -0,0 +1,208 @@
+"""
+NovaStar Hotels -- Daily Journey Scheduler
+===========================================
+Incremental alternative to `build_trigger_plan`, which renders all six
+stages at checkout -- including a day-90 message built from day-0 data.
+
+`JourneyScheduler` keeps enrolled guests indexed by checkout date.  Each
+daily `tick()` looks up only the checkout dates that are exactly one
+`_TRIGGER_SCHEDULE` day behind today, and within each date only the
+segments with a stage on that day, so its cost is proportional to the
+triggers due that day, not to the active population.  Messages are
+rendered just in time from the profile as it stands that day (engagement
+score, loyalty tier, churn risk), and guests are dropped from the index
+after their last scheduled stage.
+
+    scheduler = JourneyScheduler()
+    scheduler.enroll(profile)                 # at checkout
+    for trigger in scheduler.tick(date.today()):
+        ...                                   # hand to the orchestrator
+
+    python journey_scheduler.py               # late-enrolment self-check
+
+Standard-library only.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from datetime import date, datetime, time, timedelta
+
+from data_models import GuestSegment, JourneyStage
+from engagement_engine import (
+    _SEGMENT_SCHEDULES,
+    GuestProfile,
+    Trigger,
+    _compose_message,
+    _send_time,
+    calculate_churn_risk,
+)
+
+
+def _due_by_day() -> dict[int, tuple[tuple[GuestSegment, JourneyStage, bool], ...]]:
+    """day offset -> ((segment, stage, is that segment's final stage), ...)"""
+    due: dict[int, list[tuple[GuestSegment, JourneyStage, bool]]] = {}
+    for seg, schedule in _SEGMENT_SCHEDULES.items():
+        last = max(day for _, day, _ in schedule)
+        for stage, day, _ in schedule:
+            due.setdefault(day, []).append((seg, stage, day == last))
+    return {day: tuple(entries) for day, entries in sorted(due.items())}
+
+
+_DUE_BY_DAY = _due_by_day()
+_FINAL_DAY = {seg: max(day for _, day, _ in schedule) for seg, schedule in _SEGMENT_SCHEDULES.items()}
+
+
+class JourneyScheduler:
+    """Checkout-date index of active guests, advanced one day at a time."""
+
+    def __init__(self) -> None:
+        # checkout date -> segment -> guest_id -> profile
+        self._by_checkout: dict[date, dict[GuestSegment, dict[str, GuestProfile]]] = {}
+        self._checkout_of: dict[str, tuple[date, GuestSegment]] = {}
+        self.last_tick: date | None = None
+
+    # -- enrolment --------------------------------------------------------
+
+    def enroll(self, profile: GuestProfile, checkout: date | None = None) -> bool:
+        """
+        Add a guest, keyed by `checkout` (default: the stay's check-out date).
+        Re-enrolling a guest moves them to the new date.  Stages whose day
+        has already been ticked past are not sent retroactively; a guest
+        whose final stage is already past (a backfill or late feed) is not
+        indexed at all.  Returns whether the guest was indexed.
+        """
+        guest_id = profile.guest.guest_id
+        self.remove(guest_id)
+        checkout = checkout or profile.stay.check_out
+        seg = profile.guest.segment
+        if self.last_tick is not None and checkout + timedelta(days=_FINAL_DAY[seg]) <= self.last_tick:
+            return False
+        self._by_checkout.setdefault(checkout, {}).setdefault(seg, {})[guest_id] = profile
+        self._checkout_of[guest_id] = (checkout, seg)
+        return True
+
+    def enroll_many(self, profiles: Iterable[GuestProfile]) -> int:
+        """Enroll each profile; returns how many were indexed."""
+        return sum(self.enroll(profile) for profile in profiles)
+
+    def remove(self, guest_id: str) -> bool:
+        """Stop scheduling a guest (e.g. they rebooked or opted out)."""
+        key = self._checkout_of.pop(guest_id, None)
+        if key is None:
+            return False
+        checkout, seg = key
+        by_segment = self._by_checkout[checkout]
+        cohort = by_segment[seg]
+        del cohort[guest_id]
+        if not cohort:
+            del by_segment[seg]
+            if not by_segment:
+                del self._by_checkout[checkout]
+        return True
+
+    def __len__(self) -> int:
+        return len(self._checkout_of)
+
+    def __contains__(self, guest_id: str) -> bool:
+        return guest_id in self._checkout_of
+
+    # -- ticking ----------------------------------------------------------
+
+    def tick(self, today: date) -> list[Trigger]:
+        """
+        Emit the triggers due on `today`, plus any days skipped since the
+        previous tick, oldest first.  Ticking the same day twice is a no-op.
+        """
+        if self.last_tick is not None and today <= self.last_tick:
+            return []
+        start = today if self.last_tick is None else self.last_tick + timedelta(days=1)
+        triggers: list[Trigger] = []
+        day = start
+        while day <= today:
+            triggers.extend(self._due_on(day))
+            day += timedelta(days=1)
+        self.last_tick = today
+        return triggers
+
+    def _due_on(self, day: date) -> list[Trigger]:
+        now = datetime.combine(day, time())
+        triggers: list[Trigger] = []
+        for offset, due in _DUE_BY_DAY.items():
+            checkout = day - timedelta(days=offset)
+            by_segment = self._by_checkout.get(checkout)
+            if not by_segment:
+                continue
+            for seg, stage, final in due:
+                cohort = by_segment.get(seg)
+                if not cohort:
+                    continue
+                for profile in cohort.values():
+                    triggers.append(_trigger_for(profile, stage, offset, now))
+                if final:
+                    del by_segment[seg]
+                    for guest_id in cohort:
+                        del self._checkout_of[guest_id]
+            if not by_segment:
+                del self._by_checkout[checkout]
+        return triggers
+
+
+def _trigger_for(profile: GuestProfile, stage: JourneyStage, day: int, now: datetime) -> Trigger:
+    """Advance `profile` to `stage` and render its message from current data."""
+    profile.journey_stage = stage
+    profile.days_since_checkout = day
+    profile.churn_risk = calculate_churn_risk(profile)
+    msg = _compose_message(profile, stage, profile.churn_risk,
+                           send_at=_send_time(profile.guest.segment, now))
+    return Trigger(
+        guest_id=profile.guest.guest_id,
+        action=f"send_{msg.channel.value}",
+        journey_stage=stage,
+        channel=msg.channel,
+        day_offset=day,
+        message=msg,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Self-check
+# ---------------------------------------------------------------------------
+
+def check_scheduler() -> bool:
+    """
+    Enrolment after the journey has started: a guest whose final stage is
+    past is not indexed; a mid-journey guest gets only the remaining stages
+    and then leaves the index.
+    """
+    from data_models import GuestPreferences, make_sample_guest, make_sample_stay
+
+    def profile() -> GuestProfile:
+        guest = make_sample_guest(GuestSegment.BUSINESS_REGULAR)
+        return GuestProfile(guest=guest, stay=make_sample_stay(guest),
+                            preferences=GuestPreferences(guest_id=guest.guest_id))
+
+    start = date(2026, 1, 1)
+    js = JourneyScheduler()
+    js.tick(start)
+    past = profile()
+    past_indexed = js.enroll(past, checkout=date(2025, 1, 1))
+    mid = profile()
+    mid_indexed = js.enroll(mid, checkout=start - timedelta(days=10))
+    emitted: list[Trigger] = []
+    for i in range(1, 401):
+        emitted += js.tick(start + timedelta(days=i))
+
+    days = sorted(day for _, day, _ in _SEGMENT_SCHEDULES[GuestSegment.BUSINESS_REGULAR])
+    past_ok = not past_indexed and all(t.guest_id != past.guest.guest_id for t in emitted)
+    mid_ok = mid_indexed and [t.day_offset for t in emitted] == [d for d in days if d > 10]
+    drained = len(js) == 0 and mid.guest.guest_id not in js and past.guest.guest_id not in js
+
+    print(f"Past-journey enrolment skipped: {past_ok}   "
+          f"mid-journey gets days {[t.day_offset for t in emitted]} of {days}: {mid_ok}")
+    print(f"Index empty after 400 ticks: {drained}")
+    return past_ok and mid_ok and drained
+
+
+if __name__ == "__main__":
+    raise SystemExit(0 if check_scheduler() else 1)
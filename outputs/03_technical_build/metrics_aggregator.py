@@ -0,0 +1,404 @@
+"""
+NovaStar Hotels -- Real-Time Metrics Aggregator
+================================================
+Incremental counters behind the operational panels of dashboard_spec.md
+(Campaign Performance, Journey Stage Pipeline, Channel Mix, Churn Risk
+Alerts).  `Interaction` events update the counters as they arrive, so a
+dashboard read is a dict lookup, not a rescan of the interaction history.
+
+Counts are kept per interaction type for every combination of the four
+dimensions (campaign, channel, segment, stage), including the roll-ups
+("all campaigns", "all channels", ...).  Each event updates the 16 combined
+keys, so each panel query is a single lookup:
+
+    agg = MetricsAggregator(segment_of={g.guest_id: g.segment for g in guests})
+    agg.add_many(interactions)
+    agg.hourly.bucket().count(InteractionType.EMAIL_OPENED, campaign="CAMP-Q1")
+    agg.realtime.total().rate(InteractionType.EMAIL_OPENED, InteractionType.EMAIL_SENT)
+    agg.guests_at(JourneyStage.CONVERSION_PUSH)
+
+Each `WindowCounter` is a ring of `retain` buckets `step` wide:
+
+  - tumbling   `bucket(at)` -- the counts of one step (e.g. one clock hour)
+  - sliding    `total()`    -- the last `retain` steps, held as a running
+                               sum that is updated on add and reduced when
+                               a bucket leaves the ring
+
+Time is event time.  A bucket expires once an event arrives `retain` steps
+later, or on `advance(now)` so quiet periods still roll the window.  Events
+older than the ring are counted in `late` and dropped.
+
+The defaults follow the spec's refresh cadence: `realtime` is 60 one-minute
+buckets (campaigns, churn alerts), `hourly` is 24 one-hour buckets (journey
+pipeline, channel mix).
+
+Standard-library only.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping
+from datetime import datetime, timedelta
+from operator import sub
+
+from data_models import (
+    ChannelType,
+    GuestSegment,
+    Interaction,
+    InteractionType,
+    JourneyStage,
+)
+from interaction_log import (
+    _CHANNEL_INDEX,
+    _STAGE_INDEX,
+    _TYPE_INDEX,
+    CHANNEL_CODES,
+    INTERACTION_TYPE_CODES,
+    STAGE_CODES,
+    from_micros,
+    to_micros,
+)
+
+
+class _All:
+    """Dimension wildcard: roll up over every value."""
+    __slots__ = ()
+
+    def __repr__(self) -> str:
+        return "ALL"
+
+
+ALL = _All()
+
+_SAVES = len(INTERACTION_TYPE_CODES)        # extra column: rebooked while high-risk
+_WIDTH = _SAVES + 1
+
+# Same cut-off as the escalated-offer band in engagement_engine
+HIGH_RISK = 0.7
+
+# Counter keys are ints packed from the four dimension codes (enum position
+# in definition order, as in interaction_log).  Each dimension has one extra
+# code for ALL, and segment has one more for None.  Enum members hash in
+# Python code, so 16 tuple-of-enum keys per event would dominate the
+# ingest cost.
+_SEGMENT_CODES: tuple[GuestSegment, ...] = tuple(GuestSegment)
+_SEGMENT_INDEX: dict[GuestSegment | None, int] = {s: i for i, s in enumerate(_SEGMENT_CODES)}
+_SEGMENT_INDEX[None] = len(_SEGMENT_CODES)
+_ALL_CAMPAIGNS = 0                          # real campaigns are interned from 1
+_ALL_CHANNELS = len(CHANNEL_CODES)
+_ALL_SEGMENTS = len(_SEGMENT_CODES) + 1
+_ALL_STAGES = len(STAGE_CODES)
+_CHANNEL_RADIX, _SEGMENT_RADIX, _STAGE_RADIX = _ALL_CHANNELS + 1, _ALL_SEGMENTS + 1, _ALL_STAGES + 1
+
+
+def _pack(campaign: int, channel: int, segment: int, stage: int) -> int:
+    return ((campaign * _SEGMENT_RADIX + segment) * _CHANNEL_RADIX + channel) * _STAGE_RADIX + stage
+
+
+def _unpack(key: int) -> tuple[int, int, int, int]:
+    key, stage = divmod(key, _STAGE_RADIX)
+    key, channel = divmod(key, _CHANNEL_RADIX)
+    campaign, segment = divmod(key, _SEGMENT_RADIX)
+    return campaign, channel, segment, stage
+
+
+def _rollup_keys(campaign: int, channel: int, segment: int, stage: int) -> tuple[int, ...]:
+    """The packed key itself and all 15 roll-ups of it."""
+    return tuple(
+        _pack(campaign if mask & 1 else _ALL_CAMPAIGNS,
+              channel if mask & 2 else _ALL_CHANNELS,
+              segment if mask & 4 else _ALL_SEGMENTS,
+              stage if mask & 8 else _ALL_STAGES)
+        for mask in range(16)
+    )
+
+
+class _Campaigns:
+    """campaign_id <-> code interning shared by the windows of one aggregator."""
+
+    def __init__(self) -> None:
+        self.codes: dict[str | None, int] = {}
+
+    def intern(self, campaign_id: str | None) -> int:
+        code = self.codes.get(campaign_id)
+        if code is None:
+            code = self.codes[campaign_id] = len(self.codes) + 1
+        return code
+
+    def key(self, campaign, channel, segment, stage) -> int | None:
+        """Packed key of a query, or None for a campaign never seen."""
+        if campaign is ALL:
+            c = _ALL_CAMPAIGNS
+        else:
+            c = self.codes.get(campaign)
+            if c is None:
+                return None
+        return _pack(
+            c,
+            _ALL_CHANNELS if channel is ALL else _CHANNEL_INDEX[channel],
+            _ALL_SEGMENTS if segment is ALL else _SEGMENT_INDEX[segment],
+            _ALL_STAGES if stage is ALL else _STAGE_INDEX[stage],
+        )
+
+
+# ---------------------------------------------------------------------------
+# Counts and windows
+# ---------------------------------------------------------------------------
+
+class Counts:
+    """Read view over one bucket or a window total."""
+
+    __slots__ = ("_rows", "_campaigns")
+
+    def __init__(self, rows: Mapping[int, list[int]], campaigns: _Campaigns) -> None:
+        self._rows = rows
+        self._campaigns = campaigns
+
+    def _row(self, campaign, channel, segment, stage) -> list[int] | None:
+        key = self._campaigns.key(campaign, channel, segment, stage)
+        return None if key is None else self._rows.get(key)
+
+    def count(
+        self,
+        interaction_type: InteractionType,
+        campaign: str | None | _All = ALL,
+        channel: ChannelType | _All = ALL,
+        segment: GuestSegment | None | _All = ALL,
+        stage: JourneyStage | _All = ALL,
+    ) -> int:
+        row = self._row(campaign, channel, segment, stage)
+        return row[_TYPE_INDEX[interaction_type]] if row else 0
+
+    def by_type(self, campaign=ALL, channel=ALL, segment=ALL, stage=ALL) -> dict[InteractionType, int]:
+        row = self._row(campaign, channel, segment, stage) or [0] * _WIDTH
+        return dict(zip(INTERACTION_TYPE_CODES, row))
+
+    def rate(
+        self,
+        numerator: InteractionType,
+        denominator: InteractionType,
+        campaign=ALL, channel=ALL, segment=ALL, stage=ALL,
+    ) -> float:
+        """e.g. open rate = rate(EMAIL_OPENED, EMAIL_SENT); 0.0 with no denominator."""
+        row = self._row(campaign, channel, segment, stage)
+        if not row or not row[_TYPE_INDEX[denominator]]:
+            return 0.0
+        return row[_TYPE_INDEX[numerator]] / row[_TYPE_INDEX[denominator]]
+
+    def saves(self, campaign=ALL, channel=ALL, segment=ALL, stage=ALL) -> int:
+        """REBOOKED events from guests who were above HIGH_RISK at the time."""
+        row = self._row(campaign, channel, segment, stage)
+        return row[_SAVES] if row else 0
+
+
+class WindowCounter:
+    """Ring of `retain` buckets of `step`, plus their running total."""
+
+    def __init__(self, step: timedelta, retain: int) -> None:
+        if retain < 1 or step <= timedelta(0):
+            raise ValueError("step must be positive and retain at least 1")
+        self.step = step
+        self.retain = retain
+        self.late = 0
+        self._step_us = step // timedelta(microseconds=1)
+        self._buckets: dict[int, dict[int, list[int]]] = {}
+        # Running total, and the 16 total rows each full key updates; rows
+        # stay allocated at zero so those row lists remain valid
+        self._total: dict[int, list[int]] = {}
+        self._total_rows: dict[int, list[list[int]]] = {}
+        self._newest: int | None = None
+        self._campaigns = _Campaigns()      # replaced by the owning aggregator's table
+
+    @property
+    def length(self) -> timedelta:
+        return self.step * self.retain
+
+    def _advance_to(self, index: int) -> None:
+        if self._newest is not None and index <= self._newest:
+            return
+        self._newest = index
+        oldest = index - self.retain
+        expired = [i for i in self._buckets if i <= oldest]
+        total = self._total
+        for i in expired:
+            for key, row in self._buckets.pop(i).items():
+                running = total[key]
+                running[:] = map(sub, running, row)
+
+    def advance(self, now: datetime) -> None:
+        """Expire buckets that have left the window as of `now`."""
+        self._advance_to(to_micros(now) // self._step_us)
+
+    def add(self, ts_us: int, full: int, keys: tuple[int, ...], column: int, saved: bool = False) -> bool:
+        """Count one event of type `column` under packed key `full` and its roll-up `keys`."""
+        index = ts_us // self._step_us
+        if self._newest is None or index > self._newest:
+            self._advance_to(index)
+        elif index <= self._newest - self.retain:
+            self.late += 1
+            return False
+        bucket = self._buckets.get(index)
+        if bucket is None:
+            bucket = self._buckets[index] = {}
+        for key in keys:
+            row = bucket.get(key)
+            if row is None:
+                row = bucket[key] = [0] * _WIDTH
+            row[column] += 1
+            if saved:
+                row[_SAVES] += 1
+        running = self._total_rows.get(full)
+        if running is None:
+            running = self._total_rows[full] = [self._total.setdefault(k, [0] * _WIDTH) for k in keys]
+        for row in running:
+            row[column] += 1
+        if saved:
+            for row in running:
+                row[_SAVES] += 1
+        return True
+
+    # -- reads ------------------------------------------------------------
+
+    def bucket(self, at: datetime | None = None) -> Counts:
+        """Tumbling: the step containing `at` (default: the newest step)."""
+        if at is None:
+            index = self._newest
+        else:
+            index = to_micros(at) // self._step_us
+        return Counts(self._buckets.get(index, {}), self._campaigns)
+
+    def total(self) -> Counts:
+        """Sliding: everything in the last `retain` steps."""
+        return Counts(self._total, self._campaigns)
+
+    def series(self, interaction_type: InteractionType, **dims) -> list[tuple[datetime, int]]:
+        """(bucket start, count) for every step in the ring, oldest first -- sparklines."""
+        if self._newest is None:
+            return []
+        return [
+            (from_micros(i * self._step_us),
+             Counts(self._buckets.get(i, {}), self._campaigns).count(interaction_type, **dims))
+            for i in range(self._newest - self.retain + 1, self._newest + 1)
+        ]
+
+
+# ---------------------------------------------------------------------------
+# Aggregator
+# ---------------------------------------------------------------------------
+
+class MetricsAggregator:
+    """
+    Consumes Interaction events and keeps the dashboard counters current.
+
+    `segment_of` maps guest_id -> GuestSegment (interactions do not carry
+    the segment); unknown guests are counted under segment None.
+
+    `events` counts every event consumed, including ones a window dropped
+    as late (see each window's `late`).  The journey pipeline follows each
+    guest's newest event, so out-of-order events never move a guest back.
+    """
+
+    def __init__(
+        self,
+        segment_of: Mapping[str, GuestSegment] | None = None,
+        realtime: WindowCounter | None = None,
+        hourly: WindowCounter | None = None,
+    ) -> None:
+        self.segment_of = segment_of if segment_of is not None else {}
+        self.realtime = realtime or WindowCounter(timedelta(minutes=1), 60)
+        self.hourly = hourly or WindowCounter(timedelta(hours=1), 24)
+        self.events = 0
+        self._campaigns = _Campaigns()
+        self._windows = (self.realtime, self.hourly)
+        for window in self._windows:
+            window._campaigns = self._campaigns
+        self._keys: dict[int, tuple[int, ...]] = {}
+        self._rebooked = _TYPE_INDEX[InteractionType.REBOOKED]
+        # Journey pipeline and churn gauges: current state per guest
+        self._stage_of: dict[str, tuple[int, int]] = {}     # guest -> (newest ts, stage)
+        self._at_stage = [0] * len(STAGE_CODES)
+        self._transitions: dict[tuple[int, int], int] = {}
+        self._high_risk: set[str] = set()
+        self._high_risk_by_segment: dict[GuestSegment | None, int] = {}
+
+    @property
+    def campaigns(self) -> list[str | None]:
+        """campaign_ids seen so far, for per-campaign panels."""
+        return list(self._campaigns.codes)
+
+    def add(self, interaction: Interaction) -> None:
+        guest_id = interaction.guest_id
+        stage = _STAGE_INDEX[interaction.journey_stage]
+        full = _pack(
+            self._campaigns.intern(interaction.campaign_id),
+            _CHANNEL_INDEX[interaction.channel],
+            _SEGMENT_INDEX[self.segment_of.get(guest_id)],
+            stage,
+        )
+        keys = self._keys.get(full)
+        if keys is None:
+            keys = self._keys[full] = _rollup_keys(*_unpack(full))
+        column = _TYPE_INDEX[interaction.interaction_type]
+        saved = column == self._rebooked and guest_id in self._high_risk
+        ts_us = to_micros(interaction.timestamp)
+        for window in self._windows:
+            window.add(ts_us, full, keys, column, saved)
+        self.events += 1
+
+        # Stage state follows each guest's newest event; a delayed older
+        # event must not move the guest back or invent a transition
+        seen = self._stage_of.get(guest_id)
+        if seen is not None and ts_us < seen[0]:
+            return
+        previous = seen[1] if seen is not None else None
+        self._stage_of[guest_id] = (ts_us, stage)
+        if previous != stage:
+            self._at_stage[stage] += 1
+            if previous is not None:
+                self._at_stage[previous] -= 1
+                move = (previous, stage)
+                self._transitions[move] = self._transitions.get(move, 0) + 1
+
+    def add_many(self, interactions: Iterable[Interaction]) -> int:
+        n = 0
+        for interaction in interactions:
+            self.add(interaction)
+            n += 1
+        return n
+
+    def advance(self, now: datetime) -> None:
+        """Roll every window forward to `now`, e.g. before a dashboard refresh."""
+        for window in self._windows:
+            window.advance(now)
+
+    # -- journey pipeline -------------------------------------------------
+
+    def guests_at(self, stage: JourneyStage) -> int:
+        """Guests whose most recent interaction was at `stage`."""
+        return self._at_stage[_STAGE_INDEX[stage]]
+
+    def pipeline(self) -> dict[JourneyStage, int]:
+        return dict(zip(STAGE_CODES, self._at_stage))
+
+    def transitions(self, source: JourneyStage, target: JourneyStage) -> int:
+        """Stage changes seen from `source` to `target`."""
+        return self._transitions.get((_STAGE_INDEX[source], _STAGE_INDEX[target]), 0)
+
+    # -- churn alerts -----------------------------------------------------
+
+    def observe_risk(self, guest_id: str, risk: float) -> None:
+        """Record a guest's latest churn risk (e.g. from calculate_churn_risk)."""
+        segment = self.segment_of.get(guest_id)
+        counts = self._high_risk_by_segment
+        if risk > HIGH_RISK:
+            if guest_id not in self._high_risk:
+                self._high_risk.add(guest_id)
+                counts[segment] = counts.get(segment, 0) + 1
+        elif guest_id in self._high_risk:
+            self._high_risk.discard(guest_id)
+            counts[segment] -= 1
+
+    def high_risk(self, segment: GuestSegment | None | _All = ALL) -> int:
+        if segment is ALL:
+            return len(self._high_risk)
+        return self._high_risk_by_segment.get(segment, 0)
@@ -0,0 +1,181 @@
+"""
+NovaStar Hotels -- Simulation Result Cache
+===========================================
+Simulation results are fully deterministic for a given `ScenarioConfig`
+(seed included), so repeated demos and dashboard refreshes can be served
+from a cache instead of re-running BEFORE and AFTER.
+
+`ResultCache` is a bounded, thread-safe LRU in memory, optionally backed
+by a SQLite file of pickled values that survives restarts.  Keys are
+scenario fingerprints (`ScenarioConfig.fingerprint()`), so any change to
+any parameter -- rates, capture, intensity, guest count, seed -- is a
+different key.  Keys also cover `CACHE_VERSION` and the source of the
+engine modules, so a store written by older simulation code is never
+served after the model changes.  Hit/miss counters are kept for the
+dashboard.
+
+Standard-library only.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import pickle
+import sqlite3
+import threading
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from typing import Any
+
+from guest_journey_simulation import ScenarioConfig
+
+
+# Bump when simulation behaviour changes in a way the engine sources below
+# do not capture (e.g. a data_models default the engines read)
+CACHE_VERSION = 1
+
+# Source files whose code determines a result; any edit is a new key space,
+# so a persisted store never serves results from older engine code
+_ENGINE_SOURCES = ("guest_journey_simulation.py", "vectorized_simulation.py")
+
+
+def _engine_digest() -> str:
+    digest = hashlib.sha256(f"v{CACHE_VERSION}".encode())
+    here = os.path.dirname(os.path.abspath(__file__))
+    for name in _ENGINE_SOURCES:
+        try:
+            with open(os.path.join(here, name), "rb") as fh:
+                digest.update(fh.read())
+        except FileNotFoundError:
+            digest.update(name.encode())
+    return digest.hexdigest()
+
+
+_ENGINE_DIGEST = _engine_digest()
+
+
+def scenario_key(*configs: ScenarioConfig, engine: str = "loop") -> str:
+    """
+    Cache key for a run over one or more scenarios with a given engine,
+    tied to CACHE_VERSION and the engine modules' source.
+    """
+    digest = hashlib.sha256(_ENGINE_DIGEST.encode())
+    digest.update(engine.encode())
+    for config in configs:
+        digest.update(config.fingerprint().encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class CacheStats:
+    """Counters since the cache was created."""
+    hits: int = 0           # served from memory
+    disk_hits: int = 0      # served from the SQLite store (and promoted)
+    misses: int = 0         # computed
+    evictions: int = 0      # dropped from memory by the LRU bound
+    size: int = 0           # entries currently in memory
+    maxsize: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.disk_hits + self.misses
+        return (self.hits + self.disk_hits) / lookups if lookups else 0.0
+
+
+class ResultCache:
+    """
+    Bounded LRU cache of simulation results, optionally persisted to SQLite.
+
+    Values must be picklable when `path` is set.  Cached values are shared
+    between callers and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 256, path: str | None = None) -> None:
+        if maxsize < 1:
+            raise ValueError("maxsize must be >= 1")
+        self.maxsize = maxsize
+        self.path = path
+        self._data: OrderedDict[str, Any] = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = CacheStats(maxsize=maxsize)
+        self._db: sqlite3.Connection | None = None
+        if path:
+            self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+            )
+
+    # -- lookups ----------------------------------------------------------
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value or None, counting a hit or a miss."""
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self._stats.hits += 1
+                return self._data[key]
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    value = pickle.loads(row[0])
+                    self._insert(key, value)
+                    self._stats.disk_hits += 1
+                    return value
+            self._stats.misses += 1
+            return None
+
+    def put(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._insert(key, value)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, value) VALUES (?, ?)",
+                    (key, pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)),
+                )
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        """
+        Return the cached value for `key`, computing and storing it on a miss.
+
+        `compute` runs outside the lock, so concurrent misses on different
+        keys proceed in parallel; two misses on the same key may both
+        compute, which is harmless for deterministic results.
+        """
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+    # -- housekeeping -----------------------------------------------------
+
+    def _insert(self, key: str, value: Any) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._stats.evictions += 1
+
+    def clear(self, persistent: bool = False) -> None:
+        """Drop all in-memory entries (and the SQLite store if `persistent`)."""
+        with self._lock:
+            self._data.clear()
+            if persistent and self._db is not None:
+                self._db.execute("DELETE FROM results")
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            snapshot = CacheStats(**asdict(self._stats))
+            snapshot.size = len(self._data)
+            return snapshot
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def __len__(self) -> int:
+        return len(self._data)
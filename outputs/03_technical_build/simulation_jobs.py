@@ -0,0 +1,263 @@
+"""
+NovaStar Hotels -- Background Simulation Jobs
+==============================================
+Large simulations (100k+ guests) are too slow to run inside a web request.
+`JobManager` runs them on a local process pool and keeps a job table the
+dashboard can poll:
+
+  submit()  -> job id, returns immediately
+  get()     -> status, stage, guests processed and partial aggregates
+  wait()    -> block until finished (for scripts and the SSE stream)
+
+Workers run the streaming engine (`simulate_streaming`) so memory stays
+flat at any guest count, and post progress snapshots over a
+multiprocessing queue.  A daemon thread in the parent folds those messages
+into the job table, so nothing ever blocks the web worker.
+
+Standard-library only.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Any
+
+import guest_journey_simulation as sim
+from guest_journey_simulation import ScenarioConfig, SimResult
+from ids import new_id
+from result_cache import ResultCache, scenario_key
+
+# Job states
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Progress queue handed to each worker process by the pool initializer
+_progress_queue: Any = None
+
+
+# ---------------------------------------------------------------------------
+# Data Structures
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Job:
+    """One BEFORE + AFTER simulation run and its progress."""
+    job_id: str
+    num_guests: int
+    seed: int
+    status: str = QUEUED
+    stage: str = ""                       # scenario being simulated
+    guests_processed: int = 0             # across both scenarios
+    partial: dict[str, SimResult] = field(default_factory=dict)
+    before: SimResult | None = None
+    after: SimResult | None = None
+    error: str = ""
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+
+    @property
+    def total_guests(self) -> int:
+        return 2 * self.num_guests
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (DONE, FAILED)
+
+    def to_dict(self) -> dict:
+        """JSON-friendly view for the progress endpoint."""
+        return {
+            "job_id": self.job_id,
+            "num_guests": self.num_guests,
+            "seed": self.seed,
+            "status": self.status,
+            "stage": self.stage,
+            "guests_processed": self.guests_processed,
+            "total_guests": self.total_guests,
+            "progress": self.guests_processed / self.total_guests if self.total_guests else 1.0,
+            "partial": {label: asdict(r) for label, r in self.partial.items()},
+            "before": asdict(self.before) if self.before else None,
+            "after": asdict(self.after) if self.after else None,
+            "error": self.error,
+            "elapsed": round((self.finished_at or time.time()) - (self.started_at or self.created_at), 3),
+        }
+
+
+# ---------------------------------------------------------------------------
+# Worker side
+# ---------------------------------------------------------------------------
+
+def _init_worker(progress_queue: Any) -> None:
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _run_job(job_id: str, num_guests: int, seed: int, progress_every: int) -> tuple[SimResult, SimResult]:
+    """Simulate BEFORE then AFTER, posting progress snapshots as we go."""
+    results = []
+    for offset, config in enumerate((ScenarioConfig.before(num_guests, seed),
+                                     ScenarioConfig.after(num_guests, seed))):
+        done_before = offset * num_guests
+        _progress_queue.put((job_id, config.label, done_before, None))
+
+        def report(processed: int, partial: SimResult, label: str = config.label,
+                   base: int = done_before) -> None:
+            _progress_queue.put((job_id, label, base + processed, partial))
+
+        results.append(sim.simulate_streaming(config, on_progress=report,
+                                              progress_every=progress_every))
+    return results[0], results[1]
+
+
+# ---------------------------------------------------------------------------
+# Manager
+# ---------------------------------------------------------------------------
+
+class JobManager:
+    """Process pool + job table for background simulations."""
+
+    def __init__(
+        self,
+        max_workers: int | None = None,
+        progress_every: int = 5_000,
+        cache: ResultCache | None = None,
+        max_jobs: int = 200,
+    ) -> None:
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 2) - 1)
+        self.progress_every = progress_every
+        self.cache = cache
+        self.max_jobs = max_jobs
+        self._jobs: dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._queue = multiprocessing.get_context().Queue()
+        self._pool = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=(self._queue,),
+        )
+        self._pump = threading.Thread(target=self._pump_progress, name="sim-job-progress", daemon=True)
+        self._closed = False
+        self._pump.start()
+
+    # -- public API -------------------------------------------------------
+
+    def submit(self, num_guests: int, seed: int) -> str:
+        """Queue a BEFORE + AFTER run and return its job id immediately."""
+        job = Job(job_id=new_id(), num_guests=num_guests, seed=seed)
+        key = self._cache_key(num_guests, seed)
+        cached = self.cache.get(key) if self.cache is not None else None
+
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._trim()
+            if cached is not None:
+                job.before, job.after = cached
+                job.status, job.guests_processed = DONE, job.total_guests
+                job.started_at = job.finished_at = time.time()
+                self._changed.notify_all()
+                return job.job_id
+
+        future = self._pool.submit(_run_job, job.job_id, num_guests, seed, self.progress_every)
+        future.add_done_callback(lambda f, job_id=job.job_id, k=key: self._finish(job_id, k, f))
+        return job.job_id
+
+    def get(self, job_id: str) -> Job | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def snapshot(self, job_id: str) -> dict | None:
+        """Consistent JSON-friendly copy of a job's state."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.to_dict() if job else None
+
+    def wait(self, job_id: str, timeout: float | None = None, since: int = -1) -> dict | None:
+        """
+        Block until the job changes past `since` guests processed, finishes,
+        or `timeout` elapses; return its snapshot.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                job = self._jobs.get(job_id)
+                if job is None:
+                    return None
+                if job.finished or job.guests_processed > since:
+                    return job.to_dict()
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return job.to_dict()
+                self._changed.wait(remaining)
+
+    def shutdown(self) -> None:
+        self._closed = True
+        self._pool.shutdown(wait=False, cancel_futures=True)
+        self._queue.put(None)
+
+    # -- internals --------------------------------------------------------
+
+    @staticmethod
+    def _cache_key(num_guests: int, seed: int) -> str:
+        return scenario_key(ScenarioConfig.before(num_guests, seed),
+                            ScenarioConfig.after(num_guests, seed), engine="stream")
+
+    def _pump_progress(self) -> None:
+        while not self._closed:
+            try:
+                msg = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except (EOFError, OSError):
+                return
+            if msg is None:
+                return
+            job_id, label, processed, partial = msg
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job.finished:
+                    continue
+                if job.status == QUEUED:
+                    job.status, job.started_at = RUNNING, time.time()
+                job.stage = label
+                job.guests_processed = max(job.guests_processed, processed)
+                if partial is not None:
+                    job.partial[label] = partial
+                self._changed.notify_all()
+
+    def _finish(self, job_id: str, key: str, future: Future) -> None:
+        error = future.exception()
+        if error is None:
+            before, after = future.result()
+            if self.cache is not None:
+                self.cache.put(key, (before, after))
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job.finished_at = time.time()
+            job.started_at = job.started_at or job.finished_at
+            if error is None:
+                job.status, job.stage = DONE, ""
+                job.before, job.after = before, after
+                job.guests_processed = job.total_guests
+                job.partial = {}
+            else:
+                job.status, job.error = FAILED, f"{type(error).__name__}: {error}"
+            self._changed.notify_all()
+
+    def _trim(self) -> None:
+        """Forget the oldest finished jobs beyond `max_jobs`."""
+        if len(self._jobs) <= self.max_jobs:
+            return
+        finished = sorted((j for j in self._jobs.values() if j.finished), key=lambda j: j.created_at)
+        for job in finished[: len(self._jobs) - self.max_jobs]:
+            del self._jobs[job.job_id]
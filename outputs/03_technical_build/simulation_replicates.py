@@ -0,0 +1,240 @@
+"""
+NovaStar Hotels -- Monte Carlo Replicates
+==========================================
+One seed gives one `SimResult`, so a single BEFORE/AFTER delta is a noisy
+draw.  This module runs N independent replicates across a process pool and
+reports mean, standard deviation and 95% intervals for every `SimResult`
+counter and every `rebook_by_segment` entry.
+
+Reproducibility: a root `numpy.random.SeedSequence(seed)` is spawned into
+one child stream per replicate.  Replicate i always gets child i, whatever
+the worker count or chunking, so results are identical on a laptop and on
+a 32-core batch box.
+
+Scaling: replicates are shipped to workers in contiguous chunks and each
+worker returns one small float array per chunk, so inter-process traffic
+is independent of population size and speed-up is close to linear in the
+number of cores.
+
+Requires NumPy.  Python 3.10+.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+
+import numpy as np
+
+import guest_journey_simulation as sim
+from guest_journey_simulation import ScenarioConfig, SimResult
+from vectorized_simulation import COUNTER_FIELDS, SEGMENT_NAMES, simulate_vectorized
+
+# z-value for a two-sided 95% normal interval
+_Z95 = 1.959963984540054
+
+ENGINES = ("vectorized", "loop")
+
+
+# ---------------------------------------------------------------------------
+# Data Structures
+# ---------------------------------------------------------------------------
+
+@dataclass
+class MetricSummary:
+    """Replicate statistics for one metric."""
+    mean: float
+    std: float
+    ci95: tuple[float, float]   # 95% confidence interval for the mean
+    pi95: tuple[float, float]   # 2.5th-97.5th percentile of the replicates
+
+
+@dataclass
+class ReplicateSummary:
+    """Statistics for one scenario (BEFORE, AFTER or the paired DELTA)."""
+    label: str
+    replicates: int
+    num_guests: int
+    metrics: dict[str, MetricSummary] = field(default_factory=dict)
+    # metric name -> summary; names are SimResult counters plus
+    # "rebook_by_segment[<segment>].rebooked" and ".rate"
+
+
+def metric_names() -> list[str]:
+    """Names of the per-replicate metrics, in vector order."""
+    names = list(COUNTER_FIELDS)
+    for seg in SEGMENT_NAMES:
+        names.append(f"rebook_by_segment[{seg}].rebooked")
+        names.append(f"rebook_by_segment[{seg}].rate")
+    return names
+
+
+def _metric_vector(result: SimResult) -> list[float]:
+    values = [float(getattr(result, name)) for name in COUNTER_FIELDS]
+    for seg in SEGMENT_NAMES:
+        rebooked, total = result.rebook_by_segment.get(seg, (0, 0))
+        values.append(float(rebooked))
+        values.append(rebooked / total if total else 0.0)
+    return values
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+def _run_chunk(
+    seeds: list[np.random.SeedSequence],
+    num_guests: int,
+    engine: str,
+) -> np.ndarray:
+    """
+    Run BEFORE and AFTER for each child seed in the chunk.
+
+    Both scenarios of a replicate share the child seed, as the dashboard does
+    with a single seed, so the paired DELTA has common random numbers.
+    Returns an array of shape (len(seeds), 2, n_metrics).
+    """
+    configs = (ScenarioConfig.before(num_guests), ScenarioConfig.after(num_guests))
+    out = np.empty((len(seeds), 2, len(metric_names())))
+    for i, ss in enumerate(seeds):
+        for j, config in enumerate(configs):
+            if engine == "vectorized":
+                result = simulate_vectorized(config, np.random.default_rng(ss))
+            else:
+                rng = random.Random(int(ss.generate_state(1, np.uint64)[0]))
+                result = sim.simulate(config, rng)
+            out[i, j] = _metric_vector(result)
+    return out
+
+
+def _chunks(items: list, n_chunks: int) -> list[list]:
+    """Split items into at most n_chunks contiguous, near-equal chunks."""
+    n_chunks = max(1, min(n_chunks, len(items)))
+    size, extra = divmod(len(items), n_chunks)
+    out, start = [], 0
+    for i in range(n_chunks):
+        end = start + size + (1 if i < extra else 0)
+        out.append(items[start:end])
+        start = end
+    return out
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def _summarise(label: str, draws: np.ndarray, num_guests: int) -> ReplicateSummary:
+    n = draws.shape[0]
+    mean = draws.mean(axis=0)
+    std = draws.std(axis=0, ddof=1) if n > 1 else np.zeros_like(mean)
+    half = _Z95 * std / np.sqrt(n)
+    lo, hi = np.percentile(draws, [2.5, 97.5], axis=0)
+
+    summary = ReplicateSummary(label=label, replicates=n, num_guests=num_guests)
+    for i, name in enumerate(metric_names()):
+        summary.metrics[name] = MetricSummary(
+            mean=float(mean[i]),
+            std=float(std[i]),
+            ci95=(float(mean[i] - half[i]), float(mean[i] + half[i])),
+            pi95=(float(lo[i]), float(hi[i])),
+        )
+    return summary
+
+
+def run_replicates(
+    replicates: int = 200,
+    num_guests: int = sim.NUM_GUESTS,
+    seed: int = sim.SEED,
+    workers: int | None = None,
+    engine: str = "vectorized",
+) -> dict[str, ReplicateSummary]:
+    """
+    Run `replicates` independent BEFORE/AFTER pairs across a process pool.
+
+    Returns summaries keyed "BEFORE", "AFTER" and "DELTA" (AFTER - BEFORE
+    per replicate).  `workers=1` runs in-process; None uses every core.
+    """
+    if engine not in ENGINES:
+        raise ValueError(f"engine must be one of {ENGINES}, got {engine!r}")
+    if replicates < 1:
+        raise ValueError("replicates must be >= 1")
+
+    children = np.random.SeedSequence(seed).spawn(replicates)
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        draws = _run_chunk(children, num_guests, engine)
+    else:
+        # A few chunks per worker smooths out stragglers without
+        # multiplying pickling overhead.
+        chunks = _chunks(children, workers * 4)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = pool.map(_run_chunk, chunks,
+                             [num_guests] * len(chunks), [engine] * len(chunks))
+            draws = np.concatenate(list(parts))
+
+    return {
+        "BEFORE": _summarise("BEFORE", draws[:, 0], num_guests),
+        "AFTER": _summarise("AFTER", draws[:, 1], num_guests),
+        "DELTA": _summarise("DELTA", draws[:, 1] - draws[:, 0], num_guests),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Reporting
+# ---------------------------------------------------------------------------
+
+def print_summary(results: dict[str, ReplicateSummary]) -> None:
+    """Pretty-print BEFORE / AFTER / DELTA with 95% confidence intervals."""
+    before, after, delta = results["BEFORE"], results["AFTER"], results["DELTA"]
+    w = 104
+    print("=" * w)
+    print(f"  Monte Carlo replicates: {before.replicates} x {before.num_guests:,} guests")
+    print("=" * w)
+    print(f"{'Metric':<54} {'BEFORE':>14} {'AFTER':>14} {'DELTA (95% CI)':>16}")
+    print("-" * w)
+    for name in metric_names():
+        b, a, d = before.metrics[name], after.metrics[name], delta.metrics[name]
+        fmt = ".3f" if name.endswith(".rate") else ".1f"
+        print(f"  {name:<52} {b.mean:>8{fmt}}±{b.std:<5{fmt}} {a.mean:>8{fmt}}±{a.std:<5{fmt}} "
+              f"{d.mean:>+8{fmt}} [{d.ci95[0]:{fmt}}, {d.ci95[1]:{fmt}}]")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Monte Carlo replicates of the journey simulation")
+    parser.add_argument("--replicates", type=int, default=200)
+    parser.add_argument("--guests", type=int, default=sim.NUM_GUESTS)
+    parser.add_argument("--seed", type=int, default=sim.SEED)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process count (default: all cores)")
+    parser.add_argument("--engine", choices=ENGINES, default="vectorized")
+    parser.add_argument("--scaling", action="store_true",
+                        help="time the run at 1, 2, 4, ... workers and report speed-up")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+
+    if args.scaling:
+        max_workers = args.workers or os.cpu_count() or 1
+        counts = sorted({1, *(2 ** k for k in range(max_workers.bit_length())), max_workers})
+        baseline = None
+        print(f"{'Workers':>8} {'Seconds':>10} {'Speed-up':>10} {'Efficiency':>11}")
+        for n_workers in (c for c in counts if c <= max_workers):
+            t0 = time.perf_counter()
+            run_replicates(args.replicates, args.guests, args.seed, n_workers, args.engine)
+            elapsed = time.perf_counter() - t0
+            baseline = baseline or elapsed
+            speedup = baseline / elapsed
+            print(f"{n_workers:>8} {elapsed:>10.2f} {speedup:>9.2f}x {speedup / n_workers:>10.0%}")
+        raise SystemExit(0)
+
+    t0 = time.perf_counter()
+    results = run_replicates(args.replicates, args.guests, args.seed, args.workers, args.engine)
+    print_summary(results)
+    print(f"\n  {args.engine} engine, {time.perf_counter() - t0:.2f}s")
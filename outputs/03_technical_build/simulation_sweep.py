@@ -0,0 +1,247 @@
+"""
+NovaStar Hotels -- Simulation Parameter Sweep
+==============================================
+Answers "what if the open rate is 30% instead of 38%?" without editing
+module constants.  Takes a grid of parameter ranges, runs every
+combination (x replicates) across a process pool on the vectorized
+engine, and writes a tidy table -- one row per (grid point, replicate)
+with parameter columns followed by metric columns -- as CSV or Parquet.
+
+Common random numbers: for each replicate the guest population (segment
+codes, capture and app-install uniforms) is drawn once and shared by every
+grid point, and each grid point restarts the same outcome stream.  Curves
+across the grid are therefore smooth and differences between points
+reflect the parameters, not sampling noise.
+
+Example:
+    python simulation_sweep.py \\
+        --grid email_open_rate=0.30:0.46:0.04 \\
+        --grid app_install_rate=0.30,0.35,0.45 \\
+        --replicates 5 --out sweep.csv
+
+Requires NumPy; Parquet output additionally requires pyarrow.
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import itertools
+import os
+import time
+from collections.abc import Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import replace
+
+import numpy as np
+
+import guest_journey_simulation as sim
+from guest_journey_simulation import ScenarioConfig
+from vectorized_simulation import (
+    COUNTER_FIELDS,
+    SEGMENT_NAMES,
+    draw_population,
+    simulate_vectorized,
+)
+
+# Sweepable parameters and their default for the AFTER scenario
+SWEEP_PARAMS: dict[str, float] = {
+    "email_open_rate": sim.AFTER_EMAIL_OPEN,
+    "email_click_rate": sim.AFTER_EMAIL_CLICK,
+    "capture_rate": sim.AFTER_CAPTURE_RATE,
+    "app_install_rate": sim.APP_INSTALL_RATE,
+    "push_open_rate": sim.PUSH_OPEN_RATE,
+    "app_session_rate": sim.APP_SESSION_RATE,
+    "rebook_multiplier": 1.0,   # scales every segment's AFTER_REBOOK rate
+}
+
+
+# ---------------------------------------------------------------------------
+# Grid
+# ---------------------------------------------------------------------------
+
+def parse_range(spec: str) -> list[float]:
+    """
+    Parse "0.3,0.35,0.4" (explicit values) or "start:stop:step" (inclusive
+    of stop, to the nearest step) into a list of floats.
+    """
+    if ":" in spec:
+        start, stop, step = (float(x) for x in spec.split(":"))
+        if step <= 0:
+            raise ValueError(f"step must be positive in {spec!r}")
+        count = int(round((stop - start) / step)) + 1
+        return [round(start + i * step, 10) for i in range(count)]
+    return [float(x) for x in spec.split(",") if x]
+
+
+def expand_grid(grid: dict[str, Sequence[float]]) -> list[dict[str, float]]:
+    """Cartesian product of the grid, with unswept parameters at their defaults."""
+    unknown = set(grid) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"unknown sweep parameter(s): {sorted(unknown)}; "
+                         f"choose from {sorted(SWEEP_PARAMS)}")
+    names = list(grid)
+    points = []
+    for values in itertools.product(*(grid[n] for n in names)):
+        point = dict(SWEEP_PARAMS)
+        point.update(zip(names, values))
+        points.append(point)
+    return points
+
+
+# ---------------------------------------------------------------------------
+# Worker
+# ---------------------------------------------------------------------------
+
+def _run_replicate(
+    replicate: int,
+    seed_seq: np.random.SeedSequence,
+    points: list[dict[str, float]],
+    num_guests: int,
+) -> list[dict]:
+    """Run every grid point for one replicate, sharing one population draw."""
+    pop_seq, outcome_seq = seed_seq.spawn(2)
+    population = draw_population(np.random.default_rng(pop_seq), num_guests)
+    base = ScenarioConfig.after(num_guests)
+
+    rows = []
+    for i, point in enumerate(points):
+        params = {k: v for k, v in point.items() if k != "rebook_multiplier"}
+        params["rebook_rates"] = {seg: rate * point["rebook_multiplier"]
+                                  for seg, rate in base.rebook_rates.items()}
+        config = replace(base, **params)
+        result = simulate_vectorized(config, np.random.default_rng(outcome_seq), population)
+        row: dict = {"point": i, "replicate": replicate}
+        row.update(point)
+        row.update({name: getattr(result, name) for name in COUNTER_FIELDS})
+        row["rebook_rate"] = result.total_rebooked / num_guests if num_guests else 0.0
+        for seg in SEGMENT_NAMES:
+            rebooked, total = result.rebook_by_segment[seg]
+            row[f"rebook_rate[{seg}]"] = rebooked / total if total else 0.0
+        rows.append(row)
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+def sweep(
+    grid: dict[str, Sequence[float]],
+    replicates: int = 1,
+    num_guests: int = 80_000,
+    seed: int = sim.SEED,
+    workers: int | None = None,
+) -> list[dict]:
+    """
+    Run the AFTER scenario at every grid point for `replicates` seeds.
+
+    Work is split by replicate (each replicate = one population draw reused
+    across all points) and, when there are fewer replicates than workers,
+    further by contiguous blocks of grid points.  Rows come back ordered by
+    (replicate, point) regardless of `workers`.
+    """
+    if replicates < 1:
+        raise ValueError("replicates must be >= 1")
+    points = expand_grid(grid)
+    if not points:
+        raise ValueError(f"grid has no points: {dict(grid)}")
+    children = np.random.SeedSequence(seed).spawn(replicates)
+    workers = workers or os.cpu_count() or 1
+
+    # Enough point blocks per replicate to keep every worker busy
+    blocks = max(1, min(len(points), -(-workers // replicates)))
+    size = -(-len(points) // blocks)
+    tasks = [
+        (r, children[r], points[start:start + size], start)
+        for r in range(replicates)
+        for start in range(0, len(points), size)
+    ]
+
+    def _offset(rows: list[dict], start: int) -> list[dict]:
+        for row in rows:
+            row["point"] += start
+        return rows
+
+    if workers == 1:
+        parts = [_offset(_run_replicate(r, ss, pts, num_guests), start)
+                 for r, ss, pts, start in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [(pool.submit(_run_replicate, r, ss, pts, num_guests), start)
+                       for r, ss, pts, start in tasks]
+            parts = [_offset(f.result(), start) for f, start in futures]
+
+    return [row for part in parts for row in part]
+
+
+def write_table(rows: list[dict], path: str) -> None:
+    """Write sweep rows as CSV, or Parquet when `path` ends in .parquet."""
+    if not rows:
+        raise ValueError("no rows to write")
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise RuntimeError("Parquet output requires pyarrow (pip install pyarrow)") from exc
+        pq.write_table(pa.Table.from_pylist(rows), path)
+        return
+    with open(path, "w", newline="") as fh:
+        writer = csv.DictWriter(fh, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def _parse_args(argv: Sequence[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Sweep simulation parameters over a grid",
+        epilog=f"Parameters: {', '.join(sorted(SWEEP_PARAMS))}",
+    )
+    parser.add_argument("--grid", action="append", default=[], metavar="NAME=RANGE",
+                        help="parameter range as v1,v2,... or start:stop:step (repeatable)")
+    parser.add_argument("--replicates", type=int, default=1)
+    parser.add_argument("--guests", type=int, default=80_000)
+    parser.add_argument("--seed", type=int, default=sim.SEED)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="process count (default: all cores)")
+    parser.add_argument("--out", default="sweep.csv",
+                        help="output path; .parquet writes Parquet, anything else CSV")
+    args = parser.parse_args(argv)
+
+    grid: dict[str, list[float]] = {}
+    for item in args.grid:
+        name, sep, spec = item.partition("=")
+        if not sep:
+            parser.error(f"--grid expects NAME=RANGE, got {item!r}")
+        try:
+            grid[name.strip()] = parse_range(spec)
+        except ValueError as exc:
+            parser.error(str(exc))
+    if args.replicates < 1:
+        parser.error("--replicates must be >= 1")
+    try:
+        if not expand_grid(grid):
+            parser.error(f"--grid has no points: {grid}")
+    except ValueError as exc:
+        parser.error(str(exc))
+    args.grid = grid
+    return args
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    args = _parse_args(argv)
+    t0 = time.perf_counter()
+    rows = sweep(args.grid, args.replicates, args.guests, args.seed, args.workers)
+    write_table(rows, args.out)
+    n_points = len(rows) // args.replicates
+    print(f"{n_points} grid points x {args.replicates} replicates x {args.guests:,} guests "
+          f"-> {args.out} ({len(rows)} rows, {time.perf_counter() - t0:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""
+NovaStar Hotels -- SQLite Persistence
+======================================
+Durable storage for every `data_models` entity, one table per dataclass:
+
+    guests, stays, guest_preferences, interactions, offers,
+    loyalty_accounts, rewards, campaigns
+
+Columns mirror the dataclass fields and are derived from them, so adding a
+field to a model adds a column (for a new database; existing files need a
+migration).  Column encoding:
+
+  - str / int / float      -> TEXT / INTEGER / REAL as-is
+  - bool                   -> INTEGER 0/1
+  - date / datetime        -> ISO-8601 TEXT (sorts chronologically, so
+                              check_out range queries use the index)
+  - Enum                   -> TEXT member name
+  - list / dict            -> JSON TEXT (enum lists as member names)
+
+Writes are bulk upserts: `upsert()` groups records by model and runs one
+`executemany` of `INSERT ... ON CONFLICT(<key>) DO UPDATE` per batch inside
+a single transaction.  The statement text is built once per table, so
+sqlite3's statement cache prepares it once and re-binds it for every row.
+Secondary indexes cover guest_id, stays.check_out and journey_stage.
+
+Reads are generators over `fetchmany` batches, which yield dataclasses
+without ever materialising a whole table:
+
+    db = Storage("novastar.db")
+    db.upsert(stays)
+    for stay in db.stays_checked_out(date(2026, 3, 1), date(2026, 3, 8)):
+        ...
+
+SQLite in WAL mode with `synchronous=NORMAL` (FULL with `durable=True`),
+as in `trigger_outbox`, and a 64 MiB page cache so index B-trees stay
+in memory during bulk loads.
+
+Standard-library only.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import json
+import operator
+import sqlite3
+import threading
+import types
+import typing
+from collections.abc import Callable, Iterable, Iterator
+from datetime import date, datetime
+from enum import Enum
+
+from data_models import (
+    Campaign,
+    Guest,
+    GuestPreferences,
+    Interaction,
+    JourneyStage,
+    LoyaltyAccount,
+    Offer,
+    Reward,
+    Stay,
+)
+
+# model -> (table, key column, indexed columns)
+_TABLES: dict[type, tuple[str, str, tuple[str, ...]]] = {
+    Guest: ("guests", "guest_id", ()),
+    Stay: ("stays", "stay_id", ("guest_id", "check_out")),
+    GuestPreferences: ("guest_preferences", "guest_id", ()),
+    Interaction: ("interactions", "interaction_id", ("guest_id", "journey_stage", "timestamp")),
+    Offer: ("offers", "offer_id", ("guest_id",)),
+    LoyaltyAccount: ("loyalty_accounts", "account_id", ("guest_id",)),
+    Reward: ("rewards", "reward_id", ("account_id",)),
+    Campaign: ("campaigns", "campaign_id", ("journey_stage",)),
+}
+
+_Codec = tuple[str, Callable | None, Callable | None]      # (SQL type, encode, decode)
+
+
+# ---------------------------------------------------------------------------
+# Column codecs
+# ---------------------------------------------------------------------------
+
+def _enum_list_codec(enum_cls: type[Enum]) -> _Codec:
+    members = enum_cls.__members__
+    return (
+        "TEXT",
+        lambda v: json.dumps([m.name for m in v]),
+        lambda v: [members[name] for name in json.loads(v)],
+    )
+
+
+def _codec(tp) -> _Codec:
+    """SQL type and (encode, decode) for one field type; None means pass through."""
+    args = typing.get_args(tp)
+    if typing.get_origin(tp) in (typing.Union, types.UnionType):
+        inner = next(a for a in args if a is not type(None))
+        sql, enc, dec = _codec(inner)
+        return (
+            sql,
+            enc and (lambda v, f=enc: None if v is None else f(v)),
+            dec and (lambda v, f=dec: None if v is None else f(v)),
+        )
+    if tp is bool:
+        return "INTEGER", None, bool
+    if tp in (str, int, float):
+        return {str: "TEXT", int: "INTEGER", float: "REAL"}[tp], None, None
+    if tp is datetime:
+        return "TEXT", datetime.isoformat, datetime.fromisoformat
+    if tp is date:
+        return "TEXT", date.isoformat, date.fromisoformat
+    if isinstance(tp, type) and issubclass(tp, Enum):
+        return "TEXT", operator.attrgetter("name"), tp.__members__.__getitem__
+    if typing.get_origin(tp) is list and args and isinstance(args[0], type) and issubclass(args[0], Enum):
+        return _enum_list_codec(args[0])
+    if typing.get_origin(tp) in (list, dict) or tp in (list, dict):
+        return "TEXT", json.dumps, json.loads
+    raise TypeError(f"no column mapping for field type {tp!r}")
+
+
+class _TableMap:
+    """SQL and row codecs for one model, built once."""
+
+    def __init__(self, model: type) -> None:
+        self.model = model
+        self.table, self.key, self.indexes = _TABLES[model]
+        hints = typing.get_type_hints(model)
+        self.columns = [f.name for f in dataclasses.fields(model)]
+        codecs = [_codec(hints[name]) for name in self.columns]
+        self._get = operator.attrgetter(*self.columns)
+        self._encoders = [(i, enc) for i, (_, enc, _) in enumerate(codecs) if enc]
+        self._decoders = [(i, dec) for i, (_, _, dec) in enumerate(codecs) if dec]
+
+        cols = ", ".join(self.columns)
+        self.ddl = [
+            f"CREATE TABLE IF NOT EXISTS {self.table} ("
+            + ", ".join(f"{name} {sql}" + (" PRIMARY KEY" if name == self.key else "")
+                        for name, (sql, _, _) in zip(self.columns, codecs))
+            + ")",
+            *(f"CREATE INDEX IF NOT EXISTS {self.table}_{col} ON {self.table} ({col})"
+              for col in self.indexes),
+        ]
+        updates = ", ".join(f"{c} = excluded.{c}" for c in self.columns if c != self.key)
+        self.upsert_sql = (
+            f"INSERT INTO {self.table} ({cols}) VALUES ({', '.join('?' * len(self.columns))}) "
+            f"ON CONFLICT({self.key}) DO UPDATE SET {updates}"
+        )
+        self.select_sql = f"SELECT {cols} FROM {self.table}"
+
+    def encode(self, record) -> tuple:
+        values = list(self._get(record))
+        for i, enc in self._encoders:
+            values[i] = enc(values[i])
+        return tuple(values)
+
+    def decode(self, row: tuple):
+        values = list(row)
+        for i, dec in self._decoders:
+            values[i] = dec(values[i])
+        return self.model(*values)
+
+
+_MAPS = {model: _TableMap(model) for model in _TABLES}
+
+
+# ---------------------------------------------------------------------------
+# Storage
+# ---------------------------------------------------------------------------
+
+class Storage:
+    """SQLite database of all data_models entities.  Thread-safe; one per process."""
+
+    def __init__(self, path: str, durable: bool = False, batch_size: int = 10_000) -> None:
+        self.path = path
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None,
+                                   timeout=30.0, cached_statements=256)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={'FULL' if durable else 'NORMAL'}")
+        self._db.execute("PRAGMA cache_size=-65536")        # 64 MiB: index pages stay hot during bulk loads
+        for table in _MAPS.values():
+            for ddl in table.ddl:
+                self._db.execute(ddl)
+
+    # -- writes -----------------------------------------------------------
+
+    def upsert(self, records: Iterable) -> int:
+        """
+        Insert or update records of any data_models type, keyed by their id,
+        in one transaction.  Returns the number of records written.
+        """
+        pending: dict[type, list[tuple]] = {}
+        written = 0
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                for record in records:
+                    table = _MAPS[type(record)]
+                    rows = pending.setdefault(table.model, [])
+                    rows.append(table.encode(record))
+                    if len(rows) >= self.batch_size:
+                        self._db.executemany(table.upsert_sql, rows)
+                        written += len(rows)
+                        rows.clear()
+                for model, rows in pending.items():
+                    if rows:
+                        self._db.executemany(_MAPS[model].upsert_sql, rows)
+                        written += len(rows)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return written
+
+    def delete(self, model: type, key: str) -> bool:
+        table = _MAPS[model]
+        with self._lock:
+            return self._db.execute(f"DELETE FROM {table.table} WHERE {table.key} = ?", (key,)).rowcount > 0
+
+    # -- streaming reads --------------------------------------------------
+
+    def stream(self, model: type, where: str = "", params: tuple = (), order_by: str = "") -> Iterator:
+        """
+        Stream `model` rows matching an optional SQL `where` clause as
+        dataclasses, `batch_size` rows at a time.
+        """
+        table = _MAPS[model]
+        sql = table.select_sql
+        if where:
+            sql += f" WHERE {where}"
+        if order_by:
+            sql += f" ORDER BY {order_by}"
+        # A separate cursor per generator; the lock only guards each fetch
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+        decode = table.decode
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(self.batch_size)
+            if not rows:
+                return
+            for row in rows:
+                yield decode(row)
+
+    def get(self, model: type, key: str):
+        """One record by id, or None."""
+        return next(self.stream(model, f"{_MAPS[model].key} = ?", (key,)), None)
+
+    def count(self, model: type) -> int:
+        with self._lock:
+            return self._db.execute(f"SELECT COUNT(*) FROM {_MAPS[model].table}").fetchone()[0]
+
+    def stays_for_guest(self, guest_id: str) -> Iterator[Stay]:
+        return self.stream(Stay, "guest_id = ?", (guest_id,), order_by="check_out")
+
+    def stays_checked_out(self, start: date, end: date) -> Iterator[Stay]:
+        """Stays with start <= check_out < end, in check-out order."""
+        return self.stream(Stay, "check_out >= ? AND check_out < ?",
+                         (start.isoformat(), end.isoformat()), order_by="check_out")
+
+    def interactions_for_guest(self, guest_id: str) -> Iterator[Interaction]:
+        return self.stream(Interaction, "guest_id = ?", (guest_id,), order_by="timestamp")
+
+    def interactions_at_stage(self, stage: JourneyStage) -> Iterator[Interaction]:
+        return self.stream(Interaction, "journey_stage = ?", (stage.name,))
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,201 @@
+"""
+NovaStar Hotels -- Trigger Dispatcher
+======================================
+Release side of the Communication Orchestrator.  Planners and the daily
+scheduler produce `Trigger`s with a send time; `TriggerDispatcher` holds
+them in a binary heap keyed by absolute send time and hands back whatever
+is due, so the orchestrator can run as one long-lived process:
+
+    dispatcher = TriggerDispatcher()
+    handle = dispatcher.schedule(trigger)          # O(log n)
+    dispatcher.cancel(handle)                      # O(1), guest rebooked
+    for trigger in dispatcher.pop_due(now):        # O(k log n) for k due
+        send(trigger)
+
+or, from a worker thread, `dispatcher.wait()` blocks until the earliest
+trigger is due (or an earlier one is scheduled) and returns the batch.
+
+Send times: triggers from `journey_scheduler` carry an absolute
+`message.send_at` and can be scheduled as-is.  Up-front plans from
+`build_trigger_plan(s)` stamp every stage with the planning day's send
+window, so schedule those with `schedule_plan(plan, checkout)`, which
+places each stage at checkout + day_offset in the message's send window.
+
+Cancellation marks the heap entry dead instead of searching for it (the
+`heapq` documentation's priority-queue recipe); dead entries are skipped
+when popped and the heap is compacted once they outnumber live ones.
+Triggers with equal send times are released in scheduling order.
+
+Standard-library only.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import Callable, Iterable
+from datetime import date, datetime, timedelta
+from datetime import time as time_of_day
+
+from engagement_engine import Trigger
+
+# Compact only heaps with at least this many dead entries
+_COMPACT_MIN = 1_024
+
+
+class TriggerDispatcher:
+    """Thread-safe min-heap of pending triggers keyed by send time."""
+
+    def __init__(self, clock: Callable[[], datetime] = datetime.now) -> None:
+        self.clock = clock
+        self._heap: list[list] = []            # [send_at, handle, trigger | None]
+        self._entries: dict[int, list] = {}    # handle -> live heap entry
+        self._handles = itertools.count()
+        self._dead = 0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    # -- scheduling -------------------------------------------------------
+
+    def schedule(self, trigger: Trigger, send_at: datetime | None = None) -> int:
+        """
+        Queue `trigger` for `send_at` (default: its message's send time) and
+        return a handle for `cancel`.
+        """
+        when = _send_time_of(trigger, send_at)
+        with self._lock:
+            handle = next(self._handles)
+            entry = [when, handle, trigger]
+            self._entries[handle] = entry
+            heapq.heappush(self._heap, entry)
+            if self._heap[0] is entry:
+                self._changed.notify_all()
+            return handle
+
+    def schedule_many(
+        self,
+        triggers: Iterable[Trigger],
+        send_times: Iterable[datetime] | None = None,
+    ) -> list[int]:
+        """
+        Queue a batch, optionally with explicit send times (parallel to
+        `triggers`).  Large batches are appended and re-heapified in O(n)
+        rather than pushed one by one.
+        """
+        if send_times is None:
+            entries = [[_send_time_of(t, None), 0, t] for t in triggers]
+        else:
+            entries = [[when, 0, t] for t, when in zip(triggers, send_times, strict=True)]
+        with self._lock:
+            for entry in entries:
+                entry[1] = handle = next(self._handles)
+                self._entries[handle] = entry
+            if len(entries) > len(self._heap):
+                self._heap.extend(entries)
+                heapq.heapify(self._heap)
+            else:
+                for entry in entries:
+                    heapq.heappush(self._heap, entry)
+            if entries:
+                self._changed.notify_all()
+        return [e[1] for e in entries]
+
+    def schedule_plan(self, plan: Iterable[Trigger], checkout: date) -> list[int]:
+        """Queue an up-front trigger plan, anchoring each stage to `checkout`."""
+        handles = []
+        for trigger in plan:
+            handles.append(self.schedule(trigger, plan_send_time(trigger, checkout)))
+        return handles
+
+    def cancel(self, handle: int) -> bool:
+        """Withdraw a pending trigger; False if already released or cancelled."""
+        with self._lock:
+            entry = self._entries.pop(handle, None)
+            if entry is None:
+                return False
+            entry[2] = None
+            self._dead += 1
+            if self._dead >= _COMPACT_MIN and self._dead > len(self._entries):
+                self._compact()
+            return True
+
+    # -- release ----------------------------------------------------------
+
+    def pop_due(self, until: datetime | None = None) -> list[Trigger]:
+        """Remove and return every trigger with send time <= `until` (default: now)."""
+        until = self.clock() if until is None else until
+        with self._lock:
+            return self._pop_until(until)
+
+    def peek(self) -> datetime | None:
+        """Send time of the earliest pending trigger, or None if empty."""
+        with self._lock:
+            self._drop_dead_head()
+            return self._heap[0][0] if self._heap else None
+
+    def wait(self, timeout: float | None = None) -> list[Trigger]:
+        """
+        Block until at least one trigger is due by `clock`, then return all
+        due triggers.  Returns an empty list if `timeout` seconds pass first.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            while True:
+                now = self.clock()
+                due = self._pop_until(now)
+                if due:
+                    return due
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return []
+                self._drop_dead_head()
+                if self._heap:
+                    until_next = (self._heap[0][0] - now).total_seconds()
+                    remaining = until_next if remaining is None else min(remaining, until_next)
+                self._changed.wait(remaining)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    # -- internals (lock held) --------------------------------------------
+
+    def _pop_until(self, until: datetime) -> list[Trigger]:
+        heap, due = self._heap, []
+        while heap and heap[0][0] <= until:
+            _, handle, trigger = heapq.heappop(heap)
+            if trigger is None:
+                self._dead -= 1
+            else:
+                del self._entries[handle]
+                due.append(trigger)
+        return due
+
+    def _drop_dead_head(self) -> None:
+        heap = self._heap
+        while heap and heap[0][2] is None:
+            heapq.heappop(heap)
+            self._dead -= 1
+
+    def _compact(self) -> None:
+        self._heap = [e for e in self._heap if e[2] is not None]
+        heapq.heapify(self._heap)
+        self._dead = 0
+
+
+def plan_send_time(trigger: Trigger, checkout: date) -> datetime:
+    """Absolute send time of a planned stage: checkout + day_offset, in its send window."""
+    window = trigger.message.send_at.time() if trigger.message else time_of_day()
+    return datetime.combine(checkout + timedelta(days=trigger.day_offset), window)
+
+
+def _send_time_of(trigger: Trigger, send_at: datetime | None) -> datetime:
+    if send_at is not None:
+        return send_at
+    if trigger.message is None:
+        raise ValueError(f"trigger for guest {trigger.guest_id} has no message; pass send_at")
+    return trigger.message.send_at
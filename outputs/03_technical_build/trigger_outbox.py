@@ -0,0 +1,266 @@
+"""
+NovaStar Hotels -- Durable Trigger Outbox
+==========================================
+Persistent record of every trigger the orchestrator intends to send, so a
+crash loses nothing and re-running a plan never double-sends.
+
+  enqueue  -> rows land as `pending`; one row per idempotency key
+              (guest_id, journey_stage, stay_id), so re-running a plan for
+              the same stay inserts nothing new
+  claim    -> a worker atomically leases a batch of due rows (`claimed`)
+  mark_*   -> `sent`, or back to `pending` for a retry, or `failed` once
+              attempts run out
+
+A worker killed mid-batch (kill -9, OOM, deploy) leaves its rows `claimed`;
+once their lease expires any worker claims them again, unless they have
+used up `max_attempts`, in which case they fail.  Settling checks
+`claimed_by`, so a worker whose lease ran out cannot settle rows that
+another worker has re-claimed.  Delivery is
+therefore at-least-once for rows that were in flight at the crash, and
+exactly-once for everything else; pass the outbox id to providers that
+accept an idempotency header to close that gap.
+
+SQLite in WAL mode: enqueues are batched into one transaction per call
+via executemany, claims are a single IMMEDIATE transaction, and several
+processes can share one file.  `synchronous=NORMAL` survives process
+crashes; use `durable=True` (FULL) to also survive power loss.
+
+    outbox = TriggerOutbox("outbox.db")
+    outbox.enqueue_plan(build_trigger_plan(profile), stay.stay_id, checkout=stay.check_out)
+    for item in outbox.claim("worker-1", limit=500):
+        ...send item.trigger...
+    outbox.mark_sent("worker-1", [item.id for item in sent])
+
+Standard-library only.
+"""
+
+from __future__ import annotations
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from engagement_engine import Trigger
+from trigger_dispatcher import plan_send_time
+
+# Row states
+PENDING = "pending"
+CLAIMED = "claimed"
+SENT = "sent"
+FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id           INTEGER PRIMARY KEY,
+    idem_key     TEXT    NOT NULL UNIQUE,
+    guest_id     TEXT    NOT NULL,
+    stay_id      TEXT    NOT NULL,
+    journey_stage TEXT   NOT NULL,
+    channel      TEXT    NOT NULL,
+    send_at      TEXT    NOT NULL,          -- ISO-8601, sorts chronologically
+    payload      BLOB    NOT NULL,          -- pickled Trigger
+    state        TEXT    NOT NULL DEFAULT 'pending',
+    attempts     INTEGER NOT NULL DEFAULT 0,
+    claimed_by   TEXT,
+    lease_until  REAL,
+    error        TEXT    NOT NULL DEFAULT '',
+    updated_at   REAL    NOT NULL
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (state, send_at);
+"""
+
+
+def idempotency_key(guest_id: str, stage_name: str, stay_id: str) -> str:
+    return f"{guest_id}|{stage_name}|{stay_id}"
+
+
+@dataclass
+class OutboxItem:
+    """A claimed row."""
+    id: int
+    stay_id: str
+    attempts: int               # including this one
+    trigger: Trigger
+
+
+class TriggerOutbox:
+    """SQLite-backed outbox of triggers.  Thread-safe; one per process."""
+
+    def __init__(
+        self,
+        path: str,
+        lease_seconds: float = 300.0,
+        max_attempts: int = 5,
+        durable: bool = False,
+    ) -> None:
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=30.0)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(f"PRAGMA synchronous={'FULL' if durable else 'NORMAL'}")
+        self._db.executescript(_SCHEMA)
+
+    # -- enqueue ----------------------------------------------------------
+
+    def enqueue(self, entries: Iterable[tuple[Trigger, str, datetime]]) -> int:
+        """
+        Insert (trigger, stay_id, send_at) entries as pending in one
+        transaction.  Entries whose idempotency key already exists -- in any
+        state -- are skipped.  Returns the number of rows inserted.
+        """
+        now = time.time()
+        rows = [
+            (idempotency_key(t.guest_id, t.journey_stage.name, stay_id), t.guest_id, stay_id,
+             t.journey_stage.name, t.channel.value, send_at.isoformat(),
+             pickle.dumps(t, protocol=pickle.HIGHEST_PROTOCOL), now)
+            for t, stay_id, send_at in entries
+        ]
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(
+                    "INSERT OR IGNORE INTO outbox (idem_key, guest_id, stay_id, journey_stage, "
+                    "channel, send_at, payload, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return self._db.total_changes - before
+
+    def enqueue_plan(self, plan: Iterable[Trigger], stay_id: str, checkout: date) -> int:
+        """Enqueue a `build_trigger_plan` result, each stage at checkout + day_offset."""
+        return self.enqueue((t, stay_id, plan_send_time(t, checkout)) for t in plan)
+
+    # -- claim / settle ---------------------------------------------------
+
+    def claim(self, worker: str, limit: int = 500, now: datetime | None = None) -> list[OutboxItem]:
+        """
+        Lease up to `limit` due rows, earliest send time first: rows whose
+        lease has expired (a crashed worker's batch) before pending rows.
+        """
+        due = (now or datetime.now()).isoformat()
+        wall = time.time()
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                # Expired leases that already used every attempt (a poison
+                # row that keeps killing its worker) fail instead of cycling
+                self._db.execute(
+                    "UPDATE outbox SET state = 'failed', lease_until = NULL, claimed_by = NULL, "
+                    "error = 'lease expired', updated_at = ? "
+                    "WHERE state = 'claimed' AND send_at <= ? AND lease_until < ? AND attempts >= ?",
+                    (wall, due, wall, self.max_attempts),
+                )
+                # Two index range scans on (state, send_at); an OR across
+                # states would fall back to scanning sent rows.
+                rows = self._db.execute(
+                    "SELECT id, stay_id, attempts, payload FROM outbox "
+                    "WHERE state = 'claimed' AND send_at <= ? AND lease_until < ? "
+                    "ORDER BY send_at LIMIT ?",
+                    (due, wall, limit),
+                ).fetchall()
+                if len(rows) < limit:
+                    rows += self._db.execute(
+                        "SELECT id, stay_id, attempts, payload FROM outbox "
+                        "WHERE state = 'pending' AND send_at <= ? ORDER BY send_at LIMIT ?",
+                        (due, limit - len(rows)),
+                    ).fetchall()
+                self._db.executemany(
+                    "UPDATE outbox SET state = 'claimed', claimed_by = ?, lease_until = ?, "
+                    "attempts = attempts + 1, updated_at = ? WHERE id = ?",
+                    [(worker, wall + self.lease_seconds, wall, r[0]) for r in rows],
+                )
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+        return [OutboxItem(id=r[0], stay_id=r[1], attempts=r[2] + 1, trigger=pickle.loads(r[3]))
+                for r in rows]
+
+    def mark_sent(self, worker: str, ids: Sequence[int]) -> int:
+        """
+        Mark rows `worker` still holds as sent.  Returns how many were
+        settled; fewer than `len(ids)` means this worker's lease expired
+        and another worker re-claimed the rest.
+        """
+        return self._settle("UPDATE outbox SET state = 'sent', lease_until = NULL, error = '', updated_at = ? "
+                            "WHERE id = ? AND state = 'claimed' AND claimed_by = ?",
+                            [(time.time(), i, worker) for i in ids])
+
+    def mark_failed(self, worker: str, failures: Sequence[tuple[int, str]], retry: bool = True) -> int:
+        """
+        Record failed sends as (id, error) for rows `worker` still holds.
+        With `retry`, rows go back to pending until `max_attempts` is
+        reached, then to failed.  Returns how many rows were settled.
+        """
+        now = time.time()
+        return self._settle(
+            "UPDATE outbox SET state = CASE WHEN ? AND attempts < ? THEN 'pending' ELSE 'failed' END, "
+            "lease_until = NULL, error = ?, updated_at = ? "
+            "WHERE id = ? AND state = 'claimed' AND claimed_by = ?",
+            [(retry, self.max_attempts, error, now, i, worker) for i, error in failures],
+        )
+
+    def release(self, worker: str | None = None) -> int:
+        """
+        Return claimed rows (of one worker, or all) to pending without
+        waiting for the lease -- for a single-orchestrator restart.
+        """
+        sql = "UPDATE outbox SET state = 'pending', lease_until = NULL WHERE state = 'claimed'"
+        params: tuple = ()
+        if worker is not None:
+            sql += " AND claimed_by = ?"
+            params = (worker,)
+        with self._lock:
+            return self._db.execute(sql, params).rowcount
+
+    def _settle(self, sql: str, rows: list[tuple]) -> int:
+        if not rows:
+            return 0
+        with self._lock:
+            before = self._db.total_changes
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany(sql, rows)
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            return self._db.total_changes - before
+
+    # -- inspection -------------------------------------------------------
+
+    def counts(self) -> dict[str, int]:
+        """Rows per state."""
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM outbox GROUP BY state").fetchall()
+        out = {PENDING: 0, CLAIMED: 0, SENT: 0, FAILED: 0}
+        out.update(rows)
+        return out
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
+
+
+def remove_database(path: str) -> None:
+    """Delete an outbox file and its WAL/shared-memory side files."""
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,328 @@
+"""
+NovaStar Hotels -- Vectorized Guest Journey Simulation
+=======================================================
+Array-backed engine for the 90-day post-stay simulation.
+
+`guest_journey_simulation.simulate()` walks every guest through every
+stage with one `rng.random()` call per event.  This engine models the
+same process but draws all outcomes of a stage for the whole population
+as batched NumPy arrays:
+
+  - email opens   ~ Binomial(emails_in_stage, open_rate * intensity)
+  - email clicks  ~ Binomial(opens, click_rate / open_rate)
+  - push opens    ~ Bernoulli(PUSH_OPEN_RATE * intensity)
+  - app sessions  ~ Bernoulli(APP_SESSION_RATE * intensity)
+  - rebooking     ~ Bernoulli(base_rate + capped engagement boost)
+
+It returns the same `SimResult`, so the 80,000-guest portfolio can be run
+directly instead of scaling up a 100-guest sample.
+
+The two engines consume random numbers differently, so they agree in
+distribution rather than draw-for-draw.  `check_equivalence()` is the
+statistical-equivalence test between them (see its docstring).
+
+Requires NumPy.  Python 3.10+.
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+from dataclasses import dataclass, fields
+
+import numpy as np
+
+import guest_journey_simulation as sim
+from guest_journey_simulation import ScenarioConfig, SimResult, Stage
+
+# Segment names in SEGMENT_DIST order; segment codes index into this tuple.
+SEGMENT_NAMES: tuple[str, ...] = tuple(name for name, _ in sim.SEGMENT_DIST)
+
+# Stages that never carry a push notification (mirrors simulate()).
+_NO_PUSH_STAGES = (Stage.WARM_FAREWELL, Stage.ONGOING_RELATIONSHIP)
+
+# SimResult integer counters compared by check_equivalence()
+COUNTER_FIELDS: tuple[str, ...] = tuple(
+    f.name for f in fields(SimResult) if f.name not in ("label", "rebook_by_segment")
+)
+
+
+def _as_generator(rng: np.random.Generator | int | None) -> np.random.Generator:
+    """Accept a Generator, an integer seed or None."""
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+
+def _assign_segment_codes(rng: np.random.Generator, n: int) -> np.ndarray:
+    """Vectorized `_assign_segments`: same per-segment counts, shuffled."""
+    counts = [round(pct * n) for _, pct in sim.SEGMENT_DIST]
+    codes = np.repeat(np.arange(len(SEGMENT_NAMES), dtype=np.int8), counts)
+    # Fix rounding exactly as the loop engine does
+    if codes.size < n:
+        codes = np.concatenate([codes, np.zeros(n - codes.size, dtype=np.int8)])
+    elif codes.size > n:
+        codes = codes[:n]
+    rng.shuffle(codes)
+    return codes
+
+
+@dataclass(frozen=True)
+class Population:
+    """
+    Scenario-independent draws for one population: segment codes plus the
+    uniforms behind the capture and app-install rolls.
+
+    A guest has email when `u_email < capture_rate` and the app when also
+    `u_app < app_install_rate`, so one Population can be re-thresholded for
+    any capture / install rate (common random numbers across a sweep).
+    """
+    codes: np.ndarray
+    u_email: np.ndarray
+    u_app: np.ndarray | None = None
+
+
+def draw_population(
+    rng: np.random.Generator | int | None,
+    n: int,
+    with_app: bool = True,
+) -> Population:
+    """Draw a Population in the same stream order `simulate_vectorized` uses."""
+    rng = _as_generator(rng)
+    codes = _assign_segment_codes(rng, n)
+    u_email = rng.random(n)
+    u_app = rng.random(n) if with_app else None
+    return Population(codes=codes, u_email=u_email, u_app=u_app)
+
+
+def simulate_vectorized(
+    config: ScenarioConfig,
+    rng: np.random.Generator | int | None = None,
+    population: Population | None = None,
+) -> SimResult:
+    """
+    Run the 90-day simulation for one scenario with batched array draws.
+
+    Same model as `guest_journey_simulation.simulate()`.  `rng` is a NumPy
+    Generator or seed and defaults to `config.seed`.  With `population`, the
+    segment/capture/app draws are taken from it (its size overrides
+    `config.num_guests`) and `rng` only drives the journey outcomes.
+    """
+    rng = _as_generator(config.seed if rng is None else rng)
+    use_app = config.use_app
+
+    if population is None:
+        population = draw_population(rng, config.num_guests, with_app=use_app)
+    elif use_app and population.u_app is None:
+        raise ValueError("population was drawn without app uniforms (with_app=False)")
+    codes = population.codes
+    n = codes.size
+
+    has_email = population.u_email < config.capture_rate
+    if use_app:
+        has_app = (population.u_app < config.app_install_rate) & has_email
+    else:
+        has_app = np.zeros(n, dtype=bool)
+
+    # Unreachable guests (the 57% data void) never enter the journey
+    reachable = has_email | has_app
+    seg = codes[reachable]
+    email_r = has_email[reachable]
+    app_r = has_app[reachable]
+    m = seg.size
+
+    intensity_by_seg = np.array([config.intensity.get(s, 1.0) for s in SEGMENT_NAMES])
+    intensity = intensity_by_seg[seg]
+
+    email_open_rate = config.email_open_rate
+    email_click_rate = config.email_click_rate
+    use_push = config.use_push
+
+    # rng.random() < p is certain for p >= 1, so clip before using as a probability
+    open_p = np.clip(email_open_rate * intensity[email_r], 0.0, 1.0)
+    click_p = min(email_click_rate / email_open_rate, 1.0) if email_open_rate > 0 else 0.0
+    push_p = np.clip(config.push_open_rate * intensity[app_r], 0.0, 1.0)
+    session_p = np.clip(config.app_session_rate * intensity[app_r], 0.0, 1.0)
+    n_email = open_p.size
+    n_app = push_p.size
+
+    engagement = np.zeros(m)
+    email_engagement = np.zeros(n_email)
+    app_engagement = np.zeros(n_app)
+    emails_sent = emails_opened = emails_clicked = 0
+    push_sent = push_opened = app_sessions = 0
+
+    for stage in Stage:
+        if stage.value > sim.SIM_DAYS:
+            break
+
+        # --- Emails ---
+        k = config.emails_per_stage.get(stage, 0)
+        if k and n_email:
+            opened = rng.binomial(k, open_p)
+            clicked = rng.binomial(opened, click_p)
+            emails_sent += k * n_email
+            emails_opened += int(opened.sum())
+            emails_clicked += int(clicked.sum())
+            email_engagement += 0.15 * opened + 0.25 * clicked
+
+        # --- Push notifications (after system only) ---
+        if use_push and n_app and stage not in _NO_PUSH_STAGES:
+            pushed = rng.random(n_app) < push_p
+            push_sent += n_app
+            push_opened += int(np.count_nonzero(pushed))
+            app_engagement += 0.10 * pushed
+
+        # --- App sessions (organic, after system only) ---
+        if use_app and n_app:
+            session = rng.random(n_app) < session_p
+            app_sessions += int(np.count_nonzero(session))
+            app_engagement += 0.10 * session
+
+    engagement[email_r] += email_engagement
+    engagement[app_r] += app_engagement
+
+    # --- Rebooking decision ---
+    base_by_seg = np.array([config.rebook_rates.get(s, 0.12) for s in SEGMENT_NAMES])
+    engagement_boost = np.minimum(engagement * 0.08, 0.10)
+    final_prob = np.minimum(base_by_seg[seg] + engagement_boost, 0.60)
+    rebooked = rng.random(m) < final_prob
+
+    # --- Aggregate ---
+    n_seg = len(SEGMENT_NAMES)
+    seg_totals = np.bincount(codes, minlength=n_seg)
+    seg_rebooked = np.bincount(seg[rebooked], minlength=n_seg)
+
+    return SimResult(
+        label=config.label,
+        total_guests=n,
+        guests_with_email=int(np.count_nonzero(has_email)),
+        total_emails_sent=emails_sent,
+        total_emails_opened=emails_opened,
+        total_emails_clicked=emails_clicked,
+        total_push_sent=push_sent,
+        total_push_opened=push_opened,
+        total_app_sessions=app_sessions,
+        total_rebooked=int(np.count_nonzero(rebooked)),
+        rebook_by_segment={
+            s: (int(seg_rebooked[i]), int(seg_totals[i]))
+            for i, s in enumerate(SEGMENT_NAMES)
+        },
+    )
+
+
+# ---------------------------------------------------------------------------
+# Statistical equivalence with the loop engine
+# ---------------------------------------------------------------------------
+
+def _metric_vector(result: SimResult) -> list[float]:
+    """Flatten a SimResult into counters + per-segment rebook counts."""
+    values = [float(getattr(result, name)) for name in COUNTER_FIELDS]
+    values.extend(float(result.rebook_by_segment[s][0]) for s in SEGMENT_NAMES)
+    return values
+
+
+def _metric_names() -> list[str]:
+    return list(COUNTER_FIELDS) + [f"rebooked[{s}]" for s in SEGMENT_NAMES]
+
+
+def check_equivalence(
+    replicates: int = 200,
+    num_guests: int = 500,
+    seed: int = sim.SEED,
+    z_threshold: float = 4.0,
+) -> list[dict]:
+    """
+    Statistical-equivalence test: loop engine vs vectorized engine.
+
+    For each scenario (BEFORE / AFTER) both engines are run `replicates`
+    times on independent seeds.  For every SimResult counter and every
+    per-segment rebook count we compute the Welch z-statistic of the
+    difference in replicate means:
+
+        z = (mean_vec - mean_loop) / sqrt(var_vec/R + var_loop/R)
+
+    Under equivalence each z is approximately N(0, 1).  With ~30 metrics
+    per run, |z| < 4 keeps the family-wise false-alarm rate well under 1%,
+    while a real modelling difference (e.g. a dropped engagement term or a
+    wrong probability) shows up as |z| in the tens at the default sizes.
+
+    Returns one row per (scenario, metric) with both means, z and `ok`.
+    Metrics with zero variance in both engines (e.g. deterministic
+    emails_sent in BEFORE) must match exactly.
+    """
+    names = _metric_names()
+    seeds = np.random.SeedSequence(seed).generate_state(replicates)
+    rows: list[dict] = []
+
+    for config in (ScenarioConfig.before(num_guests), ScenarioConfig.after(num_guests)):
+        loop_runs: list[list[float]] = []
+        vec_runs: list[list[float]] = []
+        for s in seeds:
+            loop_runs.append(_metric_vector(sim.simulate(config, random.Random(int(s)))))
+            vec_runs.append(_metric_vector(simulate_vectorized(config, int(s))))
+
+        loop_arr = np.asarray(loop_runs)
+        vec_arr = np.asarray(vec_runs)
+        loop_mean, vec_mean = loop_arr.mean(axis=0), vec_arr.mean(axis=0)
+        se = np.sqrt(loop_arr.var(axis=0, ddof=1) / replicates
+                     + vec_arr.var(axis=0, ddof=1) / replicates)
+
+        for i, name in enumerate(names):
+            diff = vec_mean[i] - loop_mean[i]
+            if se[i] == 0:
+                z = 0.0 if diff == 0 else math.inf
+            else:
+                z = diff / se[i]
+            rows.append({
+                "scenario": config.label,
+                "metric": name,
+                "loop_mean": float(loop_mean[i]),
+                "vectorized_mean": float(vec_mean[i]),
+                "z": float(z),
+                "ok": abs(z) < z_threshold,
+            })
+    return rows
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--guests", type=int, default=80_000,
+                        help="population size (default: full 80k portfolio)")
+    parser.add_argument("--seed", type=int, default=sim.SEED)
+    parser.add_argument("--check", action="store_true",
+                        help="run the statistical-equivalence test against the loop engine")
+    parser.add_argument("--replicates", type=int, default=200,
+                        help="replicates per engine for --check")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+
+    if args.check:
+        t0 = time.perf_counter()
+        rows = check_equivalence(replicates=args.replicates, seed=args.seed)
+        print(f"{'Scenario':<8} {'Metric':<40} {'Loop':>10} {'Vector':>10} {'z':>7}")
+        print("-" * 80)
+        for r in rows:
+            flag = "" if r["ok"] else "  <-- MISMATCH"
+            print(f"{r['scenario']:<8} {r['metric']:<40} {r['loop_mean']:>10.2f} "
+                  f"{r['vectorized_mean']:>10.2f} {r['z']:>7.2f}{flag}")
+        failed = sum(not r["ok"] for r in rows)
+        print(f"\n{len(rows) - failed}/{len(rows)} metrics equivalent "
+              f"({args.replicates} replicates, {time.perf_counter() - t0:.1f}s)")
+        raise SystemExit(1 if failed else 0)
+
+    t0 = time.perf_counter()
+    before = simulate_vectorized(ScenarioConfig.before(args.guests, args.seed))
+    after = simulate_vectorized(ScenarioConfig.after(args.guests, args.seed))
+    elapsed = time.perf_counter() - t0
+    sim.print_report(before, after, seed=args.seed)
+    print(f"  Vectorized engine: {args.guests:,} guests x 2 scenarios in {elapsed:.3f}s")